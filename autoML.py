@@ -1,151 +1,451 @@
-import pandas as pd
-import numpy as np
-from pycaret.classification import *
-import os
-
-# ============================================ 
-# AYARLAR
-# ============================================ 
-CONFIG = {
-    'input_file': 'ml_filtre_verileri.xlsx',
-    'target_col': 'TARGET_3D',
-    # 'Current_Trend' çıkarıldı çünkü TARGET_3D ile çok yüksek korelasyonlu (Data Leakage/Persistence)
-    'ignore_cols': ['CODE', 'DATE', 'Current_Trend'], 
-    'train_size': 0.8,               
-    'session_id': 123,
-    'log_experiment': False,
-    'experiment_name': 'fintech_trend_prediction'
-}
-
-def run_pycaret_automl():
-    print("="*60)
-    print("🚀 PYCARET AUTOML BAŞLATILIYOR (LEAKAGE FIX UYGULANDI)")
-    print("="*60)
-
-    # 1. Veriyi Oku
-    print(f"\n📂 Veri okunuyor: {CONFIG['input_file']}")
-    if not os.path.exists(CONFIG['input_file']):
-        print(f"❌ HATA: Dosya bulunamadı! ({CONFIG['input_file']})")
-        return
-
-    df = pd.read_excel(CONFIG['input_file'])
-    print(f"✅ Veri yüklendi. Boyut: {df.shape}")
-
-    # ------------------------------------------------------------
-    # LEAKAGE FIX 3: Formül Sızıntısını Önleme (Sadece PriceAbove)
-    # ------------------------------------------------------------
-    # Veri setinde binary '_Slope' kolonları bulunmuyor (sadece Slope_Rate var).
-    # Ancak '_PriceAbove' (0/1) kolonları var ve bunlar Target formülünün bir parçası.
-    # Modelin ezber yapmasını önlemek için bu binary kolonları çıkarıyoruz.
-    
-    leak_cols = [c for c in df.columns if c.endswith('_PriceAbove')]
-    
-    # Mevcut ignore listesine ekle
-    current_ignore = set(CONFIG['ignore_cols'])
-    current_ignore.update(leak_cols)
-    CONFIG['ignore_cols'] = list(current_ignore)
-    
-    print(f"\n🚫 Sızıntı önlemi: {len(leak_cols)} adet '_PriceAbove' özelliği eğitimden çıkarıldı.")
-    # ------------------------------------------------------------
-
-    # Eksik verileri temizle
-    df = df.dropna(subset=[CONFIG['target_col']])
-    
-    # Tarihe göre sırala
-    if 'DATE' in df.columns:
-        df = df.sort_values('DATE')
-        print("✅ Veriler tarihe göre sıralandı.")
-
-    # 2. PyCaret Setup
-    print("\n⚙️ PyCaret Setup yapılıyor...")
-    
-    s = setup(
-        data=df,
-        target=CONFIG['target_col'],
-        ignore_features=CONFIG['ignore_cols'],
-        train_size=CONFIG['train_size'],
-        data_split_shuffle=False,      
-        data_split_stratify=False,
-        fold_strategy='timeseries',    
-        fold=3,                        
-        session_id=CONFIG['session_id'],
-        verbose=False,
-        html=False,
-        log_experiment=CONFIG['log_experiment'],
-        experiment_name=CONFIG['experiment_name']
-    )
-    
-    print("✅ Setup tamamlandı.")
-    
-    # 3. Modelleri Karşılaştır
-    print("\n🏎️ Modeller karşılaştırılıyor...")
-    best_models = compare_models(n_select=3, sort='F1', verbose=True)
-    
-    best_model = best_models[0]
-    print(f"\n🏆 En İyi Model: {best_model}")
-
-    # 4. Optimize Et
-    print("\n🏋️ Model optimize ediliyor...")
-    tuned_model = tune_model(best_model, optimize='F1', fold=3, verbose=False)
-    
-    # 5. Sonuçlar
-    print("\n📊 Test Seti Performansı:")
-    predict_model(tuned_model)
-    
-    # 6. Feature Importance
-    print("\n🔍 Feature Importance Kaydediliyor...")
-    try:
-        plot_model(tuned_model, plot='feature', save=True)
-        print("✅ Feature Importance.png")
-        
-        plot_model(tuned_model, plot='confusion_matrix', save=True)
-        print("✅ Confusion Matrix.png")
-        
-        # ----------------------------------------------------------
-        # TÜM FEATURE IMPORTANCE SKORLARINI DIŞARI AKTAR
-        # ----------------------------------------------------------
-        # Modelin kullandığı tüm özelliklerin skorlarını alıp CSV'ye kaydedelim.
-        # Böylece grafikte çıkmayan Dist_Pct gibi özellikleri de görebiliriz.
-        
-        # Modelin kendisini al (Pipeline içinden)
-        model_obj = tuned_model
-        
-        # Eğer pipeline ise asıl modeli çekmeye çalış
-        if hasattr(model_obj, 'steps'):
-            model_obj = model_obj.steps[-1][1]
-            
-        if hasattr(model_obj, 'feature_importances_'):
-            # Özellik isimlerini al
-            feature_names = get_config('X_train').columns
-            importances = model_obj.feature_importances_
-            
-            fi_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
-            fi_df = fi_df.sort_values(by='Importance', ascending=False).reset_index(drop=True)
-            
-            # CSV'ye kaydet
-            fi_df.to_csv('feature_importance_all.csv', index=False)
-            print("✅ 'feature_importance_all.csv' olarak tüm skorlar kaydedildi.")
-            
-            # İlk 20'yi ekrana bas
-            print("\n🏆 TOP 20 ÖZELLİKLER:")
-            print(fi_df.head(20))
-            
-            # Dist_Pct'lerin durumunu özel olarak göster
-            print("\n📉 DISTANCE (UZAKLIK) ÖZELLİKLERİNİN SIRALAMASI:")
-            dist_features = fi_df[fi_df['Feature'].str.contains('Dist_Pct')]
-            print(dist_features)
-        else:
-            print("⚠️ Bu model türü feature_importances_ özniteliğine sahip değil.")
-            
-        # ----------------------------------------------------------
-
-    except Exception as e:
-        print(f"⚠️ Feature Importance hatası: {e}")
-
-    # 7. Kaydet
-    final_model = finalize_model(tuned_model)
-    save_model(final_model, 'fintech_best_model')
-    print("✅ Model kaydedildi.")
-
-if __name__ == "__main__":
+import pandas as pd
+import numpy as np
+from pycaret.classification import *
+import os
+import time
+from data_store import compact_feature_dtypes, feature_columns, read_feature_set
+from experiment_cache import EXPERIMENT_CACHE_DIR, ExperimentCache
+from time_budget import BudgetTimeout, TimeBudget, estimate_fit_seconds, run_with_timeout
+from training_data import TRAINING_DIR, load_training_matrix
+from walk_forward import WF_CONFIG, horizon_of, make_folds, run_walk_forward, summarize
+
+# ============================================ 
+# AYARLAR
+# ============================================ 
+CONFIG = {
+    'input_file': 'ml_filtre_verileri.parquet',
+    'target_col': 'TARGET_3D',
+    # 'Current_Trend' çıkarıldı çünkü TARGET_3D ile çok yüksek korelasyonlu (Data Leakage/Persistence)
+    'ignore_cols': ['CODE', 'DATE', 'Current_Trend'], 
+    'train_size': 0.8,               
+    'session_id': 123,
+    'log_experiment': False,
+    'experiment_name': 'fintech_trend_prediction',
+    # float32 feature'lar / int8 label'lar ile eğitim (tüm geçmiş bellekte daha rahat sığar)
+    'compact_dtypes': False,
+    # Tüm geçmişle eğitim: Feature seti diskte memory-mapped float32 matrise çevrilir,
+    # train / test bölmesi tarih sırasında kopyasız dilimlerle yapılır.
+    # NOT: PyCaret setup verinin tamamını belleğe kopyalar (dönüşüm pipeline'ı); memmap'in
+    # kazancı matrisin kurulması ve walk-forward içindir. Bellek sınırlıysa pycaret_max_rows
+    # ile PyCaret'e sadece en yeni satırlar verilir.
+    'use_memmap': False,
+    'training_dir': TRAINING_DIR,
+    'pycaret_max_rows': None,  # use_memmap: PyCaret'e verilen en yeni satır sayısı (None: tümü)
+    # Tune edilen model + walk_forward_models için paralel walk-forward doğrulama
+    # (fold ayarları walk_forward.WF_CONFIG'den alınır)
+    'walk_forward': False,
+    'walk_forward_models': ['rf', 'lr'],
+    'n_workers': None,
+    # Deney önbelleği: Veri seti + setup ayarları + model tanımı değişmeyen modeller
+    # (compare / tune) tekrar eğitilmez, metrikler ve model diskten okunur
+    'experiment_cache': True,
+    'experiment_cache_dir': EXPERIMENT_CACHE_DIR,
+    'compare_include': None,   # Karşılaştırılacak model kimlikleri (None: PyCaret turbo listesi)
+    'model_params': {},        # Model bazlı hiperparametreler, örn. {'rf': {'n_estimators': 300}}
+    'fold': 3,
+    # Zaman bütçesi (dakika, None: sınırsız): Adaylar bütçeyi paylaşır, yavaş modeller atlanır,
+    # payını aşan eğitim durdurulur (Linux / macOS; Windows'ta sadece başlamadan önce atlanır)
+    'time_budget_minutes': None,
+    'tune_budget_share': 0.25  # Bütçenin tune / grafikler / finalize için ayrılan oranı
+}
+
+
+def compare_candidates(cache=None, fingerprint=None, budget=None, n_select=3, sort='F1', fold=3):
+    """
+    compare_models eşdeğeri, aday modeller tek tek eğitilir:
+    - cache verilirse her model ayrı önbelleklenir; sadece önbellekte olmayan (veya tanımı
+      değişen) modeller eğitilir
+    - budget (TimeBudget) verilirse modeller pilot eğitimle tahmin edilen süreye göre hızlıdan
+      yavaşa eğitilir; payını aşacak olanlar ve bütçe bittikten sonra kalanlar atlanır,
+      tahmine rağmen payını aşan eğitim ayrı süreçte durdurulur
+    Returns: (en iyi n_select model, model kimlikleri, sıralı skor tablosu, {kimlik: kayıt})
+    """
+    catalog = models()
+    candidates = CONFIG['compare_include']
+    if candidates is None:
+        candidates = catalog.index[catalog['Turbo']].tolist() if 'Turbo' in catalog.columns else catalog.index.tolist()
+
+    rows, fitted, pending = [], {}, []
+    
+    def add_result(model_id, entry, source):
+        row = {'ID': model_id, 'Model': catalog.loc[model_id, 'Name']}
+        row.update(entry['metrics'].loc['Mean'].to_dict())
+        row['Kaynak'] = source
+        rows.append(row)
+        fitted[model_id] = entry
+
+    # 1. Önbellekteki modeller (süre harcamaz)
+    for model_id in candidates:
+        params = CONFIG['model_params'].get(model_id, {})
+        key = None
+        if cache is not None:
+            key = cache.make_key(fingerprint, 'create', {'model': model_id, 'params': params, 'fold': fold})
+            entry = cache.get(key)
+            if entry is not None:
+                add_result(model_id, entry, 'önbellek')
+                if budget is not None:
+                    budget.record(model_id, 'önbellek')
+                continue
+        pending.append((model_id, params, key, None))
+
+    # 2. Bütçe: Pilot eğitimle süre tahmini, hızlı modeller önce
+    if budget is not None and pending:
+        internal = models(internal=True)
+        X_train = get_config('X_train_transformed')
+        y_train = get_config('y_train_transformed')
+        estimated = []
+        for model_id, params, key, _ in pending:
+            def pilot(model_id=model_id, params=params):
+                estimator = internal.loc[model_id, 'Class'](**{**internal.loc[model_id, 'Args'], **params})
+                # create_model: fold adet CV eğitimi + tüm eğitim setinde yeniden eğitim
+                return estimate_fit_seconds(estimator, X_train, y_train, folds=fold + 1)[0]
+            
+            # Pilot da işçi süreçte çalışır: Ana süreç hiç eğitim yapmaz, OpenMP / loky iş
+            # parçacığı havuzu başlatmaz ve sonraki fork'lar kilitlenmez (libgomp fork güvenli değil)
+            try:
+                estimate = run_with_timeout(pilot, budget.share(len(pending)))
+            except BudgetTimeout:
+                # Pilot bile payı aştı: Tam eğitim kesinlikle sığmaz
+                estimate = np.inf
+            except Exception:
+                estimate = None
+            estimated.append((model_id, params, key, estimate))
+        pending = sorted(estimated, key=lambda item: np.inf if item[3] is None else item[3])
+
+    # 3. Eğitim
+    for position, (model_id, params, key, estimate) in enumerate(pending):
+        if budget is not None:
+            limit = budget.share(len(pending) - position)
+            if budget.exhausted():
+                budget.record(model_id, 'atlandı', estimate=estimate, limit=limit, reason='bütçe bitti')
+                continue
+            if estimate is not None and estimate > limit:
+                budget.record(model_id, 'atlandı', estimate=estimate, limit=limit, reason='yavaş (tahmin > pay)')
+                continue
+        
+        def fit(model_id=model_id, params=params):
+            # İşçi süreçte çalışabilir: Skor tablosu da sonuçla birlikte döndürülür
+            return create_model(model_id, fold=fold, verbose=False, **params), pull()
+
+        started = time.perf_counter()
+        try:
+            model, metrics = run_with_timeout(fit, limit if budget is not None else None)
+        except BudgetTimeout:
+            print(f"⏱️ {model_id} payını ({limit:,.0f} sn) aştı, durduruldu")
+            budget.record(model_id, 'durduruldu', seconds=time.perf_counter() - started,
+                          estimate=estimate, limit=limit, reason='süre aşıldı')
+            continue
+        except Exception as e:
+            print(f"⚠️ {model_id} atlandı: {e}")
+            if budget is not None:
+                budget.record(model_id, 'atlandı', seconds=time.perf_counter() - started, reason='hata')
+            continue
+        seconds = time.perf_counter() - started
+        
+        entry = {'metrics': metrics, 'model': model, 'info': {'model': model_id, 'params': params, 'seconds': seconds}}
+        if cache is not None:
+            cache.put(key, entry['metrics'], model, entry['info'])
+        if budget is not None:
+            budget.record(model_id, 'eğitildi', seconds=seconds, estimate=estimate, limit=limit)
+        add_result(model_id, entry, 'eğitildi')
+
+    if not rows:
+        raise RuntimeError("Hiçbir model eğitilemedi (zaman bütçesi çok küçük olabilir)")
+    leaderboard = pd.DataFrame(rows).sort_values(sort, ascending=False).reset_index(drop=True)
+    best_ids = leaderboard['ID'].head(n_select).tolist()
+    return [fitted[model_id]['model'] for model_id in best_ids], best_ids, leaderboard, fitted
+
+
+def tune_iterations(budget, fit_seconds, fold=3, default=10):
+    """Kalan bütçeye (rezerv dahil) sığan tune iterasyon sayısı; her iterasyon fold adet eğitimdir"""
+    if budget is None or not fit_seconds:
+        return default
+    per_iteration = fit_seconds / (fold + 1) * fold
+    return int(min(default, max(1, budget.remaining(include_reserve=True) * 0.8 // per_iteration)))
+
+
+def cached_tune_model(cache, fingerprint, model, model_id, optimize='F1', fold=3, n_iter=10):
+    """tune_model eşdeğeri: Aynı model + başlangıç hiperparametreleri için sonuç önbellekten gelir"""
+    if cache is None:
+        return tune_model(model, optimize=optimize, fold=fold, n_iter=n_iter, verbose=False)
+    spec = {'model': model_id, 'params': model.get_params(), 'optimize': optimize, 'fold': fold, 'n_iter': n_iter}
+    key = cache.make_key(fingerprint, 'tune', spec)
+    entry = cache.get(key)
+    if entry is not None:
+        print("   (önbellekten)")
+        return entry['model']
+    tuned = tune_model(model, optimize=optimize, fold=fold, n_iter=n_iter, verbose=False)
+    cache.put(key, pull(), tuned, {'model': model_id})
+    return tuned
+
+
+def budget_step(budget, name, fn, timeout=None):
+    """
+    Karşılaştırma sonrası adımları (tune, grafikler, finalize) rezervden harcar ve rapora yazar.
+    Rezerv bittiyse adım atlanır, timeout aşılırsa durdurulur. Returns: (tamamlandı mı, sonuç)
+    """
+    if budget is None:
+        return True, fn()
+    if budget.remaining(include_reserve=True) <= 0:
+        budget.record(name, 'atlandı', reason='bütçe bitti')
+        return False, None
+    started = time.perf_counter()
+    try:
+        result = run_with_timeout(fn, timeout)
+    except BudgetTimeout:
+        budget.record(name, 'durduruldu', seconds=time.perf_counter() - started, limit=timeout, reason='süre aşıldı')
+        return False, None
+    budget.record(name, 'tamamlandı', seconds=time.perf_counter() - started, limit=timeout)
+    return True, result
+
+def run_pycaret_automl():
+    print("="*60)
+    print("🚀 PYCARET AUTOML BAŞLATILIYOR (LEAKAGE FIX UYGULANDI)")
+    print("="*60)
+
+    # 1. Veriyi Oku
+    print(f"\n📂 Veri okunuyor: {CONFIG['input_file']}")
+    if not os.path.exists(CONFIG['input_file']):
+        print(f"❌ HATA: Dosya bulunamadı! ({CONFIG['input_file']})")
+        return
+
+    # ------------------------------------------------------------
+    # LEAKAGE FIX 3: Formül Sızıntısını Önleme (Sadece PriceAbove)
+    # ------------------------------------------------------------
+    # Veri setinde binary '_Slope' kolonları bulunmuyor (sadece Slope_Rate var).
+    # Ancak '_PriceAbove' (0/1) kolonları var ve bunlar Target formülünün bir parçası.
+    # Modelin ezber yapmasını önlemek için bu binary kolonları çıkarıyoruz.
+    # Kolon adları şemadan okunur; çıkarılan kolonlar diskten hiç yüklenmez (projeksiyon).
+    
+    all_columns = feature_columns(CONFIG['input_file'])
+    leak_cols = [c for c in all_columns if c.endswith('_PriceAbove')]
+    
+    # Çok ufuklu veri setinde diğer ufukların hedefleri (TARGET_5D vb.) geleceği içerir
+    other_targets = [c for c in all_columns if c.startswith('TARGET_') and c != CONFIG['target_col']]
+    
+    if CONFIG['use_memmap']:
+        data = load_training_matrix(CONFIG['input_file'], CONFIG['target_col'],
+                                    out_dir=CONFIG['training_dir'], exclude=leak_cols)
+        # PyCaret setup aldığı veriyi kopyalar: Sadece en yeni pycaret_max_rows satır verilir
+        start = data.recent_start(CONFIG['pycaret_max_rows'])
+        split = data.split_position(CONFIG['train_size'], start=start)
+        train_df = data.frame(slice(start, split))
+        test_df = data.frame(slice(split, None))
+        print(f"✅ Memory-mapped matris: {data.X.shape} ({data.X.nbytes / 1024 ** 2:,.1f} MB, diskte)")
+        if start > 0:
+            print(f"   PyCaret'e son {len(data) - start:,} satır verildi "
+                  f"({pd.Timestamp(data.dates[start]).date()} sonrası, pycaret_max_rows)")
+        print(f"   Eğitim: {len(train_df):,} satır | Test: {len(test_df):,} satır "
+              f"(bölme tarihi: {pd.Timestamp(data.dates[split]).date() if split < len(data) else '-'})")
+        print(f"\n🚫 Sızıntı önlemi: {len(leak_cols)} adet '_PriceAbove' özelliği eğitimden çıkarıldı.")
+        # CODE / DATE / Current_Trend matrise hiç alınmadı
+        data_args = dict(data=train_df, test_data=test_df)
+    else:
+        excluded = set(leak_cols) | set(other_targets)
+        df = read_feature_set(CONFIG['input_file'], columns=[c for c in all_columns if c not in excluded])
+        if CONFIG['compact_dtypes']:
+            df = compact_feature_dtypes(df)
+        print(f"✅ Veri yüklendi. Boyut: {df.shape} ({df.memory_usage(deep=True).sum() / 1024 ** 2:,.1f} MB)")
+        
+        print(f"\n🚫 Sızıntı önlemi: {len(leak_cols)} adet '_PriceAbove' özelliği eğitimden çıkarıldı.")
+        if other_targets:
+            print(f"🚫 Diğer ufuk hedefleri eğitimden çıkarıldı: {', '.join(other_targets)}")
+        # ------------------------------------------------------------
+
+        # Eksik verileri temizle
+        df = df.dropna(subset=[CONFIG['target_col']])
+        
+        # Tarihe göre sırala
+        if 'DATE' in df.columns:
+            df = df.sort_values('DATE')
+            print("✅ Veriler tarihe göre sıralandı.")
+
+        data_args = dict(data=df, ignore_features=CONFIG['ignore_cols'], train_size=CONFIG['train_size'])
+
+    # 2. PyCaret Setup
+    print("\n⚙️ PyCaret Setup yapılıyor...")
+    
+    s = setup(
+        **data_args,
+        target=CONFIG['target_col'],
+        data_split_shuffle=False,      
+        data_split_stratify=False,
+        fold_strategy='timeseries',    
+        fold=CONFIG['fold'],                        
+        session_id=CONFIG['session_id'],
+        verbose=False,
+        html=False,
+        log_experiment=CONFIG['log_experiment'],
+        experiment_name=CONFIG['experiment_name']
+    )
+    
+    print("✅ Setup tamamlandı.")
+    
+    # 3. Modelleri Karşılaştır
+    print("\n🏎️ Modeller karşılaştırılıyor...")
+    budget = None
+    if CONFIG['time_budget_minutes']:
+        total = CONFIG['time_budget_minutes'] * 60
+        budget = TimeBudget(total, reserve_seconds=total * CONFIG['tune_budget_share'])
+        print(f"⏱️ Zaman bütçesi: {CONFIG['time_budget_minutes']} dk "
+              f"(%{CONFIG['tune_budget_share'] * 100:.0f} tune / finalize için ayrıldı)")
+    
+    cache, fingerprint = None, None
+    if CONFIG['experiment_cache']:
+        import pycaret
+        cache = ExperimentCache(CONFIG['experiment_cache_dir'])
+        setup_params = {'train_size': CONFIG['train_size'], 'session_id': CONFIG['session_id'],
+                        'fold': CONFIG['fold'], 'fold_strategy': 'timeseries', 'pycaret': pycaret.__version__}
+        frames = [data_args['data']] + ([data_args['test_data']] if 'test_data' in data_args else [])
+        fingerprint = cache.dataset_fingerprint(frames, CONFIG['target_col'],
+                                                data_args.get('ignore_features'), setup_params)
+    
+    if cache is not None or budget is not None:
+        best_models, best_ids, leaderboard, fitted = compare_candidates(
+            cache, fingerprint, budget, n_select=3, sort='F1', fold=CONFIG['fold'])
+        print(leaderboard.to_string(index=False))
+        if cache is not None:
+            print(f"💾 Deney önbelleği: {cache.hits} model önbellekten, {cache.misses} model eğitildi")
+    else:
+        best_models = compare_models(n_select=3, sort='F1', verbose=True)
+    
+    best_model = best_models[0]
+    print(f"\n🏆 En İyi Model: {best_model}")
+
+    # 4. Optimize Et
+    print("\n🏋️ Model optimize ediliyor...")
+    finalize_s = 0.0
+    if cache is not None or budget is not None:
+        fit_seconds = fitted[best_ids[0]].get('info', {}).get('seconds')
+        n_iter = tune_iterations(budget, fit_seconds, fold=CONFIG['fold'])
+        tune_timeout = None
+        if budget is not None:
+            # finalize tüm veride (eğitim + test) bir kez eğitir: Süresi rezervden ayrılır
+            finalize_s = (fit_seconds or 0.0) / (CONFIG['fold'] + 1) / CONFIG['train_size']
+            tune_timeout = max(0.0, budget.remaining(include_reserve=True) - finalize_s)
+            print(f"   Bütçeye göre tune iterasyonu: {n_iter} (en fazla {tune_timeout:,.0f} sn)")
+        done, tuned_model = budget_step(
+            budget, f'tune ({best_ids[0]})',
+            lambda: cached_tune_model(cache, fingerprint, best_model, best_ids[0],
+                                      optimize='F1', fold=CONFIG['fold'], n_iter=n_iter),
+            timeout=tune_timeout)
+        if not done:
+            print("⏱️ Tune için süre kalmadı: Tune edilmemiş en iyi model kullanılıyor")
+            tuned_model = best_model
+    else:
+        tuned_model = tune_model(best_model, optimize='F1', fold=CONFIG['fold'], verbose=False)
+    
+    # 5. Sonuçlar
+    # Bütçe varken ana süreçte model çalıştırılmaz (tahmin de OpenMP başlatabilir, sonraki
+    # grafik / finalize fork'ları kilitlenir): Test tahmini ve walk-forward da işçide çalışır
+    def reserve_timeout():
+        """Rezervden finalize payı ayrıldıktan sonra kalan süre (bütçe yoksa sınırsız)"""
+        if budget is None:
+            return None
+        return max(0.0, budget.remaining(include_reserve=True) - finalize_s)
+    
+    print("\n📊 Test Seti Performansı:")
+    done, _ = budget_step(budget, 'test tahmini', lambda: predict_model(tuned_model), timeout=reserve_timeout())
+    if not done:
+        print("⏭️ Test tahmini atlandı (zaman bütçesi)")
+    
+    # 5b. Walk-forward doğrulama (tek 80/20 bölmesi yerine çok sayıda zaman sıralı fold)
+    if CONFIG['walk_forward'] and budget is not None and budget.remaining(include_reserve=True) <= 0:
+        print("\n⏭️ Walk-forward doğrulama atlandı (zaman bütçesi bitti)")
+    elif CONFIG['walk_forward']:
+        print("\n🚶 Walk-forward doğrulama...")
+        leak_cols = [c for c in all_columns if c.endswith('_PriceAbove')]
+        data = load_training_matrix(CONFIG['input_file'], CONFIG['target_col'],
+                                    out_dir=CONFIG['training_dir'], exclude=leak_cols)
+        folds = make_folds(data.dates, mode=WF_CONFIG['mode'], test_days=WF_CONFIG['test_days'],
+                           train_days=WF_CONFIG['train_days'], min_train_days=WF_CONFIG['min_train_days'],
+                           horizon=horizon_of(CONFIG['target_col']),
+                           embargo_days=WF_CONFIG['embargo_days'], max_folds=WF_CONFIG['max_folds'])
+        
+        # Pipeline ise asıl modeli al (her foldda klonlanıp sıfırdan eğitilir)
+        estimator = tuned_model.steps[-1][1] if hasattr(tuned_model, 'steps') else tuned_model
+        # (models adı kullanılmaz: pycaret'in models() fonksiyonunu gölgeler)
+        wf_models = {'tuned': estimator}
+        wf_models.update({name: name for name in CONFIG['walk_forward_models']})
+        
+        done, wf_results = budget_step(
+            budget, 'walk-forward',
+            lambda: run_walk_forward(data, folds, wf_models, n_workers=CONFIG['n_workers']),
+            timeout=reserve_timeout())
+        if done:
+            wf_results.to_csv(WF_CONFIG['output_file'], index=False)
+            print(f"✅ {len(folds)} fold ({WF_CONFIG['mode']}) tamamlandı:")
+            print(summarize(wf_results).to_string())
+        else:
+            print("⏭️ Walk-forward doğrulama durduruldu (zaman bütçesi)")
+    
+    # 6. Feature Importance
+    print("\n🔍 Feature Importance Kaydediliyor...")
+    try:
+        def save_plots():
+            plot_model(tuned_model, plot='feature', save=True)
+            print("✅ Feature Importance.png")
+            
+            plot_model(tuned_model, plot='confusion_matrix', save=True)
+            print("✅ Confusion Matrix.png")
+        
+        done, _ = budget_step(budget, 'grafikler', save_plots, timeout=reserve_timeout())
+        if not done:
+            print("⏭️ Grafikler atlandı (zaman bütçesi)")
+        
+        # ----------------------------------------------------------
+        # TÜM FEATURE IMPORTANCE SKORLARINI DIŞARI AKTAR
+        # ----------------------------------------------------------
+        # Modelin kullandığı tüm özelliklerin skorlarını alıp CSV'ye kaydedelim.
+        # Böylece grafikte çıkmayan Dist_Pct gibi özellikleri de görebiliriz.
+        
+        # Modelin kendisini al (Pipeline içinden)
+        model_obj = tuned_model
+        
+        # Eğer pipeline ise asıl modeli çekmeye çalış
+        if hasattr(model_obj, 'steps'):
+            model_obj = model_obj.steps[-1][1]
+            
+        if hasattr(model_obj, 'feature_importances_'):
+            # Özellik isimlerini al
+            feature_names = get_config('X_train').columns
+            importances = model_obj.feature_importances_
+            
+            fi_df = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
+            fi_df = fi_df.sort_values(by='Importance', ascending=False).reset_index(drop=True)
+            
+            # CSV'ye kaydet
+            fi_df.to_csv('feature_importance_all.csv', index=False)
+            print("✅ 'feature_importance_all.csv' olarak tüm skorlar kaydedildi.")
+            
+            # İlk 20'yi ekrana bas
+            print("\n🏆 TOP 20 ÖZELLİKLER:")
+            print(fi_df.head(20))
+            
+            # Dist_Pct'lerin durumunu özel olarak göster
+            print("\n📉 DISTANCE (UZAKLIK) ÖZELLİKLERİNİN SIRALAMASI:")
+            dist_features = fi_df[fi_df['Feature'].str.contains('Dist_Pct')]
+            print(dist_features)
+        else:
+            print("⚠️ Bu model türü feature_importances_ özniteliğine sahip değil.")
+            
+        # ----------------------------------------------------------
+
+    except Exception as e:
+        print(f"⚠️ Feature Importance hatası: {e}")
+
+    # 7. Kaydet
+    finalize_timeout = budget.remaining(include_reserve=True) if budget is not None else None
+    done, final_model = budget_step(budget, 'finalize', lambda: finalize_model(tuned_model),
+                                    timeout=finalize_timeout)
+    if not done:
+        print("⏱️ finalize için süre kalmadı: Sadece eğitim setiyle eğitilmiş model kaydediliyor")
+        final_model = tuned_model
+    save_model(final_model, 'fintech_best_model')
+    print("✅ Model kaydedildi.")
+    
+    if budget is not None:
+        budget.print_report()
+
+if __name__ == "__main__":
     run_pycaret_automl()
\ No newline at end of file
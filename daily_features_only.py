@@ -6,7 +6,11 @@ import warnings
 import sys
 
 # generate_ml_features dosyasından hesaplama fonksiyonunu ve ayarları alıyoruz
-from generate_ml_features import calculate_all_filters, CONFIG
+from generate_ml_features import compute_features, feature_params, get_target_columns, CONFIG
+from data_store import PRICE_COLUMNS, PRICE_STORE, compact_feature_dtypes, price_store_exists, write_feature_set
+from isyat_veri import load_universe
+from stock_groups import StockGroups
+from streaming_indicators import STATE_DIR, update_stock
 
 warnings.filterwarnings('ignore')
 
@@ -14,62 +18,84 @@ warnings.filterwarnings('ignore')
 # AYARLAR
 # ============================================ 
 FEATURE_CONFIG = {
-    'input_file': 'hisse_verileri_2y.xlsx',  # Güncel veri dosyanız
-    'output_file': f'280_gunluk_feature_seti_.xlsx', # Çıktı dosyası
-    'days_to_keep': 280 # Son kaç günün verisi tutulacak?
+    'input_file': PRICE_STORE,  # Güncel fiyat deposu (veya eski .xlsx dosyası)
+    'output_file': '280_gunluk_feature_seti_.parquet', # Çıktı (CODE'a göre bölünmüş Parquet feature seti)
+    'excel_export': False, # İnceleme için aynı isimle .xlsx kopyası da yaz
+    'days_to_keep': 280, # Son kaç günün verisi tutulacak?
+    'streaming': True, # Hisse başına indikatör durumunu sakla, sadece yeni barları işle
+    'state_dir': STATE_DIR # Akan durum dosyalarının klasörü
 }
 
+def compute_streaming(stock_frames, on_result=None):
+    """Kayıtlı durumdan sadece yeni barları işle (durum yoksa / uyuşmazsa baştan kurulur)"""
+    results, errors = [], {}
+    rebuilt_count = 0
+    for idx, (stock, stock_df) in enumerate(stock_frames, 1):
+        try:
+            features_df, rebuilt = update_stock(stock, stock_df, CONFIG,
+                                                keep_rows=FEATURE_CONFIG['days_to_keep'],
+                                                state_dir=FEATURE_CONFIG['state_dir'])
+            rebuilt_count += rebuilt
+            results.append((stock, features_df))
+            error = None
+        except Exception as e:
+            features_df, error = None, str(e)
+            errors[stock] = error
+        if on_result is not None:
+            on_result(idx, stock, features_df, error)
+    print(f"\n   Durum: {len(results) - rebuilt_count} hisse güncellendi, {rebuilt_count} hisse baştan kuruldu")
+    return results, errors
+
 def main():
     print("=" * 60)
     print(f"GÜNLÜK TAHMİN İÇİN SON {FEATURE_CONFIG['days_to_keep']} GÜNLÜK FEATURE OLUŞTURUCU")
     print("=" * 60)
     
     # 1. Veri Kontrolü
-    if not os.path.exists(FEATURE_CONFIG['input_file']):
+    if not price_store_exists(FEATURE_CONFIG['input_file']):
         print(f"❌ Hata: Girdi dosyası bulunamadı: {FEATURE_CONFIG['input_file']}")
         return
 
     print(f"📂 Veri okunuyor: {FEATURE_CONFIG['input_file']}")
-    df = pd.read_excel(FEATURE_CONFIG['input_file'])
-    df['DATE'] = pd.to_datetime(df['DATE'])
+    df = load_universe(CONFIG['universe'], FEATURE_CONFIG['input_file'])
+    df[PRICE_COLUMNS] = df[PRICE_COLUMNS].astype('float64')
     
     print(f"📊 Toplam {len(df)} satır, {df['CODE'].nunique()} hisse senedi verisi yüklendi.")
     
     # 2. Feature Hesaplama
     print("\n🔄 İndikatörler ve özellikler hesaplanıyor...")
     
-    all_last_rows = []
-    stocks = sorted(df['CODE'].unique())
-    total_stocks = len(stocks)
+    stock_frames = []
+    for stock, stock_df in StockGroups(df):
+        # Yeterli veri kontrolü (Warm-up süresi için)
+        if len(stock_df) < CONFIG['warmup_bars'] + FEATURE_CONFIG['days_to_keep'] + 5:
+            continue
+        stock_frames.append((stock, stock_df))
     
-    for idx, stock in enumerate(stocks, 1):
+    total_stocks = len(stock_frames)
+    
+    def report(idx, stock, features_df, error):
         # İlerleme göstergesi
         if idx % 10 == 0 or idx == total_stocks:
             print(f"\r   İşleniyor: [{idx}/{total_stocks}] {stock}", end="")
-            
-        stock_df = df[df['CODE'] == stock].copy().sort_values('DATE').reset_index(drop=True)
-        
-        # Yeterli veri kontrolü (Warm-up süresi için)
-        if len(stock_df) < CONFIG['warmup_bars'] + FEATURE_CONFIG['days_to_keep'] + 5:
-            continue
-            
-        try:
-            # is_inference=True ile çağırıyoruz:
-            # 1. Target hesaplanmaz (Geleceği bilmiyoruz)
-            # 2. Son satırlar silinmez (Bugünün verisi bize lazım)
-            features_df = calculate_all_filters(stock_df, CONFIG, is_inference=True)
-            
-            # Son N günü alıyoruz (Trend değişimi takibi için)
-            last_rows = features_df.tail(FEATURE_CONFIG['days_to_keep']).copy()
-            
-            if not last_rows.empty:
-                all_last_rows.append(last_rows)
-                
-        except Exception as e:
-            # Hata olsa bile devam et, diğer hisseleri etkilemesin
-            continue
+    
+    # is_inference=True ile çağırıyoruz:
+    # 1. Target hesaplanmaz (Geleceği bilmiyoruz)
+    # 2. Son satırlar silinmez (Bugünün verisi bize lazım)
+    # Hata veren hisseler diğerlerini etkilemez, errors içinde toplanır
+    if FEATURE_CONFIG['streaming']:
+        results, errors = compute_streaming(stock_frames, on_result=report)
+    else:
+        results, errors = compute_features(stock_frames, CONFIG, is_inference=True,
+                                           n_workers=CONFIG['n_workers'], on_result=report)
+    
+    # Son N günü alıyoruz (Trend değişimi takibi için)
+    all_last_rows = [features_df.tail(FEATURE_CONFIG['days_to_keep']).copy() for _, features_df in results]
+    all_last_rows = [rows for rows in all_last_rows if not rows.empty]
             
     print("\n✅ Hesaplama tamamlandı.")
+    if errors:
+        print(f"⚠️ {len(errors)} hisse hata nedeniyle atlandı: {', '.join(errors)}")
     
     if not all_last_rows:
         print("❌ Hiçbir hisse için özellik üretilemedi!")
@@ -78,14 +104,22 @@ def main():
     # 3. Birleştirme ve Kaydetme
     final_df = pd.concat(all_last_rows, ignore_index=True)
     
-    # Kategorik verileri string'e çevirelim (Excel'de daha temiz görünür)
-    cat_cols = ['HHLL_Trend', 'HHLL_Trend_Lag1', 'HHLL_Trend_Lag2', 'HHLL_Trend_Lag3']
-    for col in cat_cols:
-        if col in final_df.columns:
-            final_df[col] = final_df[col].astype(str)
+    if CONFIG['compact_dtypes']:
+        # HHLL kolonları int8 kalır, CODE kategorik olur
+        final_df = compact_feature_dtypes(final_df)
+
+    # Çıktı dosyasını kaydet (şema ve üretim parametreleri metadata'da)
+    write_feature_set(final_df, FEATURE_CONFIG['output_file'],
+                      targets=get_target_columns(CONFIG), params=feature_params(CONFIG, is_inference=True))
 
-    # Çıktı dosyasını kaydet
-    final_df.to_excel(FEATURE_CONFIG['output_file'], index=False)
+    if FEATURE_CONFIG['excel_export']:
+        excel_df = final_df.copy()
+        # Kategorik verileri string'e çevirelim (Excel'de daha temiz görünür)
+        cat_cols = ['HHLL_Trend', 'HHLL_Trend_Lag1', 'HHLL_Trend_Lag2', 'HHLL_Trend_Lag3']
+        for col in cat_cols:
+            if col in excel_df.columns:
+                excel_df[col] = excel_df[col].astype(str)
+        excel_df.to_excel(os.path.splitext(FEATURE_CONFIG['output_file'])[0] + '.xlsx', index=False)
     
     print("\n" + "=" * 60)
     print(f"💾 Feature seti kaydedildi: {FEATURE_CONFIG['output_file']}")
@@ -0,0 +1,199 @@
+import datetime
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ============================================
+# KOLON ŞEMASI
+# ============================================
+PRICE_COLUMNS = ['CLOSING_TL', 'LOW_TL', 'HIGH_TL', 'VOLUME_TL']
+PRICE_STORE = 'hisse_verileri'  # Parquet deposu (CODE=XXX/ alt klasörleri)
+FEATURE_SCHEMA_KEY = b'feature_schema'  # Feature seti şemasının Parquet metadata anahtarı
+PRICE_META_KEY = b'price_meta'  # Fiyat deposu metadata anahtarı (hisse bazlı çekim başlangıçları)
+
+
+def compact_price_dtypes(df):
+    """Fiyat verisini kompakt tiplere çevirir: kategorik CODE, float32 fiyatlar, datetime64 DATE"""
+    df = df.copy()
+    df['CODE'] = df['CODE'].astype(str).astype('category')
+    if 'DATE' in df.columns:
+        df['DATE'] = pd.to_datetime(df['DATE'], dayfirst=True)
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    return df
+
+
+def is_binary_feature(col):
+    """0/1 değerli feature / label kolonları (_PriceAbove, HHLL_Trend*, Current_Trend, TARGET_*)"""
+    return (col.endswith('_PriceAbove') or col.startswith('HHLL_Trend')
+            or col == 'Current_Trend' or col.startswith('TARGET_'))
+
+
+def compact_feature_dtypes(df, categorical_code=True):
+    """
+    Feature matrisini kompakt tiplere çevirir: float32 sürekli feature'lar,
+    int8 binary / label kolonları (NaN içeriyorsa float32), kategorik CODE.
+    Bellek kullanımı float64 / object şemaya göre yarıdan fazla düşer.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if col == 'CODE':
+            if categorical_code:
+                df[col] = df[col].astype(str).astype('category')
+        elif col == 'DATE':
+            continue
+        elif is_binary_feature(col):
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = values.astype('float32') if values.isna().any() else values.astype('int8')
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('float32')
+    return df
+
+
+def write_partitioned(df, path, partition_col='CODE', metadata=None):
+    """
+    DataFrame'i partition_col'a göre bölünmüş Parquet deposu olarak yazar.
+    Önce geçici klasöre yazılır, sonra eskisinin yerine taşınır (yarım kalan yazma
+    mevcut depoyu bozmasın diye).
+    metadata: {bytes: bytes} şema metadata'sına eklenir, _common_metadata dosyasına da yazılır
+    """
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+
+    df = df.copy()
+    df[partition_col] = df[partition_col].astype(str)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    pq.write_to_dataset(table, root_path=tmp_path, partition_cols=[partition_col])
+    if metadata:
+        pq.write_metadata(table.schema, os.path.join(tmp_path, '_common_metadata'))
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+
+def read_partitioned(path, symbols=None, columns=None, partition_col='CODE', memory_map=False):
+    """Parquet deposundan sadece istenen hisseleri ve kolonları okur"""
+    filters = [(partition_col, 'in', list(symbols))] if symbols is not None else None
+    if columns is not None and partition_col not in columns:
+        columns = [partition_col] + list(columns)
+    df = pd.read_parquet(path, columns=columns, filters=filters, memory_map=memory_map)
+    # Partition kolonu kategorik döner, boş kategorileri temizle
+    df[partition_col] = df[partition_col].cat.remove_unused_categories()
+    return df[[partition_col] + [c for c in df.columns if c != partition_col]]
+
+
+def write_prices(df, path=PRICE_STORE, fetched_from=None):
+    """
+    Fiyat verisini kompakt tiplerle Parquet deposuna yazar.
+    fetched_from: {hisse: tarih} sunucudan istenen en eski tarih. İlk bar bu tarihten
+    sonra olabilir (yeni halka arz vb.); artımlı güncelleme geçmişi tekrar çekmesin diye saklanır.
+    """
+    df = compact_price_dtypes(df).sort_values(['CODE', 'DATE'])
+    metadata = None
+    if fetched_from:
+        meta = {'fetched_from': {str(s): str(d) for s, d in fetched_from.items()}}
+        metadata = {PRICE_META_KEY: json.dumps(meta).encode('utf-8')}
+    write_partitioned(df, path, metadata=metadata)
+    return df
+
+
+def read_price_meta(path=PRICE_STORE):
+    """Fiyat deposunun metadata'sı ({'fetched_from': {hisse: 'YYYY-MM-DD'}}), yoksa boş sözlük"""
+    meta_path = os.path.join(path, '_common_metadata')
+    if path.endswith('.xlsx') or not os.path.exists(meta_path):
+        return {}
+    metadata = pq.read_schema(meta_path).metadata or {}
+    if PRICE_META_KEY not in metadata:
+        return {}
+    return json.loads(metadata[PRICE_META_KEY].decode('utf-8'))
+
+
+def read_prices(path=PRICE_STORE, symbols=None, columns=None):
+    """
+    Fiyat verisini okur. Eski .xlsx dosyaları da desteklenir (geçiş dönemi için).
+    symbols / columns verilirse sadece o hisseler ve kolonlar yüklenir.
+    """
+    if path.endswith('.xlsx'):
+        df = pd.read_excel(path)
+        if symbols is not None:
+            df = df[df['CODE'].isin(symbols)]
+        if columns is not None:
+            df = df[['CODE'] + [c for c in columns if c != 'CODE']]
+        return compact_price_dtypes(df)
+
+    df = read_partitioned(path, symbols=symbols, columns=columns)
+    return df.sort_values(['CODE', 'DATE']).reset_index(drop=True)
+
+
+def price_store_exists(path=PRICE_STORE):
+    return os.path.isdir(path) if not path.endswith('.xlsx') else os.path.exists(path)
+
+
+# ============================================
+# FEATURE SETLERİ
+# ============================================
+# generate_ml_features / daily_features_only çıktıları CODE'a göre bölünmüş Parquet
+# olarak yazılır. Şema (kolonlar, tipler, hedefler, üretim parametreleri) metadata'da
+# tutulur. Okuyucular kolon projeksiyonu ve memory-mapped okuma ile sadece gerekeni yükler.
+
+
+def write_feature_set(df, path, targets=None, params=None):
+    """
+    Feature setini şema metadata'sı ile Parquet deposuna yazar.
+    targets: Hedef kolonları, params: Üretim parametreleri (CONFIG vb.)
+    """
+    schema = {
+        'columns': [{'name': col, 'dtype': str(dtype)} for col, dtype in df.dtypes.items()],
+        'targets': [col for col in (targets or []) if col in df.columns],
+        'rows': len(df),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'params': params or {},
+    }
+    metadata = {FEATURE_SCHEMA_KEY: json.dumps(schema, default=str, ensure_ascii=False).encode('utf-8')}
+    write_partitioned(df.sort_values(['CODE', 'DATE'], kind='mergesort'), path, metadata=metadata)
+    return schema
+
+
+def read_feature_schema(path):
+    """Feature setinin şemasını (kolonlar, hedefler, parametreler) veriyi okumadan döndürür"""
+    if path.endswith('.xlsx'):
+        columns = pd.read_excel(path, nrows=0).columns
+        return {'columns': [{'name': col, 'dtype': None} for col in columns], 'targets': [], 'params': {}}
+
+    metadata = pq.read_schema(os.path.join(path, '_common_metadata')).metadata or {}
+    return json.loads(metadata[FEATURE_SCHEMA_KEY].decode('utf-8'))
+
+
+def feature_columns(path):
+    """Feature setindeki kolon adları (yazıldığı sırayla)"""
+    return [col['name'] for col in read_feature_schema(path)['columns']]
+
+
+def read_feature_set(path, columns=None, symbols=None, memory_map=True):
+    """
+    Feature setini okur: columns verilirse sadece o kolonlar (projeksiyon), symbols
+    verilirse sadece o hisselerin partition'ları yüklenir. Dosyalar memory-map ile okunur.
+    Eski .xlsx dosyaları da desteklenir (geçiş dönemi için).
+    """
+    if path.endswith('.xlsx'):
+        df = pd.read_excel(path, usecols=columns)
+        if symbols is not None:
+            df = df[df['CODE'].isin(symbols)]
+        return df.reset_index(drop=True)
+
+    order = feature_columns(path)
+    # Sıralama için CODE ve DATE her zaman okunur, sonuçta sadece istenen kolonlar döner
+    read_columns = None if columns is None else list(dict.fromkeys(['CODE', 'DATE', *columns]))
+    df = read_partitioned(path, symbols=symbols, columns=read_columns, memory_map=memory_map)
+    selected = [col for col in order if col in df.columns] if columns is None else list(columns)
+    df = df.sort_values(['CODE', 'DATE'], kind='mergesort').reset_index(drop=True)
+    return df[selected]
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from feature_cache import FeatureCache
+
+EXPERIMENT_CACHE_DIR = '.experiment_cache'
+
+
+class ExperimentCache:
+    """
+    Model deneyleri (create_model / tune_model) için kalıcı disk önbelleği.
+
+    Anahtar = SHA-256(veri seti parmak izi + aşama + model/hiperparametre tanımı).
+    Veri seti parmak izi = eğitim/test satırlarının özeti + hedef + çıkarılan kolonlar + setup ayarları.
+    Her kayıt fold metrik tablosunu ve eğitilmiş modeli tutar; veri veya CONFIG değişmeyen
+    modeller tekrar eğitilmez, sadece tanımı değişen modeller yeniden çalışır.
+    """
+
+    def __init__(self, cache_dir=EXPERIMENT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def dataset_fingerprint(frames, target, ignore=None, setup_params=None):
+        """frames: Veri setini oluşturan DataFrame'ler (örn. [train_df, test_df])"""
+        payload = json.dumps({
+            'data': [FeatureCache.data_hash(df) for df in frames],
+            'target': target,
+            'ignore': sorted(ignore or []),
+            'setup': setup_params or {},
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(fingerprint, stage, spec):
+        """stage: 'create' / 'tune', spec: Model kimliği + hiperparametreler + çalışma ayarları"""
+        payload = json.dumps({'dataset': fingerprint, 'stage': stage, 'spec': spec},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """Kayıt varsa {'metrics': DataFrame, 'model': ...}, yoksa None"""
+        try:
+            entry = pd.read_pickle(self._path(key))
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Bozuk kayıt veya kütüphane sürümü değişmiş: Yeniden eğitilir
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, metrics, model, info=None):
+        # Geçici dosyaya yazıp taşı: Yarım dosya okunmasın
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle({'metrics': metrics, 'model': model, 'info': info or {}}, tmp_path)
+        os.replace(tmp_path, path)
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+FEATURE_CACHE_DIR = '.feature_cache'
+
+
+class FeatureCache:
+    """
+    Hisse bazlı feature (calculate_all_filters çıktısı) disk önbelleği.
+
+    Anahtar = SHA-256(hisse + girdi satırlarının özeti + parametreler).
+    - Fiyatlar, parametreler veya kaynak kod değişince anahtar değişir; bayat kayıtlara
+      bir daha erişilmez. Aynı hissenin farklı ayarlarla (kolon alt kümesi, eğitim /
+      tahmin, parametre taraması) üretilmiş kayıtları yan yana durur.
+    - Toplam boyut max_bytes'ı aşarsa en uzun süredir kullanılmayan kayıtlar silinir (LRU);
+      bayat kayıtlar da bu yolla temizlenir.
+    """
+
+    def __init__(self, cache_dir=FEATURE_CACHE_DIR, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def data_hash(df, columns=None):
+        """Girdi satırlarının içerik özeti (index hariç)"""
+        if columns is not None:
+            df = df[columns]
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        digest = hashlib.sha256(row_hashes.tobytes())
+        digest.update(json.dumps(list(map(str, df.columns))).encode('utf-8'))
+        return digest.hexdigest()
+
+    @classmethod
+    def make_key(cls, code, df, params, columns=None):
+        payload = json.dumps({'code': code, 'data': cls.data_hash(df, columns), 'params': params},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, code, key):
+        return os.path.join(self.cache_dir, str(code), f"{key}.pkl")
+
+    def get(self, code, key):
+        """Kayıt varsa DataFrame (son kullanım zamanı güncellenir), yoksa None"""
+        path = self._path(code, key)
+        try:
+            df = pd.read_pickle(path)
+        except (OSError, EOFError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)  # LRU: son kullanım zamanı
+        self.hits += 1
+        return df
+
+    def put(self, code, key, df):
+        path = self._path(code, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Geçici dosyaya yazıp taşı: Yarım dosya okunmasın
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    def size(self):
+        """Önbellekteki toplam bayt"""
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.pkl'):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    yield path, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        """Boyut sınırı aşılmışsa en eski kullanılan kayıtları siler, silinen sayıyı döndürür"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
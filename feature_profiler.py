@@ -0,0 +1,114 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+# ============================================
+# FEATURE ÜRETİMİ PROFİLLEME
+# ============================================
+# calculate_all_filters içindeki her kolon hesabı için duvar saati, CPU süresi ve
+# tepe bellek tahsisi (tracemalloc) hisse bazında kaydedilir. Kayıtlar gösterge
+# bazında toplanıp JSON / CSV ve flame graph (folded stack) formatında yazılabilir:
+#   flamegraph.pl feature_profile.folded > feature_profile.svg
+
+PANEL_CODE = '*'  # Tüm hisseler için tek seferde yapılan (panel) ölçümlerin kodu
+
+
+def indicator_of(column):
+    """Kolonun ait olduğu gösterge grubu (FINH_Dist_Pct_Lag1 -> FINH, TARGET_3D -> label)"""
+    if column in ('Current_Trend',) or column.startswith('TARGET_'):
+        return 'label'
+    if column.startswith('HHLL'):
+        return 'HHLL'
+    if column.startswith('VOL_Rel'):
+        return 'VOL_Rel'
+    return column.split('_')[0]
+
+
+class FeatureProfiler:
+    """
+    Kolon bazlı süre / bellek kayıtları.
+    Process havuzunda her işçi kendi profiler'ını tutar, kayıtlar merge() ile birleştirilir.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def measure(self, code, stage, column):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = tracemalloc.get_traced_memory()[1] - mem_before if self.trace_memory else 0
+            self.records.append({
+                'code': code, 'stage': stage, 'indicator': indicator_of(column),
+                'column': column, 'wall_s': wall, 'cpu_s': cpu, 'peak_bytes': max(peak, 0),
+            })
+
+    def merge(self, records):
+        self.records.extend(records)
+
+    # --------------------------------------------
+    # Raporlar
+    # --------------------------------------------
+    def to_frame(self):
+        columns = ['code', 'stage', 'indicator', 'column', 'wall_s', 'cpu_s', 'peak_bytes']
+        return pd.DataFrame(self.records, columns=columns)
+
+    def summary(self, by='indicator'):
+        """by ('indicator', 'column' veya 'stage') bazında toplam / ortalama süre ve tepe bellek"""
+        frame = self.to_frame()
+        if frame.empty:
+            return pd.DataFrame()
+        grouped = frame.groupby(by, sort=False)
+        # Panel ölçümleri tüm hisseleri kapsar: Hisse sayısına '*' sahte kodu katılmaz
+        n_stocks = max(frame.loc[frame['code'] != PANEL_CODE, 'code'].nunique(), 1)
+        summary = pd.DataFrame({
+            'calls': grouped.size(),
+            'wall_s': grouped['wall_s'].sum(),
+            'cpu_s': grouped['cpu_s'].sum(),
+            'wall_ms_per_stock': grouped['wall_s'].sum() / n_stocks * 1000,
+            'peak_mb_max': grouped['peak_bytes'].max() / 1024 ** 2,
+        })
+        summary['wall_pct'] = summary['wall_s'] / summary['wall_s'].sum() * 100
+        return summary.sort_values('wall_s', ascending=False)
+
+    def to_json(self, path):
+        """Ham kayıtlar + gösterge özetini JSON olarak yazar"""
+        payload = {
+            'records': self.records,
+            'summary': self.summary().reset_index().to_dict(orient='records'),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+
+    def to_csv(self, path):
+        self.to_frame().to_csv(path, index=False)
+
+    def to_folded(self, path):
+        """Flame graph için folded stack: 'calculate_all_filters;gösterge;kolon mikro_saniye'"""
+        frame = self.to_frame()
+        totals = frame.groupby(['indicator', 'column'], sort=False)['wall_s'].sum()
+        with open(path, 'w', encoding='utf-8') as f:
+            for (indicator, column), wall in totals.items():
+                f.write(f"calculate_all_filters;{indicator};{column} {int(round(wall * 1e6))}\n")
+
+    def export(self, base_path):
+        """base_path.json, base_path.csv ve base_path.folded dosyalarını yazar"""
+        paths = [f"{base_path}.json", f"{base_path}.csv", f"{base_path}.folded"]
+        self.to_json(paths[0])
+        self.to_csv(paths[1])
+        self.to_folded(paths[2])
+        return paths
@@ -0,0 +1,137 @@
+import datetime
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+DATE_FORMAT = '%d-%m-%Y'  # isyatirimhisse tarih formatı
+DATE_COLUMN = 'HGDG_TARIH'  # Ham yanıttaki tarih kolonu
+
+
+class FetchCache:
+    """
+    İş Yatırım yanıtları için disk önbelleği.
+
+    Anahtar, isteğin içeriğinden (hisse + tarih aralığı) üretilen SHA-256 özetidir.
+    - Kapanmış takvim yılları (hisse başına yılda bir kayıt) değişmez kabul edilir, hiç silinmez.
+      Aralık her gün kaydığı halde anahtar değişmez; önbellek hisse x yıl sayısıyla sınırlıdır.
+    - İçinde bulunulan yılın kayıtları ttl_seconds sonra geçersiz olur ve silinir.
+    """
+
+    def __init__(self, cache_dir='.fetch_cache', ttl_seconds=6 * 3600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(symbol, start_date, end_date):
+        payload = json.dumps({'symbol': symbol, 'start': start_date, 'end': end_date}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key, immutable):
+        suffix = 'imm' if immutable else 'ttl'
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{suffix}.pkl")
+
+    def get(self, key):
+        """Geçerli kayıt varsa DataFrame, yoksa None döner"""
+        immutable_path = self._path(key, True)
+        if os.path.exists(immutable_path):
+            self.hits += 1
+            return pd.read_pickle(immutable_path)
+
+        ttl_path = self._path(key, False)
+        if os.path.exists(ttl_path):
+            if time.time() - os.path.getmtime(ttl_path) <= self.ttl_seconds:
+                self.hits += 1
+                return pd.read_pickle(ttl_path)
+            os.remove(ttl_path)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, df, immutable):
+        path = self._path(key, immutable)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Geçici dosyaya yazıp taşı: Paralel thread'ler yarım dosya okumasın
+        tmp_path = f"{path}.{os.getpid()}.{id(df)}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    def evict_expired(self):
+        """Süresi dolmuş (bugünü içeren) kayıtları siler, silinen dosya sayısını döndürür"""
+        removed = 0
+        now = time.time()
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.ttl.pkl'):
+                    path = os.path.join(root, name)
+                    if now - os.path.getmtime(path) > self.ttl_seconds:
+                        os.remove(path)
+                        removed += 1
+        return removed
+
+
+def year_chunks(start, end, today):
+    """
+    [start, end] aralığını takvim yıllarına böler: (istek başı, istek sonu, değişmez mi).
+    Kapanmış yıllar her zaman tam yıl olarak istenir (anahtar güne göre kaymaz);
+    içinde bulunulan yıldan itibaren kalan kısım tek parça halinde TTL ile saklanır.
+    """
+    chunks = []
+    year = start.year
+    while year < today.year and year <= end.year:
+        chunks.append((datetime.date(year, 1, 1), datetime.date(year, 12, 31), True))
+        year += 1
+    if end.year >= today.year:
+        chunks.append((max(start, datetime.date(today.year, 1, 1)), end, False))
+    return chunks
+
+
+def cached_fetch(fetch_fn, cache, today=None, rate_limiter=None):
+    """
+    fetch_stock_data ile aynı imzaya sahip, önbellekli bir fonksiyon döndürür.
+    İstenen aralık takvim yıllarına bölünür (year_chunks): Kapanmış yıllar bir kez çekilip
+    değişmez olarak saklanır, tekrar eden çalıştırmalarda sunucuya sadece içinde bulunulan
+    yıl sorulur. Tam yıl yanıtları istenen aralığa göre süzülür.
+    rate_limiter sadece sunucuya giden gerçek isteklerden önce beklenir (önbellek isabeti beklemez).
+    """
+
+    def fetch(symbols, start_date, end_date, **kwargs):
+        day = today or datetime.date.today()
+        start = datetime.datetime.strptime(start_date, DATE_FORMAT).date()
+        end = datetime.datetime.strptime(end_date, DATE_FORMAT).date()
+        chunks = year_chunks(start, end, day)
+
+        frames = []
+        for symbol in symbols:
+            for chunk_start, chunk_end, immutable in chunks:
+                chunk_start_str = chunk_start.strftime(DATE_FORMAT)
+                chunk_end_str = chunk_end.strftime(DATE_FORMAT)
+                key = cache.make_key(symbol, chunk_start_str, chunk_end_str)
+
+                df = cache.get(key)
+                if df is None:
+                    if rate_limiter is not None:
+                        rate_limiter.wait()
+                    df = fetch_fn(symbols=[symbol], start_date=chunk_start_str,
+                                  end_date=chunk_end_str, **kwargs)
+                    if df is None:
+                        df = pd.DataFrame()
+                    # Boş yanıt geçici bir hata olabilir: Değişmez olarak saklanmaz, TTL ile tekrar sorulur
+                    cache.put(key, df, immutable and not df.empty)
+                if df.empty:
+                    continue
+                if chunk_start < start or chunk_end > end:
+                    dates = pd.to_datetime(df[DATE_COLUMN], dayfirst=True).dt.date
+                    df = df[(dates >= start) & (dates <= end)]
+                frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    return fetch
@@ -1,16 +1,36 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import traceback
 import warnings
+from contextlib import nullcontext
+from data_store import PRICE_COLUMNS, PRICE_STORE, compact_feature_dtypes, write_feature_set
+from feature_cache import FEATURE_CACHE_DIR, FeatureCache
+from feature_profiler import PANEL_CODE, FeatureProfiler
+from isyat_veri import load_universe
+from stock_groups import StockGroups
 warnings.filterwarnings('ignore')
 
+try:
+    # Opsiyonel JIT: numba kuruluysa EMA/KAMA döngüleri derlenir
+    from numba import njit
+except ImportError:
+    njit = None
+
 # ============================================
 # KONFİGÜRASYON
 # ============================================
 CONFIG = {
     # Dosya Ayarları
-    'input_file': 'hisse_verileri_2y.xlsx',
-    'output_file': 'ml_filtre_verileri.xlsx',
+    # Parquet fiyat deposu (isyat_veri.py çıktısı). Eski .xlsx dosya yolu da verilebilir.
+    'input_file': PRICE_STORE,
+    'universe': 'bist',  # Depodan dilimlenecek hisse evreni (isyat_veri.UNIVERSES)
+    # Feature seti: CODE'a göre bölünmüş Parquet (şema metadata'da). autoML / run_autogluon bunu okur
+    'output_file': 'ml_filtre_verileri.parquet',
+    'excel_export': False,  # İnceleme için aynı isimle .xlsx kopyası da yaz
     
     # Warm-up Süresi (Filtrelerin stabilizasyonu için gereken minimum bar sayısı)
     # Bu sayıdan sonraki veriler çıktıya dahil edilir
@@ -40,7 +60,34 @@ CONFIG = {
     'zlma_smooth': 1,
     
     # Lag (Gecikme) Parametreleri
-    'lag_days': [1, 2, 3]  # Kaç gün geriye gidilecek
+    'lag_days': [1, 2, 3],  # Kaç gün geriye gidilecek
+    
+    # Çıktı Kolonları (None: hepsi; liste verilirse sadece onlar ve bağımlılıkları hesaplanır)
+    # Örn: ['VOL_Rel', 'FINH_Dist_Pct', 'HHLL_Trend', 'TARGET_3D']
+    'feature_columns': None,
+    
+    # Hedef Ufukları (Her ufuk için TARGET_{h}D kolonu, tek indikatör hesabıyla)
+    # Birden fazla ufuk verilirse her biri için ayrı eğitim dosyası da yazılır
+    'target_horizons': [3],
+    
+    # Kompakt Veri Tipleri (float32 feature'lar, int8 binary/label'lar, kategorik CODE)
+    # Bellek kullanımını yarıdan fazla düşürür; hesaplamalar yine float64 yapılır
+    'compact_dtypes': False,
+    
+    # Paralel Hesaplama (Hisseler birbirinden bağımsız)
+    'n_workers': 1,  # 1: sıralı, >1: process havuzu, None: tüm çekirdekler
+    # Gösterge motoru: 'stock' (hisse bazlı) veya 'panel' (FINH, KAMA, BlueLine, OVT, LRB, ZLMA
+    # tüm evren için tek vektörel geçişte, panel_indicators.py; sonuçlar aynıdır)
+    'indicator_engine': 'stock',
+    
+    # Feature Önbelleği (Fiyatları ve parametreleri değişmeyen hisseler yeniden hesaplanmaz)
+    'feature_cache': True,
+    'feature_cache_dir': FEATURE_CACHE_DIR,
+    'feature_cache_max_mb': 2048,  # Aşılırsa en eski kullanılan kayıtlar silinir
+    
+    # Profilleme (Gösterge bazında süre / CPU / tepe bellek; JSON, CSV ve flame graph çıktısı)
+    'profile': False,
+    'profile_output': 'feature_profile'  # .json / .csv / .folded uzantıları eklenir
 }
 
 # ============================================
@@ -49,27 +96,100 @@ CONFIG = {
 
 def calculate_wma(series, period):
     """Weighted Moving Average - Pine Script ta.wma() ile aynı"""
-    weights = np.arange(1, period + 1)
+    values = _wma_values(series.to_numpy(dtype=float), period)
+    return pd.Series(values, index=series.index)
+
+def _wma_values(values, period):
+    """
+    WMA çekirdeği - ağırlıklı kaydırmalı toplam (konvolüsyon), 0. eksen boyunca.
+    Penceresinde NaN olan barlar NaN kalır (rolling().apply ile aynı warm-up).
+    """
+    weights = np.arange(1, period + 1, dtype=float)
+    result = np.full(values.shape, np.nan)
+    n_windows = len(values) - period + 1
+    if n_windows <= 0:
+        return result
     
-    def wma_calc(x):
-        if len(x) < period:
-            return np.nan
-        return np.sum(weights * x) / weights.sum()
+    acc = np.zeros((n_windows,) + values.shape[1:])
+    for k in range(period):
+        acc += weights[k] * values[k:k + n_windows]
     
-    return series.rolling(window=period).apply(wma_calc, raw=True)
+    result[period - 1:] = acc / weights.sum()
+    return result
 
 def calculate_ema_custom(series, period):
     """Custom EMA - FINH için özel EMA hesaplaması"""
     alpha = 2 / (period + 1)
-    result = pd.Series(index=series.index, dtype=float)
-    
-    for i in range(len(series)):
-        if i == 0 or pd.isna(result.iloc[i-1]):
-            result.iloc[i] = series.iloc[i]
+    values = _ema_values(series.to_numpy(dtype=float), alpha)
+    return pd.Series(values, index=series.index)
+
+# --------------------------------------------
+# Özyinelemeli filtre çekirdekleri (EMA / KAMA)
+# --------------------------------------------
+
+def _ema_loop(values, alpha, out):
+    """Pine EMA döngüsü: Önceki değer NaN ise seri o bardan yeniden başlar"""
+    prev = np.nan
+    for i in range(len(values)):
+        if np.isnan(prev):
+            prev = values[i]
         else:
-            result.iloc[i] = alpha * series.iloc[i] + (1 - alpha) * result.iloc[i-1]
-    
-    return result
+            prev = alpha * values[i] + (1 - alpha) * prev
+        out[i] = prev
+    return out
+
+def _kama_loop(close, smooth, out):
+    """KAMA döngüsü: kama[i] = kama[i-1] + smooth[i] * (close[i] - kama[i-1])"""
+    prev = close[0]
+    out[0] = prev
+    for i in range(1, len(close)):
+        prev = prev + smooth[i] * (close[i] - prev)
+        out[i] = prev
+    return out
+
+if njit is not None:
+    _ema_loop = njit(cache=True)(_ema_loop)
+    _kama_loop = njit(cache=True)(_kama_loop)
+
+def _ema_values(values, alpha):
+    """
+    NaN-restart'lı EMA (0. eksen boyunca, 1-D veya 2-D dizi).
+    numba yoksa 1-D seride her NaN'sız parça pandas ewm(adjust=False) ile tek geçişte
+    hesaplanır (EMA'nın özyinelemesi ewm ile birebir aynıdır, NaN barlar NaN kalır);
+    2-D dizide zaman ekseninde tek döngüyle tüm kolonlar birlikte güncellenir.
+    """
+    n = len(values)
+    if n == 0:
+        return np.empty(values.shape)
+    if njit is not None:
+        columns = values.reshape(n, -1)
+        out = np.empty(columns.shape)
+        for j in range(columns.shape[1]):
+            _ema_loop(np.ascontiguousarray(columns[:, j]), alpha, out[:, j])
+        return out.reshape(values.shape)
+    
+    if values.ndim > 1:
+        # Panel (zaman x hisse): Zaman ekseninde tek döngü, her adımda tüm kolonlar birlikte
+        out = np.empty(values.shape)
+        prev = np.full(values.shape[1:], np.nan)
+        for i in range(n):
+            prev = np.where(np.isnan(prev), values[i], alpha * values[i] + (1 - alpha) * prev)
+            out[i] = prev
+        return out
+    
+    valid = ~np.isnan(values)
+    # Her NaN/NaN-değil geçişi yeni bir parça başlatır
+    segments = np.cumsum(np.r_[True, valid[1:] != valid[:-1]])
+    return pd.Series(values).groupby(segments).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+def _kama_values(close, smooth):
+    """KAMA özyinelemesi (1-D). numba yoksa döngü Python float'ları üzerinde çalışır."""
+    out = np.empty(len(close))
+    if len(close) == 0:
+        return out
+    if njit is not None:
+        return _kama_loop(close, smooth, out)
+    return _kama_loop(close.tolist(), smooth.tolist(), out)
 
 def calculate_finh(df, period):
     """FINH göstergesi - Pine Script ile birebir aynı"""
@@ -111,13 +231,9 @@ def calculate_kama(df, length):
     nsmooth = ((nefratio * (nfastend - nslowend)) + nslowend) ** 2
     
     # KAMA hesaplama
-    kama = pd.Series(index=close.index, dtype=float)
-    kama.iloc[0] = close.iloc[0]
+    kama = _kama_values(close.to_numpy(dtype=float), nsmooth.to_numpy(dtype=float))
     
-    for i in range(1, len(close)):
-        kama.iloc[i] = kama.iloc[i-1] + nsmooth.iloc[i] * (close.iloc[i] - kama.iloc[i-1])
-    
-    return kama
+    return pd.Series(kama, index=close.index)
 
 def calculate_blueline(df, period):
     """BlueLine göstergesi - Pine Script ta.ema() ile aynı"""
@@ -148,22 +264,60 @@ def calculate_ovt(df, period):
     
     return n1_ovt
 
-def calculate_lrb(df, period):
+def calculate_lrb(df, period, offset=0):
     """LRB (Linear Regression) - Pine Script ta.linreg() ile aynı"""
     close = df['CLOSING_TL']
     
-    def linreg_value(y):
-        if len(y) < period or np.isnan(y).any():
-            return np.nan
-        x = np.arange(len(y))
-        # Linear regression: y = mx + b
-        coeffs = np.polyfit(x, y, 1)
-        # Son değeri döndür (offset = 0)
-        return coeffs[0] * (len(y) - 1) + coeffs[1]
+    lrb = rolling_linreg(close.to_numpy(dtype=float), period, offset)
     
-    lrb = close.rolling(window=period).apply(linreg_value, raw=True)
+    return pd.Series(lrb, index=close.index)
+
+def _linreg_prefix(values):
+    """Kayan regresyon için ortak ara sonuçlar: NaN'ları 0 yapılmış seri, Σy ve NaN sayısı önek toplamları"""
+    nan_mask = np.isnan(values)
+    y = np.where(nan_mask, 0.0, values)
+    
+    zero = np.zeros((1,) + values.shape[1:])
+    cum_y = np.concatenate([zero, np.cumsum(y, axis=0)])
+    cum_nan = np.concatenate([zero, np.cumsum(nan_mask, axis=0)])
+    return y, cum_y, cum_nan
+
+def rolling_linreg(values, length, offset=0, prefix=None):
+    """
+    Pine ta.linreg(src, length, offset): Her pencerede en küçük kareler doğrusunun
+    x = length - 1 - offset noktasındaki değeri. Σy ve Σx·y yürüyen toplamlarla bar başına
+    O(1) güncellenir. Penceresinde NaN olan barlar NaN döner.
+    prefix: _linreg_prefix(values) sonucu (parametre taramalarında tekrar kullanmak için)
+    """
+    result = np.full(values.shape, np.nan)
+    n = len(values)
+    if length < 1 or n < length:
+        return result
+    
+    y, cum_y, cum_nan = prefix if prefix is not None else _linreg_prefix(values)
+    
+    # Pencere toplamları (k. pencere: [k, k + length))
+    sum_y = cum_y[length:] - cum_y[:-length]
+    has_nan = (cum_nan[length:] - cum_nan[:-length]) > 0
+    
+    # Σx·y (x = 0..length-1): Pencere bir bar kayınca eski noktalar bir sola kayar,
+    # en eski nokta düşer, yeni nokta x = length - 1 ile eklenir
+    x = np.arange(length, dtype=float).reshape((-1,) + (1,) * (values.ndim - 1))
+    first_xy = (x * y[:length]).sum(axis=0)
+    step = (length - 1) * y[length:] - (sum_y[:-1] - y[:n - length])
+    sum_xy = np.concatenate([first_xy[None], first_xy + np.cumsum(step, axis=0)])
+    
+    if length == 1:
+        value = sum_y
+    else:
+        sum_x = length * (length - 1) / 2
+        sum_xx = (length - 1) * length * (2 * length - 1) / 6
+        slope = (length * sum_xy - sum_x * sum_y) / (length * sum_xx - sum_x ** 2)
+        intercept = (sum_y - slope * sum_x) / length
+        value = intercept + slope * (length - 1 - offset)
     
-    return lrb
+    result[length - 1:] = np.where(has_nan, np.nan, value)
+    return result
 
 def calculate_zlma(df, period, smooth):
     """ZLMA (Zero Lag Moving Average) - Pine Script ile birebir aynı"""
@@ -180,76 +334,75 @@ def calculate_zlma(df, period, smooth):
     
     return zlma
 
-def detect_hhll_trend(df, left_bars, right_bars):
+def _window_extreme(values, bars, side, func):
+    """
+    Her bar için komşu penceredeki NaN'sız max/min (pandas rolling, O(n)).
+    side='left': [i - bars, i), side='right': (i, i + bars]. Komşu yoksa NaN.
+    """
+    series = pd.Series(values)
+    if bars <= 0:
+        return np.full(len(values), np.nan)
+    if side == 'right':
+        series = series[::-1].reset_index(drop=True)
+    extreme = getattr(series.shift(1).rolling(window=bars, min_periods=1), func)().to_numpy()
+    return extreme[::-1] if side == 'right' else extreme
+
+def find_pivots(high, low, left_bars, right_bars):
+    """
+    Pivot high / low maskeleri (kayan pencere max/min ile vektörel).
+    Pivot high: Soldaki barların hepsi < high[i], sağdakilerin hepsi <= high[i].
+    Pivot low: Soldaki barların hepsi > low[i], sağdakilerin hepsi >= low[i].
+    NaN karşılaştırmaları (eski döngüdeki gibi) pivotu engellemez.
+    """
+    n = len(high)
+    with np.errstate(invalid='ignore'):
+        pivot_high = (
+            ~(_window_extreme(high, left_bars, 'left', 'max') >= high) &
+            ~(_window_extreme(high, right_bars, 'right', 'max') > high)
+        )
+        pivot_low = (
+            ~(_window_extreme(low, left_bars, 'left', 'min') <= low) &
+            ~(_window_extreme(low, right_bars, 'right', 'min') < low)
+        )
+    
+    # Pencereleri tam olmayan kenar barlar pivot olamaz
+    edges = np.ones(n, dtype=bool)
+    edges[left_bars:max(n - right_bars, left_bars)] = False
+    pivot_high[edges] = False
+    pivot_low[edges] = False
+    return pivot_high, pivot_low
+
+def detect_hhll_trend(df, left_bars, right_bars, pivots=None):
     """
     HHLL Trend Detection - Pine Script mantığına uygun
     Higher Highs/Higher Lows vs Lower Highs/Lower Lows
     Returns: 1 for uptrend, 0 for downtrend
+    pivots: find_pivots sonucu (parametre taramalarında tekrar kullanmak için)
     """
-    high = df['HIGH_TL'].values
-    low = df['LOW_TL'].values
-    close = df['CLOSING_TL'].values
-    
-    n = len(df)
-    trend = np.zeros(n)
-    
-    # Pivot high ve low tespiti
-    pivot_highs = []
-    pivot_lows = []
-    
-    for i in range(left_bars, n - right_bars):
-        # Pivot High kontrolü
-        is_pivot_high = True
-        for j in range(i - left_bars, i):
-            if high[j] >= high[i]:
-                is_pivot_high = False
-                break
-        for j in range(i + 1, i + right_bars + 1):
-            if high[j] > high[i]:
-                is_pivot_high = False
-                break
-        
-        if is_pivot_high:
-            pivot_highs.append((i, high[i]))
-        
-        # Pivot Low kontrolü
-        is_pivot_low = True
-        for j in range(i - left_bars, i):
-            if low[j] <= low[i]:
-                is_pivot_low = False
-                break
-        for j in range(i + 1, i + right_bars + 1):
-            if low[j] < low[i]:
-                is_pivot_low = False
-                break
-        
-        if is_pivot_low:
-            pivot_lows.append((i, low[i]))
-    
-    # Resistance ve support seviyeleri
-    resistance = np.full(n, np.nan)
-    support = np.full(n, np.nan)
+    high = df['HIGH_TL'].to_numpy(dtype=float)
+    low = df['LOW_TL'].to_numpy(dtype=float)
+    close = df['CLOSING_TL'].to_numpy(dtype=float)
     
-    for i, val in pivot_highs:
-        resistance[i:] = val
+    pivot_high, pivot_low = pivots if pivots is not None else find_pivots(high, low, left_bars, right_bars)
     
-    for i, val in pivot_lows:
-        support[i:] = val
+    # Resistance ve support: Son pivotun seviyesi bir sonraki pivota kadar geçerli
+    resistance = pd.Series(np.where(pivot_high, high, np.nan)).ffill().to_numpy()
+    support = pd.Series(np.where(pivot_low, low, np.nan)).ffill().to_numpy()
     
-    # Forward fill
-    resistance = pd.Series(resistance).fillna(method='ffill').values
-    support = pd.Series(support).fillna(method='ffill').values
+    # Trend belirleme: 1 = uptrend, 0 = downtrend, aksi halde önceki durum korunur
+    with np.errstate(invalid='ignore'):
+        state = np.full(len(close), np.nan)
+        state[close < support] = 0
+        state[close > resistance] = 1
+    trend = pd.Series(state, index=df.index).ffill().fillna(0)
     
-    # Trend belirleme: 1 = uptrend, 0 = downtrend
-    for i in range(n):
-        if not np.isnan(resistance[i]) and close[i] > resistance[i]:
-            trend[i] = 1
-        elif not np.isnan(support[i]) and close[i] < support[i]:
-            trend[i] = 0
-        elif i > 0:
-            trend[i] = trend[i-1]
-    
-    return pd.Series(trend, index=df.index)
+    return trend
+
+# Label'ı belirleyen binary kolonlar (hepsi 1 -> ALIM, hepsi 0 -> SATIM)
+LABEL_COLUMNS = [
+    'FINH_PriceAbove', 'KAMA_PriceAbove', 'BlueLine_PriceAbove', 'LRB_PriceAbove',
+    'OVT_Slope', 'ZLMA_Slope', 'HHLL_Trend'
+]
 
 def calculate_label(df):
     """
@@ -273,42 +426,19 @@ def calculate_label(df):
     - ZLMA eğimi negatif (0)
     - HHLL downtrend (0)
     """
-    label = pd.Series(0, index=df.index, dtype=int)
-    
+    buy_conditions = np.ones(len(df), dtype=bool)
+    sell_conditions = np.ones(len(df), dtype=bool)
+    for col in LABEL_COLUMNS:
+        values = df[col].to_numpy()
+        buy_conditions &= values == 1
+        sell_conditions &= values == 0
+    
+    # State machine: ALIM -> 1, SATIM -> 0, hiçbiri sağlanmıyorsa önceki durum korunur
     # Başlangıç durumu: 0
-    current_label = 0
-    
-    for i in range(len(df)):
-        # ALIM koşulları kontrolü
-        buy_conditions = (
-            df['FINH_PriceAbove'].iloc[i] == 1 and
-            df['KAMA_PriceAbove'].iloc[i] == 1 and
-            df['BlueLine_PriceAbove'].iloc[i] == 1 and
-            df['LRB_PriceAbove'].iloc[i] == 1 and
-            df['OVT_Slope'].iloc[i] == 1 and
-            df['ZLMA_Slope'].iloc[i] == 1 and
-            df['HHLL_Trend'].iloc[i] == 1
-        )
-        
-        # SATIM koşulları kontrolü
-        sell_conditions = (
-            df['FINH_PriceAbove'].iloc[i] == 0 and
-            df['KAMA_PriceAbove'].iloc[i] == 0 and
-            df['BlueLine_PriceAbove'].iloc[i] == 0 and
-            df['LRB_PriceAbove'].iloc[i] == 0 and
-            df['OVT_Slope'].iloc[i] == 0 and
-            df['ZLMA_Slope'].iloc[i] == 0 and
-            df['HHLL_Trend'].iloc[i] == 0
-        )
-        
-        # State machine mantığı
-        if buy_conditions:
-            current_label = 1
-        elif sell_conditions:
-            current_label = 0
-        # Eğer hiçbir koşul sağlanmıyorsa mevcut durumu koru
-        
-        label.iloc[i] = current_label
+    state = np.full(len(df), np.nan)
+    state[sell_conditions] = 0
+    state[buy_conditions] = 1
+    label = pd.Series(state, index=df.index).ffill().fillna(0).astype(int)
     
     return label
 
@@ -316,128 +446,384 @@ def calculate_label(df):
 # FİLTRE HESAPLAMA
 # ============================================
 
-def calculate_all_filters(df, config, is_inference=False):
-    """Tüm filtreleri hesapla ve eğimlerini ekle"""
+INDICATORS = ['FINH', 'KAMA', 'BlueLine', 'OVT', 'LRB', 'ZLMA']
+
+
+def get_output_columns(config, columns=None):
+    """
+    calculate_all_filters çıktısındaki kolonlar (sıralı).
+    columns (veya config['feature_columns']) verilirse CODE, DATE + istenen kolonlar;
+    varsayılan çıktıda olanlar varsayılan sırayla, diğerleri (örn. FINH_Slope) sonda.
+    """
+    if columns is None:
+        columns = config['feature_columns']
+    all_columns = _default_output_columns(config)
+    if columns is None:
+        return all_columns
+    
+    requested = list(dict.fromkeys(columns))
+    selected = ['CODE', 'DATE'] + [col for col in all_columns if col in requested and col not in ('CODE', 'DATE')]
+    return selected + [col for col in requested if col not in selected]
+
+
+def _default_output_columns(config):
+    """Varsayılan (tam) çıktı kolonları"""
+    output_columns = [
+        'CODE', 'DATE', 'CLOSING_TL', 'LOW_TL', 'HIGH_TL', 
+        'VOL_Rel',  # Normalize edilmiş Hacim
+    ]
+    
+    # İndikatör bazlı kolonları ekle
+    for ind in INDICATORS:
+        # Temel Değer
+        output_columns.append(ind)
+        # Continuous Features
+        output_columns.append(f'{ind}_Dist_Pct')
+        output_columns.append(f'{ind}_Slope_Rate')
+        # Binary Feature (İstek üzerine eklendi)
+        output_columns.append(f'{ind}_PriceAbove')
+        
+        # Lag Features
+        for lag in config['lag_days']:
+            output_columns.append(f'{ind}_Dist_Pct_Lag{lag}')
+            output_columns.append(f'{ind}_Slope_Rate_Lag{lag}')
+            
+    # HHLL ve Lagleri
+    output_columns.append('HHLL_Trend')
+    for lag in config['lag_days']:
+        output_columns.append(f'HHLL_Trend_Lag{lag}')
+        
+    # Feature ve Target
+    output_columns.append('Current_Trend')
+    output_columns.extend(get_target_columns(config))
+    return output_columns
+
+
+def validate_target_horizons(horizons):
+    """target_horizons boş olmayan, pozitif tam sayı listesi olmalı; değilse ValueError"""
+    if not isinstance(horizons, (list, tuple)) or not horizons:
+        raise ValueError(f"target_horizons boş olmayan bir liste olmalı: {horizons!r}")
+    invalid = [h for h in horizons if isinstance(h, bool) or not isinstance(h, (int, np.integer)) or h <= 0]
+    if invalid:
+        raise ValueError(f"target_horizons pozitif tam sayılardan oluşmalı, geçersiz: {invalid}")
+    return list(horizons)
+
+
+def get_target_columns(config):
+    """Hedef kolonları: her ufuk için TARGET_{h}D (ufuklar burada doğrulanır)"""
+    return [f'TARGET_{h}D' for h in validate_target_horizons(config['target_horizons'])]
+
+
+def horizon_output_file(output_file, horizon):
+    """Ufuk bazlı eğitim dosyası adı (ml_filtre_verileri.parquet -> ml_filtre_verileri_5_gun.parquet)"""
+    base, ext = os.path.splitext(output_file)
+    return f"{base}_{horizon}_gun{ext}"
+
+
+# --------------------------------------------
+# Feature kaydı: Her kolon bağımlılıklarıyla birlikte tanımlanır.
+# calculate_all_filters sadece istenen kolonlar ve onların bağımlılıklarını hesaplar.
+# --------------------------------------------
+
+# Hesaplama aşamaları (kayıt sırası aşama sırasıdır, bağımlılıklar hep önceki kayıtlardadır)
+FEATURE_STAGES = [
+    ('indicator', "İndikatörler hesaplanıyor"),
+    ('derived', "Türetilmiş özellikler (Dist, Slope, Above) hesaplanıyor"),
+    ('lag', "Lag (gecikme) özellikleri hesaplanıyor"),
+    ('label', "Label ve Target hesaplanıyor"),
+]
+
+# Girdi kolonları (hesaplanmaz, her zaman mevcut)
+INPUT_COLUMNS = ['CODE', 'DATE', 'CLOSING_TL', 'LOW_TL', 'HIGH_TL', 'VOLUME_TL']
+
+
+def build_feature_registry(config):
+    """{kolon: (aşama, bağımlılıklar, fn(df) -> Series)} - ekleme sırası bağımlılık sırasıdır"""
+    registry = {}
     
-    df = df.copy()
-    df = df.sort_values('DATE').reset_index(drop=True)
+    def register(name, stage, deps, compute):
+        registry[name] = (stage, deps, compute)
     
     # --- D. Hacim Normalizasyonu (Relative Volume) ---
     # Son 10 günün ortalama hacmine oranı
     # Eğer o günkü hacim ortalamanın 2 katıysa 2.0, yarısıysa 0.5 olur.
-    vol_ma = df['VOLUME_TL'].rolling(window=10).mean()
-    df['VOL_Rel'] = df['VOLUME_TL'] / vol_ma
-    
-    # ----------------------------------------------------------------
-    # GÖSTERGELERİN HESAPLANMASI
-    # ----------------------------------------------------------------
-    
-    indicators = ['FINH', 'KAMA', 'BlueLine', 'OVT', 'LRB', 'ZLMA']
+    register('VOL_Rel', 'indicator', [],
+             lambda df: df['VOLUME_TL'] / df['VOLUME_TL'].rolling(window=10).mean())
     
     # 1. Temel İndikatör Hesaplamaları
-    print("   - İndikatörler hesaplanıyor...", end=" ")
-    df['FINH'] = calculate_finh(df, config['finh_period'])
-    df['KAMA'] = calculate_kama(df, config['kama_period'])
-    df['BlueLine'] = calculate_blueline(df, config['blueline_period'])
-    df['OVT'] = calculate_ovt(df, config['ovt_period'])
-    df['LRB'] = calculate_lrb(df, config['lrb_period'])
-    df['ZLMA'] = calculate_zlma(df, config['zlma_period'], config['zlma_smooth'])
-    df['HHLL_Trend'] = detect_hhll_trend(df, config['hhll_left_bars'], config['hhll_right_bars'])
-    print("✓")
+    register('FINH', 'indicator', [], lambda df: calculate_finh(df, config['finh_period']))
+    register('KAMA', 'indicator', [], lambda df: calculate_kama(df, config['kama_period']))
+    register('BlueLine', 'indicator', [], lambda df: calculate_blueline(df, config['blueline_period']))
+    register('OVT', 'indicator', [], lambda df: calculate_ovt(df, config['ovt_period']))
+    register('LRB', 'indicator', [], lambda df: calculate_lrb(df, config['lrb_period']))
+    register('ZLMA', 'indicator', [],
+             lambda df: calculate_zlma(df, config['zlma_period'], config['zlma_smooth']))
+    register('HHLL_Trend', 'indicator', [],
+             lambda df: detect_hhll_trend(df, config['hhll_left_bars'], config['hhll_right_bars']))
     
     # 2. Türetilmiş Özellikler (Dist, Slope, Above)
-    print("   - Türetilmiş özellikler (Dist, Slope, Above) hesaplanıyor...", end=" ")
-    for ind in indicators:
+    for ind in INDICATORS:
         # Binary Slope (Label için)
-        df[f'{ind}_Slope'] = (df[f'{ind}'].diff() > 0).astype(int)
+        register(f'{ind}_Slope', 'derived', [ind],
+                 lambda df, ind=ind: (df[ind].diff() > 0).astype(int))
         
         # Binary Price Above (Label ve Feature için)
-        df[f'{ind}_PriceAbove'] = (df['CLOSING_TL'] > df[f'{ind}']).astype(int)
+        register(f'{ind}_PriceAbove', 'derived', [ind],
+                 lambda df, ind=ind: (df['CLOSING_TL'] > df[ind]).astype(int))
         
         # Continuous Distance Pct (ML için)
         # (Fiyat - Filtre) / Filtre
-        df[f'{ind}_Dist_Pct'] = (df['CLOSING_TL'] - df[f'{ind}']) / df[f'{ind}']
+        register(f'{ind}_Dist_Pct', 'derived', [ind],
+                 lambda df, ind=ind: (df['CLOSING_TL'] - df[ind]) / df[ind])
         
         # Continuous Slope Rate (ML için)
         # İndikatörün yüzdesel değişimi
-        df[f'{ind}_Slope_Rate'] = df[f'{ind}'].pct_change()
-    print("✓")
+        register(f'{ind}_Slope_Rate', 'derived', [ind],
+                 lambda df, ind=ind: df[ind].pct_change())
     
     # 3. Lag (Gecikme) Özellikleri
     # Dist_Pct, Slope_Rate ve HHLL_Trend için gecikmeli veriler
-    print("   - Lag (gecikme) özellikleri hesaplanıyor...", end=" ")
     features_to_lag = ['HHLL_Trend']
-    for ind in indicators:
+    for ind in INDICATORS:
         features_to_lag.append(f'{ind}_Dist_Pct')
         features_to_lag.append(f'{ind}_Slope_Rate')
-        
+    
     for lag in config['lag_days']:
         for col in features_to_lag:
-            df[f'{col}_Lag{lag}'] = df[col].shift(lag)
-    print("✓")
-
+            register(f'{col}_Lag{lag}', 'lag', [col],
+                     lambda df, col=col, lag=lag: df[col].shift(lag))
+    
     # Label hesaplama - State Machine mantığı
     # NOT: Label hesaplarken yukarıdaki Binary (0/1) kolonları kullanır.
-    print("   - Label ve Target hesaplanıyor...", end=" ")
-    
     # 1. Mevcut Trend Durumu (Feature olarak kullanılacak)
-    df['Current_Trend'] = calculate_label(df)
+    register('Current_Trend', 'label', list(LABEL_COLUMNS), calculate_label)
     
-    # 2. Hedef Değişken (3 Gün sonraki trend ne olacak?)
-    df['TARGET_3D'] = df['Current_Trend'].shift(-3)
+    # 2. Hedef Değişkenler (h gün sonraki trend ne olacak?)
+    # Tüm ufuklar aynı Current_Trend'den kaydırılır, indikatörler bir kez hesaplanır
+    for horizon, target_col in zip(config['target_horizons'], get_target_columns(config)):
+        register(target_col, 'label', ['Current_Trend'],
+                 lambda df, horizon=horizon: df['Current_Trend'].shift(-horizon))
     
-    print("✓")
-    
-    # Warm-up periyodundan sonraki verileri al
-    # Lag'ler oluştuğu için en büyük lag kadar ekstra veri atmamız gerekebilir ama
-    # warmup_bars (300) zaten 3 günlük lag'i (3) fazlasıyla kapsıyor.
-    warmup_bars = config['warmup_bars']
+    return registry
+
+
+def resolve_features(columns, registry):
+    """İstenen kolonlar için hesaplanması gereken kayıtlar (bağımlılıklar dahil, kayıt sırasıyla)"""
+    needed = set()
+    stack = [col for col in columns if col not in INPUT_COLUMNS]
+    while stack:
+        col = stack.pop()
+        if col in needed:
+            continue
+        if col not in registry:
+            raise ValueError(f"Bilinmeyen feature kolonu: {col}")
+        needed.add(col)
+        stack.extend(registry[col][1])
+    return [col for col in registry if col in needed]
+
+
+def _no_profile(code, stage, column):
+    return nullcontext()
+
+
+def calculate_all_filters(df, config, is_inference=False, verbose=True, columns=None, profiler=None):
+    """
+    Tüm filtreleri hesapla ve eğimlerini ekle.
+    columns: Sadece bu kolonları (ve bağımlılıklarını) hesapla; None ise
+    config['feature_columns'], o da None ise tüm çıktı kolonları.
+    profiler: FeatureProfiler verilirse her kolonun süresi ve bellek tahsisi kaydedilir
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    measure = profiler.measure if profiler is not None else _no_profile
+    code = str(df['CODE'].iloc[0]) if 'CODE' in df.columns and len(df) else ''
+    
+    with measure(code, 'prepare', 'prepare'):
+        df = df.copy()
+        df = df.sort_values('DATE').reset_index(drop=True)
+    
+    output_columns = get_output_columns(config, columns)
+    registry = build_feature_registry(config)
+    to_compute = resolve_features(output_columns, registry)
+    
+    # Aşama aşama hesapla (bağımlılıklar önceki aşamalarda veya aynı aşamada önce)
+    # Girdide hazır gelen göstergeler (panel motoru) tekrar hesaplanmaz
+    to_compute = [col for col in to_compute if col not in df.columns]
+    for stage, message in FEATURE_STAGES:
+        stage_columns = [col for col in to_compute if registry[col][0] == stage]
+        if not stage_columns:
+            continue
+        log(f"   - {message}...", end=" ")
+        for col in stage_columns:
+            with measure(code, stage, col):
+                df[col] = registry[col][2](df)
+        log("✓")
+    
+    with measure(code, 'output', 'output'):
+        # Warm-up periyodundan sonraki verileri al
+        # Lag'ler oluştuğu için en büyük lag kadar ekstra veri atmamız gerekebilir ama
+        # warmup_bars (300) zaten 3 günlük lag'i (3) fazlasıyla kapsıyor.
+        warmup_bars = config['warmup_bars']
+    
+        if is_inference:
+            # Inference modunda son satırları silmiyoruz (Tahmin yapacağız)
+            # Sadece warm-up kısmını atıyoruz
+            df_output = df.iloc[warmup_bars:].copy()
+        else:
+            # Eğitim modunda hiçbir Target'ı olmayan son satırları atıyoruz (en kısa ufuk kadar)
+            # Daha uzun ufukların son (h - en kısa ufuk) satırı NaN kalır, ufuk bazlı dosyada atılır
+            shortest = min(validate_target_horizons(config['target_horizons']))
+            df_output = df.iloc[warmup_bars:len(df) - shortest].copy()
     
-    if is_inference:
-        # Inference modunda son satırları silmiyoruz (Tahmin yapacağız)
-        # Sadece warm-up kısmını atıyoruz
-        df_output = df.iloc[warmup_bars:].copy()
-    else:
-        # Eğitim modunda Target olmayan son 3 satırı atıyoruz
-        # Hem warmup kısmını atıyoruz hem de son 3 satırı
-        df_output = df.iloc[warmup_bars:-3].copy()
+        # Sadece mevcut kolonları seç (Hata olmaması için kontrol)
+        output_columns = [col for col in output_columns if col in df_output.columns]
     
-    # ÇIKTI KOLONLARI
-    output_columns = [
-        'CODE', 'DATE', 'CLOSING_TL', 'LOW_TL', 'HIGH_TL', 
-        'VOL_Rel',  # Normalize edilmiş Hacim
-    ]
+        df_output = df_output[output_columns].reset_index(drop=True)
     
-    # İndikatör bazlı kolonları ekle
-    for ind in indicators:
-        # Temel Değer
-        output_columns.append(ind)
-        # Continuous Features
-        output_columns.append(f'{ind}_Dist_Pct')
-        output_columns.append(f'{ind}_Slope_Rate')
-        # Binary Feature (İstek üzerine eklendi)
-        output_columns.append(f'{ind}_PriceAbove')
-        
-        # Lag Features
-        for lag in config['lag_days']:
-            output_columns.append(f'{ind}_Dist_Pct_Lag{lag}')
-            output_columns.append(f'{ind}_Slope_Rate_Lag{lag}')
-            
-    # HHLL ve Lagleri
-    output_columns.append('HHLL_Trend')
-    for lag in config['lag_days']:
-        output_columns.append(f'HHLL_Trend_Lag{lag}')
-        
-    # Feature ve Target
-    output_columns.append('Current_Trend')
-    output_columns.append('TARGET_3D')
+        if config['compact_dtypes']:
+            # CODE hisse bazında str kalır; birleştirmeden sonra kategorik yapılır
+            df_output = compact_feature_dtypes(df_output, categorical_code=False)
     
-    # Sadece mevcut kolonları seç (Hata olmaması için kontrol)
-    output_columns = [col for col in output_columns if col in df_output.columns]
+    return df_output
+
+# ============================================
+# PARALEL HESAPLAMA
+# ============================================
+
+def _frame_to_arrays(df):
+    """DataFrame'i (CODE hariç) kolon adı + NumPy dizisi listesine çevirir (process'ler arası taşıma için)"""
+    columns = [col for col in df.columns if col != 'CODE']
+    return columns, [df[col].to_numpy() for col in columns]
+
+def _arrays_to_frame(code, columns, arrays):
+    """_frame_to_arrays çıktısından DataFrame'i geri kurar, CODE ilk kolona eklenir"""
+    df = pd.DataFrame(dict(zip(columns, arrays)))
+    df.insert(0, 'CODE', code)
+    return df
+
+def _compute_stock_task(task):
+    """Process havuzu işçisi: Tek hisse için calculate_all_filters, hatayı yakalayıp döndürür"""
+    code, columns, arrays, config, is_inference, profile = task
+    profiler = FeatureProfiler(trace_memory=profile == 'memory') if profile else None
+    records = []
+    try:
+        stock_df = _arrays_to_frame(code, columns, arrays)
+        output = calculate_all_filters(stock_df, config, is_inference=is_inference, verbose=False,
+                                       profiler=profiler)
+        payload, error = _frame_to_arrays(output), None
+    except Exception:
+        payload, error = None, traceback.format_exc()
+    if profiler is not None:
+        records = profiler.records
+    return code, payload, error, records
+
+# Feature çıktısını etkilemeyen ayarlar (önbellek anahtarına girmez)
+_NON_FEATURE_KEYS = {'input_file', 'universe', 'output_file', 'excel_export', 'n_workers',
+                     'feature_cache', 'feature_cache_dir', 'feature_cache_max_mb',
+                     'profile', 'profile_output'}
+
+# Feature çıktısını belirleyen kaynak dosyalar: Hesaplama kodu (bu dosya), panel motoru,
+# hisse gruplama, kompakt tipler (data_store) ve önbellek biçimi (feature_cache).
+# Biri değişirse önbellek de geçersiz olur.
+_SOURCE_FILES = ['generate_ml_features.py', 'panel_indicators.py', 'stock_groups.py',
+                 'data_store.py', 'feature_cache.py']
+
+def _source_hash():
+    digest = hashlib.sha256()
+    # Kütüphane sürümleri de sonucu etkileyebilir (ewm, rolling vb.)
+    digest.update(f"pandas={pd.__version__};numpy={np.__version__}".encode('utf-8'))
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in _SOURCE_FILES:
+        with open(os.path.join(source_dir, name), 'rb') as source:
+            digest.update(name.encode('utf-8'))
+            digest.update(source.read())
+    return digest.hexdigest()
+
+_SOURCE_HASH = _source_hash()
+
+def feature_params(config, is_inference):
+    """Önbellek anahtarı için feature'ları belirleyen parametreler"""
+    params = {key: value for key, value in config.items() if key not in _NON_FEATURE_KEYS}
+    params['is_inference'] = is_inference
+    params['source'] = _SOURCE_HASH
+    return params
+
+def compute_features(stock_frames, config, is_inference=False, n_workers=1, on_result=None, cache=None,
+                     profiler=None):
+    """
+    Birden fazla hisse için calculate_all_filters.
+    stock_frames: [(code, DataFrame)] listesi
+    n_workers: 1 ise sıralı, >1 ise process havuzu, None ise tüm çekirdekler
+    on_result: Her hisse bittiğinde (idx, code, DataFrame veya None, hata) ile çağrılır
+    cache: FeatureCache verilirse girdisi ve parametreleri değişmeyen hisseler önbellekten okunur
+    profiler: FeatureProfiler verilirse işçilerin kolon bazlı süre / bellek kayıtları ona eklenir
+    Returns: ([(code, DataFrame)] giriş sırasıyla, {code: traceback} hatalar)
+    
+    Hisseler işçilere ve geri DataFrame yerine kolon dizileri olarak taşınır;
+    hata veren hisse çalışmayı durdurmaz, hatalar sözlüğünde toplanır.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    
+    outputs = {}
+    errors = {}
+    keys = {}
+    done = 0
+    
+    if cache is not None:
+        params = feature_params(config, is_inference)
+        for code, stock_df in stock_frames:
+            keys[code] = cache.make_key(code, stock_df, params, columns=['DATE'] + PRICE_COLUMNS)
+            output = cache.get(code, keys[code])
+            if output is not None:
+                outputs[code] = output
+                done += 1
+                if on_result is not None:
+                    on_result(done, code, output, None)
+    
+    pending = [(code, stock_df) for code, stock_df in stock_frames if code not in outputs]
+    if config.get('indicator_engine', 'stock') == 'panel' and pending:
+        # Önbellekte olmayan hisselerin göstergeleri tüm evren için tek geçişte hesaplanır
+        from panel_indicators import PANEL_INDICATORS, add_panel_indicators
+        needed = resolve_features(get_output_columns(config), build_feature_registry(config))
+        names = [name for name in PANEL_INDICATORS if name in needed]
+        with (profiler.measure(PANEL_CODE, 'indicator', 'panel') if profiler is not None else nullcontext()):
+            pending = add_panel_indicators(pending, config, names)
+    
+    # İşçiler kendi profiler'ını kurar ('memory': tracemalloc ile tepe bellek de ölçülür)
+    profile = None
+    if profiler is not None:
+        profile = 'memory' if profiler.trace_memory else 'time'
+    tasks = [(code, *_frame_to_arrays(stock_df), config, is_inference, profile)
+             for code, stock_df in pending]
+    
+    def collect(idx, outcome):
+        code, payload, error, records = outcome
+        if profiler is not None:
+            profiler.merge(records)
+        output = _arrays_to_frame(code, *payload) if payload is not None else None
+        if error is not None:
+            errors[code] = error
+        else:
+            outputs[code] = output
+            if cache is not None:
+                cache.put(code, keys[code], output)
+        if on_result is not None:
+            on_result(done + idx, code, output, error)
+    
+    if n_workers > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (n_workers * 4))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            # map() sonuçları giriş sırasıyla döndürür (deterministik çıktı)
+            for idx, outcome in enumerate(executor.map(_compute_stock_task, tasks, chunksize=chunksize), 1):
+                collect(idx, outcome)
+    else:
+        for idx, task in enumerate(tasks, 1):
+            collect(idx, _compute_stock_task(task))
     
-    df_output = df_output[output_columns].reset_index(drop=True)
+    if cache is not None and tasks:
+        cache.evict()
     
-    return df_output
+    results = [(code, outputs[code]) for code, _ in stock_frames if code in outputs]
+    return results, errors
 
 # ============================================
 # ANA FONKSİYON
@@ -453,6 +839,7 @@ def main():
     print("\n📋 PARAMETRELİK AYARLAR:")
     print(f"   Warm-up Bars: {CONFIG['warmup_bars']}")
     print(f"   Lag Days: {CONFIG['lag_days']}")
+    print(f"   Target Horizons: {CONFIG['target_horizons']}")
     print(f"   FINH Period: {CONFIG['finh_period']}")
     print(f"   KAMA Period: {CONFIG['kama_period']}")
     print(f"   BlueLine Period: {CONFIG['blueline_period']}")
@@ -463,57 +850,90 @@ def main():
     
     # Veriyi oku
     print(f"\n📂 Dosya okunuyor: {CONFIG['input_file']}")
-    df = pd.read_excel(CONFIG['input_file'])
+    df = load_universe(CONFIG['universe'], CONFIG['input_file'])
     
-    # Tarih formatını düzenle
-    df['DATE'] = pd.to_datetime(df['DATE'])
+    # Depo float32 tutar, indikatörler float64 hassasiyetle hesaplanır
+    df[PRICE_COLUMNS] = df[PRICE_COLUMNS].astype('float64')
     
     print(f"✅ Toplam {len(df)} satır veri yüklendi")
     print(f"📊 Hisse sayısı: {df['CODE'].nunique()}")
     print(f"📅 Veri tarih aralığı: {df['DATE'].min().date()} - {df['DATE'].max().date()}")
     
-    # Her hisse için filtre hesapla
-    all_results = []
+    # Her hisse için filtre hesapla (Veri bir kez CODE, DATE sırasına dizilir)
+    groups = StockGroups(df)
+    total_stocks = len(groups)
     
-    stocks = sorted(df['CODE'].unique())
-    total_stocks = len(stocks)
+    # Minimum veri kontrolü
+    min_required = CONFIG['warmup_bars'] + 50  # Warm-up + minimum işlenebilir veri
     
-    for idx, stock in enumerate(stocks, 1):
-        print(f"\n[{idx}/{total_stocks}] {stock} işleniyor...")
-        
-        stock_df = df[df['CODE'] == stock].copy().sort_values('DATE').reset_index(drop=True)
-        
-        # Minimum veri kontrolü
-        min_required = CONFIG['warmup_bars'] + 50  # Warm-up + minimum işlenebilir veri
-        
+    stock_frames = []
+    for stock, stock_df in groups:
         if len(stock_df) < min_required:
-            print(f"   ⚠ Yetersiz veri ({len(stock_df)} < {min_required})")
-            continue
-        
-        try:
-            # Filtreleri hesapla
-            stock_output = calculate_all_filters(stock_df, CONFIG)
-            
-            print(f"   ✅ Tamamlandı ({len(stock_output)} satır çıktı)")
-            
-            all_results.append(stock_output)
-            
-        except Exception as e:
-            print(f"   ❌ Hata: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            print(f"   ⚠ {stock}: Yetersiz veri ({len(stock_df)} < {min_required})")
             continue
+        stock_frames.append((stock, stock_df))
+    
+    print(f"\n🔄 {len(stock_frames)}/{total_stocks} hisse işleniyor (işçi sayısı: {CONFIG['n_workers'] or os.cpu_count()})...")
+    
+    def report(idx, stock, stock_output, error):
+        if error is not None:
+            print(f"[{idx}/{len(stock_frames)}] {stock} ❌ Hata:\n{error}")
+        else:
+            print(f"[{idx}/{len(stock_frames)}] {stock} ✅ Tamamlandı ({len(stock_output)} satır çıktı)")
+    
+    cache = None
+    if CONFIG['feature_cache']:
+        cache = FeatureCache(CONFIG['feature_cache_dir'], CONFIG['feature_cache_max_mb'] * 1024 ** 2)
+    
+    profiler = FeatureProfiler() if CONFIG['profile'] else None
+    
+    results, errors = compute_features(stock_frames, CONFIG, n_workers=CONFIG['n_workers'],
+                                       on_result=report, cache=cache, profiler=profiler)
+    if cache is not None:
+        print(f"\n♻️ Feature önbelleği: {cache.hits} hisse önbellekten okundu, {cache.misses} hisse hesaplandı")
+    all_results = [stock_output for _, stock_output in results]
+    
+    if errors:
+        print(f"\n⚠️ {len(errors)} hisse hata nedeniyle atlandı: {', '.join(errors)}")
+    
+    if profiler is not None and profiler.records:
+        print("\n⏱️ GÖSTERGE BAZLI PROFİL:")
+        print(profiler.summary().round(3).to_string())
+        paths = profiler.export(CONFIG['profile_output'])
+        print(f"💾 Profil kaydedildi: {', '.join(paths)}")
     
     # Tüm sonuçları birleştir
     if len(all_results) > 0:
         final_df = pd.concat(all_results, ignore_index=True)
+        if CONFIG['compact_dtypes']:
+            final_df = compact_feature_dtypes(final_df)
+        
+        # Parquet feature seti olarak kaydet (şema ve üretim parametreleri metadata'da)
+        target_cols = [col for col in get_target_columns(CONFIG) if col in final_df.columns]
+        params = feature_params(CONFIG, is_inference=False)
         
-        # Excel'e kaydet
-        final_df.to_excel(CONFIG['output_file'], index=False)
+        def save(frame, path, targets):
+            write_feature_set(frame, path, targets=targets, params=params)
+            if CONFIG['excel_export']:
+                frame.to_excel(os.path.splitext(path)[0] + '.xlsx', index=False)
+        
+        save(final_df, CONFIG['output_file'], target_cols)
         
         print("\n" + "=" * 60)
         print(f"✅ Veri seti oluşturuldu!")
         print(f"💾 Sonuçlar kaydedildi: {CONFIG['output_file']}")
+        
+        # Her ufuk için sadece kendi hedefini içeren eğitim dosyası (tek ufukta da yazılır,
+        # run_autogluon ufukları şemadaki hedeflerden okuyup bu dosyalardan eğitir)
+        # (Diğer ufukların hedefleri geleceği içerdiği için feature olarak bırakılmaz)
+        for horizon, target_col in zip(CONFIG['target_horizons'], get_target_columns(CONFIG)):
+            if target_col not in target_cols:
+                continue
+            horizon_df = final_df.drop(columns=[col for col in target_cols if col != target_col])
+            horizon_df = horizon_df.dropna(subset=[target_col])
+            horizon_file = horizon_output_file(CONFIG['output_file'], horizon)
+            save(horizon_df, horizon_file, [target_col])
+            print(f"💾 {horizon} günlük hedef: {horizon_file} ({len(horizon_df):,} satır)")
         print("=" * 60)
         
         # Özet istatistikler
@@ -522,15 +942,17 @@ def main():
         print(f"   Hisse Sayısı: {final_df['CODE'].nunique()}")
         print(f"   Tarih Aralığı: {final_df['DATE'].min().date()} - {final_df['DATE'].max().date()}")
         print(f"\n   Kolon Sayısı: {len(final_df.columns)}")
+        print(f"   Bellek Kullanımı: {final_df.memory_usage(deep=True).sum() / 1024 ** 2:,.1f} MB")
         
         # Label dağılımı
-        print(f"\n   📈 TARGET_3D (HEDEF) DAĞILIMI:")
-        # TARGET_3D float olabilir (shift yüzünden), int'e çevirelim veya direkt sayalım
-        label_counts = final_df['TARGET_3D'].value_counts().sort_index()
-        for label_val, count in label_counts.items():
-            pct = (count / len(final_df)) * 100
-            label_name = "ALIM (Pozitif)" if label_val == 1 else "SATIM (Negatif)"
-            print(f"      {label_name}: {count:,} satır (%{pct:.2f})")
+        for target_col in target_cols:
+            print(f"\n   📈 {target_col} (HEDEF) DAĞILIMI:")
+            # TARGET float olabilir (shift yüzünden), int'e çevirelim veya direkt sayalım
+            label_counts = final_df[target_col].value_counts().sort_index()
+            for label_val, count in label_counts.items():
+                pct = (count / len(final_df)) * 100
+                label_name = "ALIM (Pozitif)" if label_val == 1 else "SATIM (Negatif)"
+                print(f"      {label_name}: {count:,} satır (%{pct:.2f})")
         
         # Eksik veri kontrolü
         print(f"\n   ⚠️ EKSİK VERİ ANALİZİ:")
@@ -1,66 +1,448 @@
-from isyatirimhisse import fetch_stock_data
-import datetime
-import pandas as pd
-
-# Hisse listesi
-symbols = [ 'A1CAP', 'A1YEN', 'AEFES', 'AGESA', 'AGHOL', 'AGYO', 'AHGAZ', 'AKBNK', 'AKFGY', 'AKGRT', 'AKMGY', 'AKSEN', 'AKSUE', 'ALBRK', 'ALCAR', 'ALKA', 'ALTIN', 'ANHYT', 'ANSGR', 'ARASE', 'ARDYZ', 'ASELS', 'ASTOR', 'ATAGY', 'ATATP', 'AVGYO', 'AYDEM', 'AYEN', 'AYGAZ', 'BAGFS', 'BAKAB', 'BASGZ', 'BESLR', 'BEYAZ', 'BIGCH', 'BIMAS', 'BNTAS', 'BOSSA', 'BRKSN', 'BRLSM', 'BRSAN', 'BRYAT', 'CCOLA', 'CEMTS', 'CIMSA', 'CLEBI', 'CRDFA', 'CWENE', 'DAPGM', 'DERIM', 'DESA', 'DESPC', 'DGATE', 'DOCO', 'DOFER', 'DOHOL', 'EBEBK', 'ECZYT', 'EDATA', 'EGEPO', 'EGGUB', 'EGPRO', 'EKGYO', 'ELITE', 'EMKEL', 'ENERY', 'ENJSA', 'ENKAI', 'EREGL', 'EUPWR', 'EUREN', 'FMIZP', 'FORTE', 'FROTO', 'FZLGY', 'GARAN', 'GARFA', 'GEDZA', 'GENIL', 'GENTS', 'GESAN', 'GIPTA', 'GLCVY', 'GLDTR', 'GLRMK', 'GLYHO', 'GMSTR', 'GMTAS', 'GOKNR', 'GRSEL', 'GRTHO', 'GUBRF', 'GWIND', 'HALKB', 'HLGYO', 'HTTBT', 'HUNER', 'INDES', 'ISCTR', 'ISDMR', 'ISFIN', 'ISGSY', 'ISGYO', 'ISKPL', 'ISMEN', 'KATMR', 'KCAER', 'KCHOL', 'KLKIM', 'KLMSN', 'KLSYN', 'KOZAA', 'KOZAL', 'KRDMA', 'KRDMD', 'KRONT', 'KRPLS', 'KRSTL', 'LIDER', 'LIDFA', 'LILAK', 'LINK', 'LKMNH', 'LOGO', 'LYDYE', 'MACKO', 'MAGEN', 'MAKTK', 'MARBL', 'MAVI', 'MERIT', 'METUR', 'MGROS', 'MIATK', 'MNDRS', 'MOBTL', 'MPARK', 'MRGYO', 'MTRKS', 'NTGAZ', 'NTHOL', 'NUHCM', 'OBASE', 'ODAS', 'OFSYM', 'ONCSM', 'ORGE', 'OTKAR', 'OYAKC', 'OYYAT', 'OZGYO', 'OZSUB', 'PAGYO', 'PAPIL', 'PASEU', 'PATEK', 'PETUN', 'PGSUS', 'PINSU', 'PLTUR', 'PNLSN', 'PRKME', 'PSDTC', 'QUAGR', 'RNPOL', 'RYGYO', 'RYSAS', 'SAHOL', 'SANEL', 'SAYAS', 'SDTTR', 'SELGD', 'SISE', 'SKBNK', 'SMART', 'SRVGY', 'SUNTK', 'SUWEN', 'TABGD', 'TARKM', 'TATGD', 'TAVHL', 'TBORG', 'TCELL', 'TEZOL', 'THYAO', 'TLMAN', 'TMPOL', 'TNZTP', 'TRCAS', 'TRGYO', 'TSKB', 'TTKOM', 'TUKAS', 'TUPRS', 'TURSG', 'ULKER', 'ULUUN', 'VAKBN', 'VERUS', 'YGGYO', 'YKBNK', 'YUNSA', 'YYLGD', 'ZRGYO'
-    ]  
-
-# Tarih aralığı (son 5 yıl)
-today = datetime.date.today()
-start_date = (today - datetime.timedelta(days=5 * 365)).strftime('%d-%m-%Y')
-end_date = today.strftime('%d-%m-%Y')
-
-# Verileri toplayacak liste
-dataframes = []
-
-for symbol in symbols:
-    print(f"{symbol} için veri çekiliyor...")
-    try:
-        df_raw = fetch_stock_data(
-            symbols=[symbol],
-            start_date=start_date,
-            end_date=end_date,
-            save_to_excel=False
-        )
-
-        if df_raw is None or df_raw.empty:
-            print(f"{symbol} için veri alınamadı.")
-            continue
-
-        # İlgili sütunları seç
-        df_filtered = df_raw[[
-            'HGDG_HS_KODU',
-            'HGDG_TARIH',
-            'HGDG_KAPANIS',
-            'HGDG_MIN',
-            'HGDG_MAX',
-            'HGDG_HACIM'
-        ]].copy()
-
-        # Sütun adlarını değiştir
-        df_filtered.rename(columns={
-            'HGDG_HS_KODU': 'CODE',
-            'HGDG_TARIH': 'DATE',
-            'HGDG_KAPANIS': 'CLOSING_TL',
-            'HGDG_MIN': 'LOW_TL',
-            'HGDG_MAX': 'HIGH_TL',
-            'HGDG_HACIM': 'VOLUME_TL'
-        }, inplace=True)
-
-        dataframes.append(df_filtered)
-
-    except Exception as e:
-        print(f"{symbol} için hata oluştu: {e}. Hisse atlanıyor.")
-
-# Tüm verileri birleştir ve kaydet
-if dataframes:
-    df_final = pd.concat(dataframes, ignore_index=True)
-    filename = "hisse_verileri_2y.xlsx"
-    try:
-        df_final.to_excel(filename, index=False)
-        print(f"Veriler '{filename}' dosyasına başarıyla kaydedildi.")
-    except Exception as e:
-        print("Excel dosyasına yazarken hata oluştu:", e)
-else:
-    print("Hiçbir geçerli veri alınamadı.")
+import argparse
+import datetime
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from fetch_cache import FetchCache, cached_fetch
+from data_store import PRICE_STORE, price_store_exists, read_price_meta, read_prices, write_prices
+
+try:
+    from isyatirimhisse import fetch_stock_data
+except ImportError:
+    # Çevrimdışı testlerde fetch_fn parametresiyle stub verilebilir
+    fetch_stock_data = None
+
+# Hisse listeleri
+BIST_SYMBOLS = [ 'A1CAP', 'A1YEN', 'AEFES', 'AGESA', 'AGHOL', 'AGYO', 'AHGAZ', 'AKBNK', 'AKFGY', 'AKGRT', 'AKMGY', 'AKSEN', 'AKSUE', 'ALBRK', 'ALCAR', 'ALKA', 'ALTIN', 'ANHYT', 'ANSGR', 'ARASE', 'ARDYZ', 'ASELS', 'ASTOR', 'ATAGY', 'ATATP', 'AVGYO', 'AYDEM', 'AYEN', 'AYGAZ', 'BAGFS', 'BAKAB', 'BASGZ', 'BESLR', 'BEYAZ', 'BIGCH', 'BIMAS', 'BNTAS', 'BOSSA', 'BRKSN', 'BRLSM', 'BRSAN', 'BRYAT', 'CCOLA', 'CEMTS', 'CIMSA', 'CLEBI', 'CRDFA', 'CWENE', 'DAPGM', 'DERIM', 'DESA', 'DESPC', 'DGATE', 'DOCO', 'DOFER', 'DOHOL', 'EBEBK', 'ECZYT', 'EDATA', 'EGEPO', 'EGGUB', 'EGPRO', 'EKGYO', 'ELITE', 'EMKEL', 'ENERY', 'ENJSA', 'ENKAI', 'EREGL', 'EUPWR', 'EUREN', 'FMIZP', 'FORTE', 'FROTO', 'FZLGY', 'GARAN', 'GARFA', 'GEDZA', 'GENIL', 'GENTS', 'GESAN', 'GIPTA', 'GLCVY', 'GLDTR', 'GLRMK', 'GLYHO', 'GMSTR', 'GMTAS', 'GOKNR', 'GRSEL', 'GRTHO', 'GUBRF', 'GWIND', 'HALKB', 'HLGYO', 'HTTBT', 'HUNER', 'INDES', 'ISCTR', 'ISDMR', 'ISFIN', 'ISGSY', 'ISGYO', 'ISKPL', 'ISMEN', 'KATMR', 'KCAER', 'KCHOL', 'KLKIM', 'KLMSN', 'KLSYN', 'KOZAA', 'KOZAL', 'KRDMA', 'KRDMD', 'KRONT', 'KRPLS', 'KRSTL', 'LIDER', 'LIDFA', 'LILAK', 'LINK', 'LKMNH', 'LOGO', 'LYDYE', 'MACKO', 'MAGEN', 'MAKTK', 'MARBL', 'MAVI', 'MERIT', 'METUR', 'MGROS', 'MIATK', 'MNDRS', 'MOBTL', 'MPARK', 'MRGYO', 'MTRKS', 'NTGAZ', 'NTHOL', 'NUHCM', 'OBASE', 'ODAS', 'OFSYM', 'ONCSM', 'ORGE', 'OTKAR', 'OYAKC', 'OYYAT', 'OZGYO', 'OZSUB', 'PAGYO', 'PAPIL', 'PASEU', 'PATEK', 'PETUN', 'PGSUS', 'PINSU', 'PLTUR', 'PNLSN', 'PRKME', 'PSDTC', 'QUAGR', 'RNPOL', 'RYGYO', 'RYSAS', 'SAHOL', 'SANEL', 'SAYAS', 'SDTTR', 'SELGD', 'SISE', 'SKBNK', 'SMART', 'SRVGY', 'SUNTK', 'SUWEN', 'TABGD', 'TARKM', 'TATGD', 'TAVHL', 'TBORG', 'TCELL', 'TEZOL', 'THYAO', 'TLMAN', 'TMPOL', 'TNZTP', 'TRCAS', 'TRGYO', 'TSKB', 'TTKOM', 'TUKAS', 'TUPRS', 'TURSG', 'ULKER', 'ULUUN', 'VAKBN', 'VERUS', 'YGGYO', 'YKBNK', 'YUNSA', 'YYLGD', 'ZRGYO'
+    ]  
+
+# Optimizasyon alt kümesi
+OPT_SYMBOLS = ['MAVI', 'EKGYO', 'TRGYO', 'RYSAS', 'BIMAS', 'GARAN', 'ENKAI', 'KCHOL', 'TUPRS', 'ASELS', 'MPARK', 'THYAO', 'EREGL'
+]
+
+# Adlandırılmış hisse evrenleri. Hepsi aynı fiyat deposunu paylaşır: Bir hissenin depodaki
+# geçmişi, dahil olduğu evrenlerin en uzun lookback süresi kadar tutulur. Böylece 'opt'
+# evreni tam BIST indirmesinden dilimlenir, ikinci kez indirilmez.
+UNIVERSES = {
+    'bist': {'symbols': BIST_SYMBOLS, 'years': 5},
+    'opt': {'symbols': OPT_SYMBOLS, 'years': 7},
+}
+
+# ============================================
+# AYARLAR
+# ============================================
+FETCH_CONFIG = {
+    'output_store': PRICE_STORE,           # Parquet fiyat deposu (CODE bazlı bölünmüş)
+    'excel_export': False,                 # True ise ayrıca Excel çıktısı da yazılır
+    'excel_file': 'hisse_verileri_2y.xlsx',
+    'universe': 'bist',                    # Varsayılan hisse evreni (UNIVERSES)
+
+    # Artımlı (delta) güncelleme: Mevcut dosyadaki son tarihten itibaren çeker
+    'incremental': True,
+    'backfill_tolerance_days': 7,  # İlk kayıt bu kadar günden geç başlıyorsa tüm aralık yeniden çekilir
+
+    # Yanıt önbelleği: Kapanmış yıllar diskten okunur, sunucuya sadece içinde bulunulan yıl sorulur
+    'use_cache': True,
+    'cache_dir': '.fetch_cache',
+    'cache_ttl_hours': 6,          # İçinde bulunulan yılın yanıtlarının geçerlilik süresi
+
+    # Eşzamanlı indirme ayarları
+    'concurrent': True,          # False ise hisseler tek tek (eski yöntem) çekilir
+    'max_workers': 8,            # Aynı anda çalışacak en fazla istek sayısı
+    'requests_per_second': 5.0,  # İş Yatırım sunucusuna saniyede en fazla istek
+    'max_retries': 3,            # Hata durumunda tekrar deneme sayısı
+    'backoff_base': 1.0          # Bekleme süresi: backoff_base * 2^deneme (+ rastgele sapma)
+}
+
+# İş Yatırım kolonları -> Projede kullanılan kolon adları
+COLUMN_MAP = {
+    'HGDG_HS_KODU': 'CODE',
+    'HGDG_TARIH': 'DATE',
+    'HGDG_KAPANIS': 'CLOSING_TL',
+    'HGDG_MIN': 'LOW_TL',
+    'HGDG_MAX': 'HIGH_TL',
+    'HGDG_HACIM': 'VOLUME_TL'
+}
+
+
+class RateLimiter:
+    """Thread-safe hız sınırlayıcı - istekler arasında en az 1/rate saniye bırakır"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if self.interval == 0.0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def fetch_symbol(symbol, start_date, end_date, fetch_fn=None, rate_limiter=None,
+                 max_retries=0, backoff_base=1.0, sleep_fn=time.sleep):
+    """
+    Tek bir hisse için veriyi çeker, kolonları seçip yeniden adlandırır.
+    Hata durumunda üstel bekleme (exponential backoff) ile tekrar dener.
+    Returns: (DataFrame veya None, deneme sayısı)
+    """
+    fetch_fn = fetch_fn or fetch_stock_data
+    if fetch_fn is None:
+        raise ImportError("isyatirimhisse kurulu değil, fetch_fn parametresi verilmeli.")
+
+    attempt = 0
+    while True:
+        attempt += 1
+        if rate_limiter is not None:
+            rate_limiter.wait()
+        try:
+            df_raw = fetch_fn(
+                symbols=[symbol],
+                start_date=start_date,
+                end_date=end_date,
+                save_to_excel=False
+            )
+            break
+        except Exception:
+            if attempt > max_retries:
+                raise
+            # Jitter: Aynı anda hata alan istekler aynı anda tekrar denemesin
+            sleep_fn(backoff_base * (2 ** (attempt - 1)) * (1 + random.random() * 0.1))
+
+    if df_raw is None or df_raw.empty:
+        return None, attempt
+
+    # İlgili sütunları seç ve adlarını değiştir
+    df_filtered = df_raw[list(COLUMN_MAP)].copy()
+    df_filtered.rename(columns=COLUMN_MAP, inplace=True)
+
+    return df_filtered, attempt
+
+
+def fetch_all(symbols, start_date, end_date, fetch_fn=None, concurrent=True,
+              max_workers=8, requests_per_second=5.0, max_retries=3, backoff_base=1.0,
+              sleep_fn=time.sleep, start_dates=None):
+    """
+    Tüm hisseleri çeker. concurrent=True ise sınırlı bir thread havuzu kullanılır.
+    start_dates: Hisse bazlı başlangıç tarihi (artımlı mod), yoksa start_date kullanılır.
+    Returns: (DataFrame listesi (symbols sırasıyla), hisse bazlı özet sözlüğü)
+    """
+    start_dates = start_dates or {}
+    rate_limiter = RateLimiter(requests_per_second)
+    results = {}
+    summary = {}
+
+    def task(symbol):
+        return fetch_symbol(symbol, start_dates.get(symbol, start_date), end_date, fetch_fn=fetch_fn,
+                            rate_limiter=rate_limiter, max_retries=max_retries,
+                            backoff_base=backoff_base, sleep_fn=sleep_fn)
+
+    def record(symbol, future_result=None, error=None):
+        if error is not None:
+            summary[symbol] = {'status': 'hata', 'rows': 0, 'error': str(error)}
+            print(f"{symbol} için hata oluştu: {error}. Hisse atlanıyor.")
+            return
+        df_symbol, attempts = future_result
+        if df_symbol is None:
+            summary[symbol] = {'status': 'boş', 'rows': 0, 'attempts': attempts}
+            print(f"{symbol} için veri alınamadı.")
+        else:
+            results[symbol] = df_symbol
+            summary[symbol] = {'status': 'ok', 'rows': len(df_symbol), 'attempts': attempts}
+
+    if concurrent and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(task, symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    record(symbol, future.result())
+                except Exception as e:
+                    record(symbol, error=e)
+    else:
+        for symbol in symbols:
+            print(f"{symbol} için veri çekiliyor...")
+            try:
+                record(symbol, task(symbol))
+            except Exception as e:
+                record(symbol, error=e)
+
+    # Sonuçlar her zaman sembol listesinin sırasıyla döner
+    dataframes = [results[s] for s in symbols if s in results]
+    return dataframes, summary
+
+
+def print_summary(summary):
+    """Hisse bazlı başarı/hata özetini yazdırır"""
+    ok = [s for s, info in summary.items() if info['status'] == 'ok']
+    empty = [s for s, info in summary.items() if info['status'] == 'boş']
+    failed = [s for s, info in summary.items() if info['status'] == 'hata']
+    retried = [s for s, info in summary.items() if info.get('attempts', 1) > 1]
+
+    print("\n📋 İNDİRME ÖZETİ:")
+    print(f"   Başarılı: {len(ok)} hisse ({sum(summary[s]['rows'] for s in ok):,} satır)")
+    print(f"   Boş veri: {len(empty)} hisse {empty if empty else ''}")
+    print(f"   Hatalı: {len(failed)} hisse")
+    for s in failed:
+        print(f"      {s}: {summary[s]['error']}")
+    if retried:
+        print(f"   Tekrar denenen: {retried}")
+
+
+def _to_datetime(dates):
+    """İş Yatırım tarihleri (gg-aa-yyyy) ve Excel'den okunan tarihler için ortak dönüşüm"""
+    return pd.to_datetime(dates, dayfirst=True)
+
+
+def _to_date(value):
+    return value if isinstance(value, datetime.date) else datetime.date.fromisoformat(str(value))
+
+
+def update_fetched_from(fetched_from, plan, starts, summary):
+    """
+    Tam aralığı başarıyla çekilen hisseler için istenen en eski tarihi kaydeder.
+    Artımlı güncellenen hisselerin kaydı değişmez.
+    """
+    fetched_from = dict(fetched_from or {})
+    for symbol, start in plan.items():
+        if start == starts.get(symbol) and summary.get(symbol, {}).get('status') == 'ok':
+            previous = fetched_from.get(symbol)
+            fetched_from[symbol] = min(start, _to_date(previous)) if previous else start
+    return {symbol: _to_date(date).isoformat() for symbol, date in fetched_from.items()}
+
+
+def get_universe(name):
+    """Adı verilen hisse evrenini döndürür"""
+    if name not in UNIVERSES:
+        raise ValueError(f"Bilinmeyen hisse evreni: {name} (seçenekler: {', '.join(UNIVERSES)})")
+    return UNIVERSES[name]
+
+
+def universe_start(name, today=None):
+    """Evrenin lookback süresine göre başlangıç tarihi"""
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=get_universe(name)['years'] * 365)
+
+
+def symbol_starts(symbols, today=None, default_years=5):
+    """
+    Her hisse için depoda tutulacak en eski tarih: Hissenin dahil olduğu evrenlerin
+    en uzun lookback süresi (hiçbir evrende yoksa default_years).
+    """
+    today = today or datetime.date.today()
+    starts = {}
+    for symbol in symbols:
+        years = [u['years'] for u in UNIVERSES.values() if symbol in u['symbols']]
+        starts[symbol] = today - datetime.timedelta(days=max(years, default=default_years) * 365)
+    return starts
+
+
+def load_existing(store, excel_file=None):
+    """
+    Daha önce kaydedilmiş veri setini okur, yoksa None döner.
+    Parquet deposu yoksa eski Excel dosyasından devam edilir (ilk geçiş).
+    """
+    if price_store_exists(store):
+        path = store
+    elif excel_file and os.path.exists(excel_file):
+        path = excel_file
+    else:
+        return None
+    try:
+        df = read_prices(path)
+    except Exception as e:
+        print(f"Mevcut veri okunamadı, tam indirme yapılacak: {e}")
+        return None
+    if df.empty or not {'CODE', 'DATE'}.issubset(df.columns):
+        return None
+    df['CODE'] = df['CODE'].astype(str)
+    return df
+
+
+def plan_incremental(existing, starts, backfill_tolerance_days=7, fetched_from=None):
+    """
+    Her hisse için çekilecek başlangıç tarihini belirler (starts: {symbol: en eski tarih}).
+    - Kayıtlı son tarihten itibaren (son bar dahil, gün içi kapanmamış bar yenilensin diye)
+    - Kaydı olmayan ya da geçmişi eksik kalan hisseler için tam aralık
+    fetched_from: {symbol: tarih} daha önce sunucudan istenen en eski tarih. Geçmişi lookback'ten
+    kısa olan hisseler (yeni halka arzlar) için ilk bar değil bu tarih esas alınır.
+    Returns: {symbol: datetime.date}
+    """
+    plan = {}
+    bounds = existing.groupby('CODE')['DATE'].agg(['min', 'max']) if existing is not None else None
+    tolerance = datetime.timedelta(days=backfill_tolerance_days)
+    fetched_from = fetched_from or {}
+
+    for symbol, start in starts.items():
+        if bounds is None or symbol not in bounds.index:
+            plan[symbol] = start
+            continue
+        first, last = bounds.loc[symbol, 'min'].date(), bounds.loc[symbol, 'max'].date()
+        if symbol in fetched_from:
+            # Bu tarihten önce sunucuda veri yok: İlk bar daha geç olsa da geçmiş eksik değil
+            first = min(first, _to_date(fetched_from[symbol]))
+        if first > start + tolerance:
+            # Geriye dönük boşluk var (örn. lookback süresi uzatıldı)
+            plan[symbol] = start
+        else:
+            plan[symbol] = max(last, start)
+    return plan
+
+
+def merge_incremental(existing, new_frames, starts):
+    """
+    Yeni çekilen verileri mevcut veri ile birleştirir, (CODE, DATE) tekrarlarını temizler.
+    Depodaki diğer evrenlere ait hisseler olduğu gibi korunur.
+    """
+    frames = []
+    if existing is not None:
+        frames.append(existing)
+    for df_new in new_frames:
+        df_new = df_new.copy()
+        df_new['DATE'] = _to_datetime(df_new['DATE'])
+        frames.append(df_new)
+
+    df = pd.concat(frames, ignore_index=True)
+    # Aynı gün için son çekilen bar geçerli (gün içi güncellenmiş kapanış)
+    df = df.drop_duplicates(subset=['CODE', 'DATE'], keep='last')
+    # Güncellenen hisselerde lookback penceresinin dışında kalan eski barları at
+    min_dates = df['CODE'].map({s: pd.Timestamp(d) for s, d in starts.items()})
+    df = df[min_dates.isna() | (df['DATE'] >= min_dates)]
+    return df.sort_values(['CODE', 'DATE']).reset_index(drop=True)
+
+
+def load_universe(name, store=PRICE_STORE, columns=None, today=None):
+    """Paylaşılan fiyat deposundan evrenin hisselerini ve lookback penceresini dilimler"""
+    df = read_prices(store, symbols=get_universe(name)['symbols'], columns=columns)
+    if 'DATE' in df.columns:
+        df = df[df['DATE'] >= pd.Timestamp(universe_start(name, today))]
+    return df.reset_index(drop=True)
+
+
+def update_universe(name, config=FETCH_CONFIG, fetch_fn=None, offline=False):
+    """
+    Evrenin hisselerini paylaşılan depoda günceller ve evren dilimini döndürür.
+    offline=True ise hiç istek atılmaz, sadece depodaki veri dilimlenir.
+    """
+    universe_symbols = get_universe(name)['symbols']
+    store = config['output_store']
+
+    if offline:
+        if not price_store_exists(store):
+            print(f"❌ Fiyat deposu bulunamadı: {store}")
+            return None
+        df_universe = load_universe(name, store)
+        print(f"📦 '{name}' evreni depodan dilimlendi: {df_universe['CODE'].nunique()} hisse, {len(df_universe):,} satır")
+        return df_universe
+
+    today = datetime.date.today()
+    starts = symbol_starts(universe_symbols, today, get_universe(name)['years'])
+    end_date = today.strftime('%d-%m-%Y')
+
+    # Depo her durumda okunur: Tam indirmede de diğer evrenlerin hisseleri korunmalı
+    existing = load_existing(store, config['excel_file'])
+    fetched_from = read_price_meta(store).get('fetched_from', {})
+    plan = starts
+    if existing is not None and config.get('incremental'):
+        plan = plan_incremental(existing, starts, config.get('backfill_tolerance_days', 7), fetched_from)
+        full = sum(1 for s, d in plan.items() if d == starts[s])
+        print(f"🔁 Artımlı mod: {len(existing):,} kayıtlı satır, "
+              f"{len(plan) - full} hisse güncellenecek, {full} hisse tam çekilecek.")
+    start_dates = {s: d.strftime('%d-%m-%Y') for s, d in plan.items()}
+
+    fetch_fn = fetch_fn or fetch_stock_data
+    if fetch_fn is None:
+        raise ImportError("isyatirimhisse kurulu değil, fetch_fn parametresi verilmeli.")
+
+    cache = None
+    requests_per_second = config['requests_per_second']
+    if config.get('use_cache'):
+        cache = FetchCache(config['cache_dir'], ttl_seconds=config['cache_ttl_hours'] * 3600)
+        cache.evict_expired()
+        # Hız sınırı önbelleğin içinde, her gerçek istekte uygulanır: Önbellek isabetleri
+        # beklemez, bir hisse için yapılan iki istek (geçmiş + bugün) ayrı ayrı sayılır
+        fetch_fn = cached_fetch(fetch_fn, cache, rate_limiter=RateLimiter(requests_per_second))
+        requests_per_second = 0
+
+    started = time.perf_counter()
+    dataframes, summary = fetch_all(
+        universe_symbols, min(start_dates.values()), end_date,
+        start_dates=start_dates,
+        fetch_fn=fetch_fn,
+        concurrent=config['concurrent'],
+        max_workers=config['max_workers'],
+        requests_per_second=requests_per_second,
+        max_retries=config['max_retries'],
+        backoff_base=config['backoff_base']
+    )
+    print_summary(summary)
+    print(f"   Süre: {time.perf_counter() - started:.1f} sn")
+    print(f"   Çekilen satır: {sum(len(d) for d in dataframes):,}")
+    if cache is not None:
+        print(f"   Önbellek: {cache.hits} isabet, {cache.misses} sunucu isteği")
+
+    # Tüm verileri birleştir ve kaydet
+    if not dataframes and existing is None:
+        print("Hiçbir geçerli veri alınamadı.")
+        return None
+
+    df_final = merge_incremental(existing, dataframes, starts)
+    # Depodaki diğer evrenlerin hisselerine ait kayıtlar korunur
+    fetched_from = update_fetched_from(fetched_from, plan, starts, summary)
+    write_prices(df_final, store, fetched_from=fetched_from)
+    print(f"Veriler '{store}' deposuna başarıyla kaydedildi.")
+
+    df_universe = load_universe(name, store, today=today)
+    if config.get('excel_export'):
+        filename = config['excel_file']
+        try:
+            df_universe.to_excel(filename, index=False)
+            print(f"Veriler '{filename}' dosyasına başarıyla kaydedildi.")
+        except Exception as e:
+            print("Excel dosyasına yazarken hata oluştu:", e)
+    return df_universe
+
+
+def main(argv=None, config=FETCH_CONFIG):
+    parser = argparse.ArgumentParser(description="İş Yatırım'dan hisse fiyat verisi çeker")
+    parser.add_argument('--universe', default=config['universe'], choices=sorted(UNIVERSES),
+                        help="Güncellenecek hisse evreni")
+    parser.add_argument('--list', action='store_true', help="Evrenleri listele ve çık")
+    parser.add_argument('--offline', action='store_true',
+                        help="İstek atma, evreni mevcut depodan dilimle")
+    parser.add_argument('--full', action='store_true', help="Artımlı modu kapat, tüm aralığı çek")
+    parser.add_argument('--no-cache', action='store_true', help="Yanıt önbelleğini kullanma")
+    parser.add_argument('--excel', action='store_true', help="Evren dilimini Excel'e de yaz")
+    parser.add_argument('--workers', type=int, default=config['max_workers'],
+                        help="Eşzamanlı istek sayısı (1 = sıralı)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, universe in UNIVERSES.items():
+            print(f"{name}: {len(universe['symbols'])} hisse, {universe['years']} yıl")
+        return None
+
+    run_config = {
+        **config,
+        'incremental': config['incremental'] and not args.full,
+        'excel_export': config['excel_export'] or args.excel,
+        'use_cache': config['use_cache'] and not args.no_cache,
+        'max_workers': args.workers,
+        'concurrent': config['concurrent'] and args.workers > 1,
+    }
+    return update_universe(args.universe, run_config, offline=args.offline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from generate_ml_features import CONFIG, _ema_values, _wma_values, rolling_linreg
+
+# ============================================
+# PANEL (TARİH x HİSSE) İNDİKATÖR MOTORU
+# ============================================
+# Tüm hisseler tek bir (tarih x hisse) float64 matrisinde tutulur ve her indikatör
+# tüm evren için tek vektörel geçişte hesaplanır. Hissenin işlem görmediği tarihler
+# (halka arz öncesi, işlem durdurma, sonrası) NaN ile doldurulur.
+# Hesaplamadan önce her hissenin mevcut satırları üste toplanır (bar sırası x hisse);
+# böylece seri ortasındaki boşluklar da hisse bazlı hesaptaki gibi atlanır ve sonuçlar
+# calculate_* fonksiyonlarıyla aynıdır. Sonuçlar tekrar tarih eksenine dağıtılır.
+# Satırın varlığı (present) kapanıştan ayrı tutulur: Kapanışı NaN olan mevcut satır
+# boşluk değildir, hisse bazlı hesaptaki gibi seride NaN olarak kalır.
+# Aynı (CODE, DATE) birden fazla kez geçen hisseler panele sığmaz; add_panel_indicators
+# bu hisseleri atlar ve göstergeleri hisse bazlı motorda hesaplanır.
+
+PANEL_FIELDS = ('CLOSING_TL', 'HIGH_TL', 'LOW_TL', 'VOLUME_TL')
+
+
+class Panel:
+    """
+    Tarih x hisse matrisleri: panel['CLOSING_TL'] -> (len(dates), len(symbols)) dizisi.
+    present: Hissenin o tarihte satırı var mı (değerleri NaN olsa bile)
+    """
+
+    def __init__(self, dates, symbols, fields, present):
+        self.dates = dates
+        self.symbols = symbols
+        self.fields = fields
+        self.present = present
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    @property
+    def shape(self):
+        return len(self.dates), len(self.symbols)
+
+
+def duplicate_codes(df):
+    """Aynı tarihte birden fazla satırı olan hisseler"""
+    duplicated = df.duplicated(subset=['CODE', 'DATE'], keep=False)
+    return sorted(df.loc[duplicated, 'CODE'].astype(str).unique())
+
+
+def build_panel(df, fields=PANEL_FIELDS):
+    """Uzun formattaki (CODE, DATE, ...) veriyi tarih x hisse matrislerine çevirir"""
+    df = df[['CODE', 'DATE'] + list(fields)].copy()
+    df['CODE'] = df['CODE'].astype(str)
+    duplicates = duplicate_codes(df)
+    if duplicates:
+        raise ValueError(f"Aynı tarihte birden fazla satırı olan hisseler: {', '.join(duplicates)}")
+    df['_present'] = 1.0
+
+    wide = df.pivot(index='DATE', columns='CODE', values=list(fields) + ['_present']).sort_index()
+    symbols = sorted(df['CODE'].unique())
+    matrices = {
+        field: np.ascontiguousarray(wide[field].reindex(columns=symbols).to_numpy(dtype=float))
+        for field in fields
+    }
+    present = wide['_present'].reindex(columns=symbols).notna().to_numpy()
+    return Panel(wide.index, symbols, matrices, present)
+
+
+# --------------------------------------------
+# Panel göstergeleri (0. eksen: zaman, 1. eksen: hisse)
+# --------------------------------------------
+
+def panel_finh(close, period):
+    """FINH - calculate_finh ile aynı, tüm hisseler için"""
+    ema1 = _ema_values(close, 2 / (period + 1))
+    ema2 = _ema_values(close, 2 / (period / 2 + 1))
+    finh_raw = 2 * ema2 - ema1
+    return _ema_values(finh_raw, 2 / (np.sqrt(period) + 1))
+
+
+def _compact(values, present):
+    """Her hissenin mevcut satırlarını sırasını bozmadan üste toplar: (matris, satır sırası)"""
+    order = np.argsort(~present, axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def _expand(compact, order, present):
+    """_compact'ın tersi: Bar sırasındaki sonuçları tarih eksenine dağıtır, boşluklar NaN"""
+    out = np.empty_like(compact)
+    np.put_along_axis(out, order, compact, axis=0)
+    return np.where(present, out, np.nan)
+
+
+def panel_kama(close, length):
+    """
+    KAMA - calculate_kama ile aynı. Sıkıştırılmış matriste her hisse 0. satırdan başlar;
+    hisse bazlı hesaptaki gibi ilk değer ilk kapanıştır (NaN ise NaN devam eder)
+    """
+    frame = pd.DataFrame(close)
+
+    xvnoise = frame.diff().abs()
+    nsignal = (frame - frame.shift(length)).abs()
+    nnoise = xvnoise.rolling(window=length).sum()
+
+    nefratio = (nsignal / nnoise).fillna(0).replace([np.inf, -np.inf], 0)
+    nsmooth = (((nefratio * (0.666 - 0.0645)) + 0.0645) ** 2).to_numpy()
+
+    # Zaman ekseninde tek döngü, her adımda tüm hisseler birlikte güncellenir
+    kama = np.full(close.shape, np.nan)
+    if len(close) == 0:
+        return kama
+    prev = close[0].copy()
+    kama[0] = prev
+    for t in range(1, close.shape[0]):
+        prev = prev + nsmooth[t] * (close[t] - prev)
+        kama[t] = prev
+    return kama
+
+
+def panel_blueline(close, period):
+    """BlueLine - calculate_blueline ile aynı (üçlü EMA)"""
+    frame = pd.DataFrame(close)
+    ema1 = frame.ewm(span=period, adjust=False).mean()
+    ema2 = ema1.ewm(span=period, adjust=False).mean()
+    ema3 = ema2.ewm(span=period, adjust=False).mean()
+    blueline = 3 * (ema1 - ema2) + ema3
+    # ewm NaN kapanışta önceki değeri taşır (hisse bazlı hesapla aynı); dolgu satırlarını _expand atar
+    return blueline.to_numpy()
+
+
+def panel_ovt(close, period):
+    """OVT - calculate_ovt ile aynı"""
+    n2ma = 2 * _wma_values(close, int(np.round(period / 2)))
+    nma = _wma_values(close, period)
+    sqn = int(np.round(np.sqrt(period)))
+    return _wma_values(n2ma - nma, sqn)
+
+
+def panel_lrb(close, period, offset=0):
+    """LRB - calculate_lrb ile aynı"""
+    return rolling_linreg(close, period, offset)
+
+
+def panel_zlma(close, period, smooth):
+    """ZLMA - calculate_zlma ile aynı"""
+    wma1 = _wma_values(close, period)
+    price_ma = _wma_values(wma1, smooth)
+    return 2 * price_ma - _wma_values(price_ma, period)
+
+
+PANEL_INDICATORS = {
+    'FINH': lambda close, config: panel_finh(close, config['finh_period']),
+    'KAMA': lambda close, config: panel_kama(close, config['kama_period']),
+    'BlueLine': lambda close, config: panel_blueline(close, config['blueline_period']),
+    'OVT': lambda close, config: panel_ovt(close, config['ovt_period']),
+    'LRB': lambda close, config: panel_lrb(close, config['lrb_period']),
+    'ZLMA': lambda close, config: panel_zlma(close, config['zlma_period'], config['zlma_smooth']),
+}
+
+
+def compute_panel_indicators(panel, config=CONFIG, names=None):
+    """
+    Tüm evren için FINH, KAMA, BlueLine, OVT, LRB, ZLMA matrislerini hesaplar.
+    names: Sadece bu göstergeler (None: hepsi)
+    """
+    compact, order = _compact(panel['CLOSING_TL'], panel.present)
+    names = list(PANEL_INDICATORS) if names is None else names
+    return {name: _expand(PANEL_INDICATORS[name](compact, config), order, panel.present) for name in names}
+
+
+def add_panel_indicators(stock_frames, config=CONFIG, names=None):
+    """
+    Hisse bazlı çerçevelere panel motoruyla hesaplanan gösterge kolonlarını ekler.
+    calculate_all_filters bu kolonları tekrar hesaplamaz.
+    Aynı tarihte birden fazla satırı olan hisseler değiştirilmeden döner (göstergeleri
+    calculate_all_filters hisse bazlı hesaplar; çalışmanın tamamı durmaz).
+    stock_frames: [(code, DataFrame)] Returns: Aynı sırayla [(code, DataFrame)]
+    """
+    if not stock_frames:
+        return []
+    df = pd.concat([stock_df.assign(CODE=str(code)) for code, stock_df in stock_frames], ignore_index=True)
+    skipped = set(duplicate_codes(df))
+    if skipped:
+        df = df[~df['CODE'].isin(skipped)]
+        if df.empty:
+            return list(stock_frames)
+    panel = build_panel(df, fields=('CLOSING_TL',))
+    indicators = compute_panel_indicators(panel, config, names)
+    columns = {symbol: j for j, symbol in enumerate(panel.symbols)}
+
+    results = []
+    for code, stock_df in stock_frames:
+        if str(code) in skipped:
+            results.append((code, stock_df))
+            continue
+        stock_df = stock_df.copy()
+        rows = panel.dates.get_indexer(stock_df['DATE'])
+        for name, matrix in indicators.items():
+            stock_df[name] = matrix[rows, columns[str(code)]]
+        results.append((code, stock_df))
+    return results
+
+
+def panel_to_frame(panel, indicators):
+    """Panel sonuçlarını uzun formata (CODE, DATE, ...) çevirir; dolgu satırları atılır"""
+    n_dates, n_symbols = panel.shape
+    data = {
+        'CODE': np.tile(np.asarray(panel.symbols, dtype=object), n_dates),
+        'DATE': np.repeat(panel.dates.to_numpy(), n_symbols),
+    }
+    for field, matrix in panel.fields.items():
+        data[field] = matrix.ravel()
+    for name, matrix in indicators.items():
+        data[name] = matrix.ravel()
+
+    df = pd.DataFrame(data)
+    df = df[panel.present.ravel()]
+    return df.sort_values(['CODE', 'DATE'], kind='mergesort').reset_index(drop=True)
@@ -0,0 +1,389 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from generate_ml_features import (
+    CONFIG, INDICATORS, LABEL_COLUMNS, _ema_values, _kama_values, _linreg_prefix,
+    _wma_values, calculate_label, detect_hhll_trend, find_pivots, rolling_linreg,
+)
+
+try:
+    # Opsiyonel: Sadece 'f1' skoru için gerekli (pycaret ile birlikte gelir)
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import f1_score
+except ImportError:
+    RandomForestClassifier = None
+    f1_score = None
+
+# ============================================
+# PARAMETRE TARAMA (SWEEP) MOTORU
+# ============================================
+# Her aday CONFIG için calculate_all_filters'ı baştan çalıştırmak yerine hisse başına
+# ortak ara sonuçlar bir kez hesaplanır ve adaylar arasında paylaşılır:
+# - close farkı / mutlak farkı (KAMA gürültüsü), LRB için Σy / NaN önek toplamları
+# - Her (gösterge, periyot) sonucu: Aynı finh_period'u kullanan tüm adaylar FINH'i bir kez hesaplar
+# - WMA(close, p): OVT ve ZLMA aynı periyodu kullanıyorsa ortak
+# - Pivot dizileri ve HHLL trendi (left_bars, right_bars) başına bir kez
+# Adaylar parçalara bölünüp process havuzunda değerlendirilir; her işçi kendi
+# parçasındaki adaylar için ara sonuç önbelleğini tekrar kullanır.
+
+# Taranabilir parametreler
+SWEEP_PARAMS = [
+    'finh_period', 'kama_period', 'blueline_period', 'hhll_left_bars', 'hhll_right_bars',
+    'ovt_period', 'lrb_period', 'zlma_period', 'zlma_smooth',
+]
+
+# 'f1' skorunda kullanılan özellikler (autoML ile aynı şekilde _PriceAbove ve Current_Trend hariç)
+F1_FEATURES = ['VOL_Rel', 'HHLL_Trend'] + [
+    f'{ind}_{kind}' for ind in INDICATORS for kind in ('Dist_Pct', 'Slope_Rate')
+]
+
+
+def expand_grid(grid, base_config=CONFIG):
+    """{'finh_period': [89, 110], ...} -> tam CONFIG sözlükleri listesi (kartezyen çarpım)"""
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Taranamayan parametre(ler): {', '.join(sorted(unknown))}")
+
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        config = dict(base_config)
+        config.update(zip(keys, values))
+        configs.append(config)
+    return configs
+
+
+class StockIntermediates:
+    """Tek hissenin fiyat dizileri ve adaylar arasında paylaşılan ara sonuçları"""
+
+    def __init__(self, close, high, low, volume):
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self._memo = {}
+
+    def _cached(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    # --------------------------------------------
+    # Ortak ara sonuçlar
+    # --------------------------------------------
+    def abs_diff(self):
+        return self._cached(('abs_diff',), lambda: np.abs(np.diff(self.close, prepend=np.nan)))
+
+    def linreg_prefix(self):
+        return self._cached(('linreg_prefix',), lambda: _linreg_prefix(self.close))
+
+    def wma(self, period):
+        return self._cached(('wma', period), lambda: _wma_values(self.close, period))
+
+    def ema(self, period):
+        return self._cached(('ema', period), lambda: _ema_values(self.close, 2 / (period + 1)))
+
+    def vol_rel(self):
+        return self._cached(('vol_rel',), lambda: (
+            self.volume / pd.Series(self.volume).rolling(window=10).mean().to_numpy()))
+
+    def pivots(self, left_bars, right_bars):
+        return self._cached(('pivots', left_bars, right_bars),
+                            lambda: find_pivots(self.high, self.low, left_bars, right_bars))
+
+    # --------------------------------------------
+    # Göstergeler (calculate_* ile aynı sonuçlar)
+    # --------------------------------------------
+    def finh(self, period):
+        def compute():
+            finh_raw = 2 * self.ema(period / 2) - self.ema(period)
+            return _ema_values(finh_raw, 2 / (np.sqrt(period) + 1))
+        return self._cached(('FINH', period), compute)
+
+    def kama(self, length):
+        def compute():
+            close = pd.Series(self.close)
+            nsignal = (close - close.shift(length)).abs()
+            nnoise = pd.Series(self.abs_diff()).rolling(window=length).sum()
+            nefratio = (nsignal / nnoise).fillna(0).replace([np.inf, -np.inf], 0)
+            nsmooth = ((nefratio * (0.666 - 0.0645)) + 0.0645) ** 2
+            return _kama_values(self.close, nsmooth.to_numpy(dtype=float))
+        return self._cached(('KAMA', length), compute)
+
+    def blueline(self, period):
+        def compute():
+            ema1 = pd.Series(self.close).ewm(span=period, adjust=False).mean()
+            ema2 = ema1.ewm(span=period, adjust=False).mean()
+            ema3 = ema2.ewm(span=period, adjust=False).mean()
+            return (3 * (ema1 - ema2) + ema3).to_numpy()
+        return self._cached(('BlueLine', period), compute)
+
+    def ovt(self, period):
+        def compute():
+            diff = 2 * self.wma(int(np.round(period / 2))) - self.wma(period)
+            return _wma_values(diff, int(np.round(np.sqrt(period))))
+        return self._cached(('OVT', period), compute)
+
+    def lrb(self, period):
+        return self._cached(('LRB', period),
+                            lambda: rolling_linreg(self.close, period, prefix=self.linreg_prefix()))
+
+    def zlma(self, period, smooth):
+        def compute():
+            price_ma = _wma_values(self.wma(period), smooth)
+            return 2 * price_ma - _wma_values(price_ma, period)
+        return self._cached(('ZLMA', period, smooth), compute)
+
+    def hhll(self, left_bars, right_bars):
+        def compute():
+            prices = pd.DataFrame({'HIGH_TL': self.high, 'LOW_TL': self.low, 'CLOSING_TL': self.close})
+            pivots = self.pivots(left_bars, right_bars)
+            return detect_hhll_trend(prices, left_bars, right_bars, pivots=pivots).to_numpy()
+        return self._cached(('HHLL', left_bars, right_bars), compute)
+
+    def indicators(self, config):
+        return {
+            'FINH': self.finh(config['finh_period']),
+            'KAMA': self.kama(config['kama_period']),
+            'BlueLine': self.blueline(config['blueline_period']),
+            'OVT': self.ovt(config['ovt_period']),
+            'LRB': self.lrb(config['lrb_period']),
+            'ZLMA': self.zlma(config['zlma_period'], config['zlma_smooth']),
+        }
+
+    # --------------------------------------------
+    def label(self, config):
+        """Aday CONFIG için Current_Trend (calculate_label ile aynı)"""
+        values = self.indicators(config)
+        with np.errstate(invalid='ignore'):
+            binaries = {
+                'FINH_PriceAbove': self.close > values['FINH'],
+                'KAMA_PriceAbove': self.close > values['KAMA'],
+                'BlueLine_PriceAbove': self.close > values['BlueLine'],
+                'LRB_PriceAbove': self.close > values['LRB'],
+                'OVT_Slope': np.diff(values['OVT'], prepend=np.nan) > 0,
+                'ZLMA_Slope': np.diff(values['ZLMA'], prepend=np.nan) > 0,
+            }
+        binaries = {col: mask.astype(int) for col, mask in binaries.items()}
+        binaries['HHLL_Trend'] = self.hhll(config['hhll_left_bars'], config['hhll_right_bars'])
+        return calculate_label(pd.DataFrame(binaries, columns=LABEL_COLUMNS)).to_numpy()
+
+    def features(self, config):
+        """Aday CONFIG için F1_FEATURES matrisi"""
+        values = self.indicators(config)
+        columns = {'VOL_Rel': self.vol_rel(),
+                   'HHLL_Trend': self.hhll(config['hhll_left_bars'], config['hhll_right_bars'])}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for ind in INDICATORS:
+                value = values[ind]
+                columns[f'{ind}_Dist_Pct'] = (self.close - value) / value
+                columns[f'{ind}_Slope_Rate'] = pd.Series(value).pct_change().to_numpy()
+        return np.column_stack([columns[col] for col in F1_FEATURES])
+
+
+# ============================================
+# SKORLAR
+# ============================================
+
+def label_stability(label):
+    """1 - label değişim oranı (1.0: hiç değişmeyen, 0.0: her bar değişen label)"""
+    if len(label) < 2:
+        return np.nan
+    return 1.0 - np.mean(label[1:] != label[:-1])
+
+
+def label_balance(label):
+    """Sınıf dengesi 4·p·(1-p) (1.0: yarı yarıya, 0.0: tek sınıf)"""
+    p = np.mean(label)
+    return 4.0 * p * (1.0 - p)
+
+
+def _score_stability(stocks, config, options):
+    """
+    Hisse başına kararlılık x sınıf dengesi ortalaması.
+    Hiç değişmeyen (tek sınıflı) label kararlıdır ama öğrenilecek bir şey içermez; denge
+    çarpanı bu adayları sıfıra çeker.
+    """
+    warmup = config['warmup_bars']
+    scores, stability, positive = [], [], []
+    for data in stocks.values():
+        label = data.label(config)[warmup:]
+        if len(label) < 2:
+            continue
+        stable = label_stability(label)
+        scores.append(stable * label_balance(label))
+        stability.append(stable)
+        positive.append(label.mean())
+    return {'score': float(np.mean(scores)) if scores else np.nan,
+            'stability': float(np.mean(stability)) if stability else np.nan,
+            'pos_ratio': float(np.mean(positive)) if positive else np.nan}
+
+
+def _default_model():
+    return RandomForestClassifier(n_estimators=100, min_samples_leaf=20, n_jobs=1, random_state=123)
+
+
+def _score_f1(stocks, config, options):
+    """
+    Zaman sıralı böl: Her hissenin ilk train_size kısmında eğit, kalanında TARGET F1.
+    Ufuk options['horizon'], yoksa config['target_horizons'] içindeki ilk ufuktur
+    """
+    if f1_score is None:
+        raise ImportError("'f1' skoru için scikit-learn gerekli (pip install scikit-learn)")
+
+    warmup = config['warmup_bars']
+    horizon = options.get('horizon', config['target_horizons'][0])
+    train_size = options.get('train_size', 0.8)
+    model_factory = options.get('model_factory') or _default_model
+
+    parts = {'train': ([], []), 'test': ([], [])}
+    for data in stocks.values():
+        label = data.label(config)
+        X = data.features(config)[warmup:len(label) - horizon]
+        y = label[warmup + horizon:]
+        if len(y) < 10:
+            continue
+        split = int(len(y) * train_size)
+        for name, rows in (('train', slice(None, split)), ('test', slice(split, None))):
+            parts[name][0].append(X[rows])
+            parts[name][1].append(y[rows])
+
+    if not parts['train'][0] or not parts['test'][0]:
+        return {'score': np.nan}
+    X_train, y_train = (np.concatenate(items) for items in parts['train'])
+    X_test, y_test = (np.concatenate(items) for items in parts['test'])
+    X_train = np.nan_to_num(X_train, nan=0.0, posinf=0.0, neginf=0.0)
+    X_test = np.nan_to_num(X_test, nan=0.0, posinf=0.0, neginf=0.0)
+
+    model = model_factory()
+    model.fit(X_train, y_train)
+    return {'score': float(f1_score(y_test, model.predict(X_test), zero_division=0)),
+            'pos_ratio': float(y_test.mean())}
+
+
+SCORERS = {
+    'stability': _score_stability,
+    'f1': _score_f1,
+}
+
+
+# ============================================
+# PARALEL DEĞERLENDİRME
+# ============================================
+
+def _build_intermediates(stock_arrays):
+    return {code: StockIntermediates(*arrays) for code, arrays in stock_arrays}
+
+
+def _evaluate_chunk(task):
+    """Process havuzu işçisi: Bir aday parçasını tüm hisselerde değerlendirir"""
+    stock_arrays, indexed_configs, scorer, options = task
+    stocks = _build_intermediates(stock_arrays)
+    scorer_fn = SCORERS[scorer] if isinstance(scorer, str) else scorer
+    return [(idx, scorer_fn(stocks, config, options)) for idx, config in indexed_configs]
+
+
+def run_sweep(stock_frames, grid, base_config=CONFIG, scorer='stability', n_workers=1,
+              options=None, on_progress=None):
+    """
+    Parametre ızgarasını tüm hisselerde değerlendirir.
+    stock_frames: [(code, DataFrame)] listesi (DATE sıralı, fiyat kolonları ile)
+    grid: {parametre: [değerler]} (SWEEP_PARAMS içinden)
+    scorer: 'stability' (label kararlılığı x sınıf dengesi), 'f1' (basit modelle TARGET F1) veya
+            fn(stocks, config, options) -> {'score': ...}
+    n_workers: 1 ise sıralı, >1 ise process havuzu, None ise tüm çekirdekler
+    options: Skora özel ayarlar ('f1' için horizon, train_size, model_factory)
+    Returns: Parametreler + skor kolonlarını içeren, skora göre azalan sıralı DataFrame
+    """
+    configs = expand_grid(grid, base_config)
+    options = options or {}
+    n_workers = n_workers or os.cpu_count() or 1
+
+    stock_arrays = [
+        (code, tuple(stock_df[col].to_numpy(dtype=float)
+                     for col in ('CLOSING_TL', 'HIGH_TL', 'LOW_TL', 'VOLUME_TL')))
+        for code, stock_df in stock_frames
+    ]
+
+    # Aynı indikatör periyotlarını paylaşan adaylar aynı parçaya düşsün (ara sonuçlar tekrar kullanılır)
+    indexed = sorted(enumerate(configs), key=lambda item: [item[1][key] for key in SWEEP_PARAMS])
+    n_chunks = min(len(indexed), n_workers * 4) if n_workers > 1 else 1
+    chunks = [indexed[i * len(indexed) // n_chunks:(i + 1) * len(indexed) // n_chunks]
+              for i in range(n_chunks)]
+    tasks = [(stock_arrays, chunk, scorer, options) for chunk in chunks if chunk]
+
+    scores = {}
+    if n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            for chunk_scores in executor.map(_evaluate_chunk, tasks):
+                scores.update(chunk_scores)
+                if on_progress is not None:
+                    on_progress(len(scores), len(configs))
+    else:
+        for task in tasks:
+            scores.update(_evaluate_chunk(task))
+            if on_progress is not None:
+                on_progress(len(scores), len(configs))
+
+    rows = []
+    for idx, config in enumerate(configs):
+        row = {key: config[key] for key in grid}
+        row.update(scores[idx])
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values('score', ascending=False, kind='mergesort').reset_index(drop=True)
+
+
+# ============================================
+# ANA FONKSİYON
+# ============================================
+
+SWEEP_CONFIG = {
+    'universe': 'opt',  # Optimizasyon evreni (isyat_veri.UNIVERSES)
+    'grid': {
+        'finh_period': [89, 110, 144],
+        'kama_period': [14, 21, 34],
+        'ovt_period': [55, 89],
+        'zlma_period': [89, 144],
+    },
+    'scorer': 'stability',
+    'n_workers': None,
+    'output_file': 'parametre_tarama_sonuclari.csv',
+}
+
+
+def main():
+    from data_store import PRICE_COLUMNS
+    from isyat_veri import load_universe
+    from stock_groups import StockGroups
+
+    print("=" * 60)
+    print("PARAMETRE TARAMASI")
+    print("=" * 60)
+
+    df = load_universe(SWEEP_CONFIG['universe'], CONFIG['input_file'])
+    df[PRICE_COLUMNS] = df[PRICE_COLUMNS].astype('float64')
+    stock_frames = [(code, stock_df) for code, stock_df in StockGroups(df)
+                    if len(stock_df) >= CONFIG['warmup_bars'] + 50]
+
+    n_configs = len(expand_grid(SWEEP_CONFIG['grid']))
+    print(f"📊 {len(stock_frames)} hisse, {n_configs} aday parametre seti, skor: {SWEEP_CONFIG['scorer']}")
+
+    def progress(done, total):
+        print(f"\r   Değerlendirilen: [{done}/{total}]", end="")
+
+    results = run_sweep(stock_frames, SWEEP_CONFIG['grid'], scorer=SWEEP_CONFIG['scorer'],
+                        n_workers=SWEEP_CONFIG['n_workers'], on_progress=progress)
+    results.to_csv(SWEEP_CONFIG['output_file'], index=False)
+
+    print(f"\n\n🏆 EN İYİ 10 PARAMETRE SETİ:")
+    print(results.head(10).to_string(index=False))
+    print(f"\n💾 Sonuçlar kaydedildi: {SWEEP_CONFIG['output_file']}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
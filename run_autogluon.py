@@ -1,8 +1,40 @@
 import pandas as pd
 from autogluon.tabular import TabularPredictor
 import os
+import re
+import time
+from data_store import feature_columns, read_feature_schema, read_feature_set
+from time_budget import TimeBudget
 
-def train_and_predict(train_file, prediction_file, model_name_suffix):
+# Her ufuk generate_ml_features.py'nin tek geçişte yazdığı kendi dosyasından egitilir
+# (CONFIG['target_horizons'] = [3, 5] -> ml_filtre_verileri_3_gun.parquet, ml_filtre_verileri_5_gun.parquet)
+# Ufuklar sabit yazilmaz, feature setinin semasindaki hedeflerden (TARGET_{h}D) okunur
+FEATURE_SET = 'ml_filtre_verileri.parquet'
+
+# Gece calisan egitim icin toplam sure butcesi (saniye, None: sinirsiz).
+# Egitilecek ufuklara esit paylastirilir; AutoGluon kendi payini modellere dagitir,
+# suresi yetmeyen modelleri atlar / erken durdurur.
+TIME_BUDGET_SECONDS = None
+
+# AutoGluon'un zaman yetersizligi nedeniyle atladigi / durdurdugu modellerin hata tipleri
+TIME_SKIP_ERRORS = ('InsufficientTime', 'TimeLimitExceeded')
+
+def report_time_skips(predictor, budget=None):
+    """Zaman yetmedigi icin atlanan modelleri yazdirir (ve butce raporuna ekler)"""
+    try:
+        failures = predictor.model_failures()
+    except Exception:
+        return []
+    if failures.empty:
+        return []
+    skipped = failures[failures['exc_type'].isin(TIME_SKIP_ERRORS)]
+    for _, row in skipped.iterrows():
+        print(f"Zaman yetmedi, atlandi: {row['model']} ({row['exc_type']})")
+        if budget is not None:
+            budget.record(row['model'], 'atlandı', seconds=row.get('total_time', 0.0), reason=row['exc_type'])
+    return skipped['model'].tolist()
+
+def train_and_predict(train_file, prediction_file, model_name_suffix, label='TARGET', time_limit=None, budget=None):
     save_path = f'ag_models_{model_name_suffix}'
     predictor = None
 
@@ -19,23 +51,28 @@ def train_and_predict(train_file, prediction_file, model_name_suffix):
     if predictor is None:
         print(f"--- Processing {train_file} (Training) ---")
         try:
-            train_data = pd.read_excel(train_file)
+            # Diger ufuklarin hedefleri (varsa) gelecegi icerir, hic yuklenmez (kolon projeksiyonu)
+            columns = [c for c in feature_columns(train_file) if not c.startswith('TARGET') or c == label]
+            train_data = read_feature_set(train_file, columns=columns)
         except Exception as e:
             print(f"Error reading {train_file}: {e}")
             return None
 
-        label = 'TARGET'
         if label not in train_data.columns:
             print(f"Error: '{label}' column not found in {train_file}")
             return None
 
+        if time_limit is not None:
+            print(f"Zaman limiti: {time_limit:,.0f} sn")
         predictor = TabularPredictor(label=label, path=save_path).fit(
             train_data, 
             presets='medium_quality',
             num_bag_folds=5, # OOF tahminleri uretebilmek icin bagging aciyoruz
             num_bag_sets=1,  # Hizli olmasi icin tek set
-            num_stack_levels=0 # Stacking yapma (hiz kazandirir)
+            num_stack_levels=0, # Stacking yapma (hiz kazandirir)
+            time_limit=time_limit # None: sinirsiz
         )
+        report_time_skips(predictor, budget)
 
     # Duzeltme: get_model_best() yerine model_best
     print(f"Best model for {model_name_suffix}: {predictor.model_best}")
@@ -43,15 +80,12 @@ def train_and_predict(train_file, prediction_file, model_name_suffix):
     # 3. Tahmin Asamasi
     print(f"--- Predicting using {prediction_file} ---")
     try:
-        predict_data = pd.read_excel(prediction_file)
+        # Target sutunlari varsa okunmaz (tahmin dosyasinda olmamali)
+        columns = [c for c in feature_columns(prediction_file) if not c.startswith('TARGET')]
+        predict_data = read_feature_set(prediction_file, columns=columns)
     except Exception as e:
         print(f"Error reading {prediction_file}: {e}")
         return None
-    
-    # Target sutunu varsa cikar (tahmin dosyasinda olmamali)
-    label = 'TARGET'
-    if label in predict_data.columns:
-        predict_data = predict_data.drop(columns=[label])
         
     predictions = predictor.predict(predict_data)
     
@@ -64,22 +98,55 @@ def train_and_predict(train_file, prediction_file, model_name_suffix):
     
     return results
 
+def target_horizons(feature_set=FEATURE_SET):
+    """Feature setinin hedef kolonlarindan ufuklar (TARGET_3D, TARGET_5D -> [3, 5])"""
+    horizons = []
+    for target in read_feature_schema(feature_set).get('targets', []):
+        match = re.match(r'TARGET_(\d+)D$', target)
+        if match:
+            horizons.append(int(match.group(1)))
+    return horizons
+
+def horizon_file(feature_set, horizon):
+    """ml_filtre_verileri.parquet -> ml_filtre_verileri_5_gun.parquet"""
+    base, ext = os.path.splitext(feature_set)
+    return f"{base}_{horizon}_gun{ext}"
+
 def main():
-    prediction_file = 'gunluk_feature_seti_20251125.xlsx'
+    # daily_features_only.py ciktisi
+    prediction_file = '280_gunluk_feature_seti_.parquet'
+    
+    budget = TimeBudget(TIME_BUDGET_SECONDS) if TIME_BUDGET_SECONDS else None
     
-    # 3 gunluk model (Zaten egitildi, sadece yukleyip tahmin yapacak)
-    train_and_predict(
-        train_file='ml_filtre_verileri_3_gun.xlsx',
-        prediction_file=prediction_file,
-        model_name_suffix='3_gun'
-    )
+    horizons = target_horizons(FEATURE_SET)
+    if not horizons:
+        print(f"{FEATURE_SET} icinde hedef kolonu (TARGET_{{h}}D) bulunamadi, once generate_ml_features.py calistirin")
+        return
+    
+    # Egitilmis model varsa yuklenip sadece tahmin yapilir, yoksa sifirdan egitilir
+    for position, horizon in enumerate(horizons):
+        time_limit = None
+        if budget is not None:
+            # Kalan sure kalan ufuklara esit bolunur (erken biten ufkun artan suresi sonrakilere kalir)
+            time_limit = budget.share(len(horizons) - position)
+            if budget.exhausted() and not os.path.exists(os.path.join(f'ag_models_{horizon}_gun', "predictor.pkl")):
+                print(f"--- Sure butcesi bitti, {horizon}_gun atlandi ---")
+                budget.record(f'{horizon}_gun', 'atlandı', reason='bütçe bitti')
+                continue
+        started = time.perf_counter()
+        train_and_predict(
+            train_file=horizon_file(FEATURE_SET, horizon),
+            prediction_file=prediction_file,
+            model_name_suffix=f'{horizon}_gun',
+            label=f'TARGET_{horizon}D',
+            time_limit=time_limit,
+            budget=budget
+        )
+        if budget is not None:
+            budget.record(f'{horizon}_gun', 'tamamlandı', seconds=time.perf_counter() - started, limit=time_limit)
     
-    # 5 gunluk model (Henuz egitilmedi, sifirdan baslayacak)
-    train_and_predict(
-        train_file='ml_filtre_verileri_5_gun.xlsx',
-        prediction_file=prediction_file,
-        model_name_suffix='5_gun'
-    )
+    if budget is not None:
+        budget.print_report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
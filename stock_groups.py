@@ -0,0 +1,40 @@
+import numpy as np
+
+
+class StockGroups:
+    """
+    Hisse bazlı gruplanmış erişim.
+
+    Veri bir kez (CODE, DATE) sırasına dizilir ve her hissenin satırları bitişik bir blok
+    olur; hisseler offset ile kopyasız dilim (iloc[start:end]) olarak verilir. Her hisse için
+    df[df['CODE'] == stock] ile tüm tabloyu taramaya gerek kalmaz.
+    """
+
+    def __init__(self, df, code_col='CODE', date_col='DATE'):
+        self.df = df.sort_values([code_col, date_col], kind='mergesort').reset_index(drop=True)
+
+        codes = self.df[code_col].to_numpy()
+        starts = np.flatnonzero(codes[1:] != codes[:-1]) + 1 if len(codes) else np.array([], dtype=int)
+        self.starts = np.r_[0, starts] if len(codes) else starts
+        self.ends = np.r_[self.starts[1:], len(codes)] if len(codes) else starts
+        self.codes = [str(code) for code in codes[self.starts]]
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        for i, code in enumerate(self.codes):
+            yield code, self.df.iloc[self.starts[i]:self.ends[i]]
+
+    def __contains__(self, code):
+        return code in self._positions
+
+    def get(self, code):
+        """Tek bir hissenin (DATE sıralı) satırları"""
+        i = self._positions[code]
+        return self.df.iloc[self.starts[i]:self.ends[i]]
+
+    def sizes(self):
+        """{code: satır sayısı}"""
+        return dict(zip(self.codes, (self.ends - self.starts).tolist()))
@@ -0,0 +1,588 @@
+import math
+import os
+import pickle
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from generate_ml_features import (INDICATORS, LABEL_COLUMNS, build_feature_registry, get_output_columns,
+                                  resolve_features)
+
+# ============================================
+# AKAN (STREAMING) İNDİKATÖR GÜNCELLEMESİ
+# ============================================
+# Günlük tahminde her hisse için tüm geçmişi baştan hesaplamak yerine
+# indikatörlerin iç durumu (EMA değeri, WMA pencereleri, regresyon
+# toplamları, son pivot seviyeleri...) hisse başına saklanır ve her yeni
+# bar sabit maliyetle (geçmiş uzunluğundan bağımsız) işlenir.
+# Sonuçlar calculate_all_filters(is_inference=True) ile kayan nokta
+# toleransında aynıdır.
+#
+# HHLL pivotları right_bars kadar gecikmeli onaylandığı için son
+# right_bars + 1 barın trendi (ve label'ı) her güncellemede yeniden
+# hesaplanır; toplu hesaplama da aynı satırları bugünkü veriyle revize eder.
+
+STATE_DIR = 'streaming_state'
+# Durum biçimi değişince artırılır (eski kayıtlar yeniden kurulur)
+STATE_VERSION = 3
+
+_NAN = float('nan')
+
+
+def _div(a, b):
+    """Pandas ile aynı bölme (sıfıra bölmede inf / nan)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+
+class _Window:
+    """Sabit boyutlu kayan pencere (NaN sayacı ve NaN'sız değerlerin kayan toplamı ile)
+
+    Toplam her push'ta O(1) güncellenir; kayan nokta birikimini sınırlamak için
+    her size push'ta bir tam (fsum) toplama ile yeniden hesaplanır (amortize O(1)).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.nan_count = 0
+        self.total = 0.0
+        self._since_resum = 0
+
+    def push(self, x):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+        self.values.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self.total += x
+
+        self._since_resum += 1
+        if self._since_resum >= self.size:
+            self._since_resum = 0
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    @property
+    def valid(self):
+        # rolling(window).xxx() ile aynı: pencere dolu ve içinde NaN yok
+        return self.full and self.nan_count == 0
+
+
+class _EMA:
+    """Pine Script EMA - calculate_ema_custom ile aynı"""
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = _NAN
+
+    def update(self, x):
+        if math.isnan(x):
+            self.value = _NAN
+        elif math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class _EWM:
+    """pandas ewm(span, adjust=False).mean() ile aynı özyineleme"""
+
+    def __init__(self, span):
+        alpha = 2.0 / (span + 1)
+        self.new_wt = alpha
+        self.old_wt_factor = 1.0 - alpha
+        self.old_wt = 1.0
+        self.value = _NAN
+
+    def update(self, x):
+        if math.isnan(self.value):
+            if not math.isnan(x):
+                self.value = x
+                self.old_wt = 1.0
+            return self.value
+
+        self.old_wt *= self.old_wt_factor
+        if not math.isnan(x):
+            if self.value != x:
+                self.value = ((self.old_wt * self.value + self.new_wt * x)
+                              / (self.old_wt + self.new_wt))
+            self.old_wt = 1.0
+        return self.value
+
+
+class _WMA:
+    """Ağırlıklı hareketli ortalama - calculate_wma ile aynı
+
+    Düz toplam S ve ağırlıklı toplam W kayan olarak tutulur (bar başına O(1)):
+    W' = W - S + p·x_yeni (S eski değeri de içerirken). Her period barda W tam
+    olarak yeniden toplanır. Pencere tamamen aynı değerlerden oluşuyorsa (işlem
+    durması vb.) değer sabitlenir: Toplu hesaplamadaki gibi eğim tam 0 kalır.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.window = _Window(period)
+        self.weight_sum = period * (period + 1) / 2
+        self.weighted = 0.0
+        self._since_resum = 0
+        self.run = 0
+        self.flat_value = None
+
+    def _resum(self):
+        self._since_resum = 0
+        self.weighted = math.fsum(k * v for k, v in enumerate(self.window.values, 1)
+                                  if not math.isnan(v))
+
+    def update(self, x):
+        window = self.window
+        y = 0.0 if math.isnan(x) else x
+        if window.full:
+            self.weighted += self.period * y - window.total
+        else:
+            self.weighted += (len(window.values) + 1) * y
+        last = window.values[-1] if window.values else _NAN
+        window.push(x)
+        if x == last:
+            self.run += 1
+        else:
+            self.run = 1
+            self.flat_value = None
+
+        self._since_resum += 1
+        if self._since_resum >= self.period:
+            self._resum()
+
+        if not window.valid:
+            self.flat_value = None
+            return _NAN
+        if self.run >= self.period:
+            if self.flat_value is None:
+                self._resum()
+                self.flat_value = self.weighted / self.weight_sum
+            return self.flat_value
+        self.flat_value = None
+        return self.weighted / self.weight_sum
+
+
+class _LinReg:
+    """Kayan doğrusal regresyon - rolling_linreg ile aynı (Sy, Sxy toplamları)"""
+
+    def __init__(self, length, offset=0):
+        self.length = length
+        self.offset = offset
+        self.window = _Window(length)
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+
+        x = np.arange(length, dtype=np.float64)
+        self.sum_x = x.sum()
+        self.denom = length * (x * x).sum() - self.sum_x ** 2
+
+    def update(self, value):
+        L = self.length
+        y = 0.0 if math.isnan(value) else value
+        if self.window.full:
+            old = self.window.values[0]
+            y_old = 0.0 if math.isnan(old) else old
+            self.sum_xy = self.sum_xy - (self.sum_y - y_old) + (L - 1) * y
+            self.sum_y = self.sum_y - y_old + y
+        else:
+            self.sum_xy += len(self.window.values) * y
+            self.sum_y += y
+        self.window.push(value)
+
+        if not self.window.valid:
+            return _NAN
+        if L == 1:
+            return value
+
+        slope = (L * self.sum_xy - self.sum_x * self.sum_y) / self.denom
+        intercept = (self.sum_y - slope * self.sum_x) / L
+        return intercept + slope * (L - 1 - self.offset)
+
+
+class _KAMA:
+    """Kaufman Adaptive Moving Average - calculate_kama ile aynı"""
+
+    def __init__(self, length):
+        self.closes = deque(maxlen=length + 1)
+        self.noise = _Window(length)
+        self.value = _NAN
+        self.started = False
+
+    def update(self, close):
+        prev_close = self.closes[-1] if self.closes else _NAN
+        self.noise.push(abs(close - prev_close))
+        self.closes.append(close)
+
+        if len(self.closes) == self.closes.maxlen and self.noise.valid:
+            nefratio = _div(abs(close - self.closes[0]), self.noise.total)
+        else:
+            nefratio = _NAN
+        if math.isnan(nefratio) or math.isinf(nefratio):
+            nefratio = 0.0
+
+        smooth = (nefratio * (0.666 - 0.0645) + 0.0645) ** 2
+        if not self.started:
+            self.value = close
+            self.started = True
+        else:
+            self.value = self.value + smooth * (close - self.value)
+        return self.value
+
+
+class _HHLL:
+    """HHLL trendi - detect_hhll_trend ile aynı
+
+    Pivot ancak right_bars bar sonra onaylanır; bu yüzden son right_bars + 1
+    barın trendi her güncellemede son onaylı trendden yeniden hesaplanır.
+    """
+
+    def __init__(self, left_bars, right_bars):
+        self.left_bars = left_bars
+        self.right_bars = right_bars
+        self.highs = deque(maxlen=left_bars + right_bars + 1)
+        self.lows = deque(maxlen=left_bars + right_bars + 1)
+        self.closes = deque(maxlen=right_bars + 1)
+        self.resistance = _NAN
+        self.support = _NAN
+        self.final_trend = 0.0
+
+    def update(self, high, low, close):
+        self.highs.append(high)
+        self.lows.append(low)
+        self.closes.append(close)
+
+        # Artık sağında right_bars bar olan aday pivotu kontrol et
+        if len(self.highs) == self.highs.maxlen:
+            L = self.left_bars
+            highs = list(self.highs)
+            lows = list(self.lows)
+            hi, lo = highs[L], lows[L]
+            if (not any(h >= hi for h in highs[:L])
+                    and not any(h > hi for h in highs[L + 1:])
+                    and not math.isnan(hi)):
+                self.resistance = hi
+            if (not any(l <= lo for l in lows[:L])
+                    and not any(l < lo for l in lows[L + 1:])
+                    and not math.isnan(lo)):
+                self.support = lo
+
+        trend = self.final_trend
+        tail = []
+        for c in self.closes:
+            if c > self.resistance:
+                trend = 1.0
+            elif c < self.support:
+                trend = 0.0
+            tail.append(trend)
+
+        # Pencerenin ilk barı artık kesinleşti
+        if len(self.closes) == self.closes.maxlen:
+            self.final_trend = tail[0]
+        return tail
+
+
+class _Label:
+    """Trend label'ı - calculate_label ile aynı (HHLL kuyruğu ile birlikte revize edilir)"""
+
+    def __init__(self, right_bars):
+        self.all_up = deque(maxlen=right_bars + 1)
+        self.all_down = deque(maxlen=right_bars + 1)
+        self.final_label = 0
+
+    def update(self, others, trend_tail):
+        self.all_up.append(all(v == 1 for v in others))
+        self.all_down.append(all(v == 0 for v in others))
+
+        label = self.final_label
+        tail = []
+        for up, down, trend in zip(self.all_up, self.all_down, trend_tail):
+            if up and trend == 1:
+                label = 1
+            elif down and trend == 0:
+                label = 0
+            tail.append(label)
+
+        if len(self.all_up) == self.all_up.maxlen:
+            self.final_label = tail[0]
+        return tail
+
+
+# ============================================
+# HİSSE BAZLI DURUM
+# ============================================
+
+def _state_config(config):
+    """Durumu etkileyen ayarlar (değişirse durum yeniden kurulur)"""
+    keys = ['finh_period', 'kama_period', 'blueline_period', 'hhll_left_bars',
+            'hhll_right_bars', 'ovt_period', 'lrb_period', 'zlma_period',
+            'zlma_smooth', 'lag_days', 'target_horizons', 'feature_columns']
+    return {key: config[key] for key in keys}
+
+
+class StreamingFeatures:
+    """Tek hisse için akan feature durumu
+
+    update() her yeni barı sabit maliyetle işler, frame() son keep_rows
+    satırı calculate_all_filters(is_inference=True) çıktısı biçiminde verir.
+    İşlenen son keep_rows barın OHLCV değerleri saklanır; append_frame gelen
+    verinin bu aralıkla birebir aynı olduğunu doğrular.
+    """
+
+    def __init__(self, code, config, keep_rows=280):
+        self.version = STATE_VERSION
+        self.code = code
+        self.config = _state_config(config)
+        self.keep_rows = keep_rows
+        self.columns = get_output_columns(config)
+        # Bilinmeyen kolonlar toplu hesaplamadaki gibi hemen hata verir
+        resolve_features(self.columns, build_feature_registry(config))
+        self.n_bars = 0
+        self.bars = deque(maxlen=max(keep_rows, 1))
+
+        self.horizons = tuple(config['target_horizons'])
+        lags = config['lag_days']
+        self.max_lag = max(lags) if lags else 0
+        right_bars = config['hhll_right_bars']
+
+        self.vol_window = _Window(10)
+
+        finh_period = config['finh_period']
+        self.finh = [_EMA(2 / (finh_period + 1)), _EMA(2 / (finh_period / 2 + 1)),
+                     _EMA(2 / (np.sqrt(finh_period) + 1))]
+        self.kama = _KAMA(config['kama_period'])
+        self.blueline = [_EWM(config['blueline_period']) for _ in range(3)]
+        ovt_period = config['ovt_period']
+        self.ovt_half = _WMA(int(np.round(ovt_period / 2)))
+        self.ovt_full = _WMA(ovt_period)
+        self.ovt_smooth = _WMA(int(np.round(np.sqrt(ovt_period))))
+        self.lrb = _LinReg(config['lrb_period'])
+        self.zlma = [_WMA(config['zlma_period']), _WMA(config['zlma_smooth']),
+                     _WMA(config['zlma_period'])]
+        self.hhll = _HHLL(config['hhll_left_bars'], right_bars)
+        self.label = _Label(right_bars)
+
+        self.prev_values = {ind: _NAN for ind in INDICATORS}
+        self.history = {}
+        for ind in INDICATORS:
+            self.history[f'{ind}_Dist_Pct'] = deque(maxlen=self.max_lag)
+            self.history[f'{ind}_Slope_Rate'] = deque(maxlen=self.max_lag)
+
+        # HHLL ve label geçmişi: tutulan satırlar + lag / hedef ufku kadar
+        max_horizon = max(self.horizons)
+        self.trend_hist = deque(maxlen=keep_rows + self.max_lag + right_bars + 1)
+        self.label_hist = deque(maxlen=keep_rows + max_horizon + right_bars + 1)
+        self.rows = deque(maxlen=keep_rows)
+
+    # --------------------------------------------
+    def _indicator_values(self, close):
+        values = {}
+
+        ema1 = self.finh[0].update(close)
+        ema2 = self.finh[1].update(close)
+        values['FINH'] = self.finh[2].update(2 * ema2 - ema1)
+
+        values['KAMA'] = self.kama.update(close)
+
+        ema1 = self.blueline[0].update(close)
+        ema2 = self.blueline[1].update(ema1)
+        ema3 = self.blueline[2].update(ema2)
+        values['BlueLine'] = 3 * (ema1 - ema2) + ema3
+
+        diff = 2 * self.ovt_half.update(close) - self.ovt_full.update(close)
+        values['OVT'] = self.ovt_smooth.update(diff)
+
+        values['LRB'] = self.lrb.update(close)
+
+        price_ma = self.zlma[0].update(close)
+        smooth_ma = self.zlma[1].update(price_ma)
+        price_ma2 = self.zlma[2].update(smooth_ma)
+        values['ZLMA'] = 2 * smooth_ma - price_ma2
+        return values
+
+    def update(self, date, close, low, high, volume):
+        """Yeni bir barı işle ve satır listesine ekle"""
+        close, low, high, volume = float(close), float(low), float(high), float(volume)
+        bar = self.n_bars
+        self.n_bars += 1
+        self.bars.append((pd.Timestamp(date), close, low, high, volume))
+
+        self.vol_window.push(volume)
+        vol_ma = (self.vol_window.total / self.vol_window.size
+                  if self.vol_window.valid else _NAN)
+
+        row = {'CODE': self.code, 'DATE': pd.Timestamp(date), 'CLOSING_TL': close,
+               'LOW_TL': low, 'HIGH_TL': high, 'VOLUME_TL': volume,
+               'VOL_Rel': _div(volume, vol_ma), '_bar': bar}
+
+        binaries = {}
+        values = self._indicator_values(close)
+        for ind in INDICATORS:
+            value = values[ind]
+            prev = self.prev_values[ind]
+            self.prev_values[ind] = value
+
+            dist = _div(close - value, value)
+            slope = _div(value, prev) - 1
+            binaries[f'{ind}_Slope'] = int(value - prev > 0)
+            binaries[f'{ind}_PriceAbove'] = int(close > value)
+
+            row[ind] = value
+            row[f'{ind}_Slope'] = binaries[f'{ind}_Slope']
+            row[f'{ind}_Dist_Pct'] = dist
+            row[f'{ind}_Slope_Rate'] = slope
+            row[f'{ind}_PriceAbove'] = binaries[f'{ind}_PriceAbove']
+
+            for name, current in ((f'{ind}_Dist_Pct', dist), (f'{ind}_Slope_Rate', slope)):
+                hist = self.history[name]
+                for lag in self.config['lag_days']:
+                    row[f'{name}_Lag{lag}'] = hist[-lag] if len(hist) >= lag else _NAN
+                if self.max_lag:
+                    hist.append(current)
+
+        # HHLL ve label kuyruğunu revize et
+        trend_tail = self.hhll.update(high, low, close)
+        others = [binaries[col] for col in LABEL_COLUMNS if col != 'HHLL_Trend']
+        label_tail = self.label.update(others, trend_tail)
+
+        self.trend_hist.append(_NAN)
+        self.label_hist.append(0)
+        for k, (trend, label) in enumerate(zip(trend_tail, label_tail)):
+            pos = k - len(trend_tail)
+            self.trend_hist[pos] = trend
+            self.label_hist[pos] = label
+
+        self.rows.append(row)
+        self._patch_tail(len(trend_tail) + max(self.horizons))
+        return row
+
+    def _patch_tail(self, n_rows):
+        """Revize edilen HHLL / label değerlerini son satırlara yaz"""
+        last_bar = self.n_bars - 1
+        trend_first = self.n_bars - len(self.trend_hist)
+        label_first = self.n_bars - len(self.label_hist)
+
+        for i in range(max(len(self.rows) - n_rows, 0), len(self.rows)):
+            row = self.rows[i]
+            bar = row['_bar']
+            row['HHLL_Trend'] = self.trend_hist[bar - trend_first]
+            for lag in self.config['lag_days']:
+                src = bar - lag
+                row[f'HHLL_Trend_Lag{lag}'] = (self.trend_hist[src - trend_first]
+                                               if src >= max(trend_first, 0) else _NAN)
+            row['Current_Trend'] = self.label_hist[bar - label_first]
+            for h in self.horizons:
+                target = bar + h
+                row[f'TARGET_{h}D'] = (float(self.label_hist[target - label_first])
+                                       if target <= last_bar else _NAN)
+
+    # --------------------------------------------
+    def frame(self):
+        """Tutulan satırları DataFrame olarak döndür"""
+        df = pd.DataFrame(list(self.rows))
+        if df.empty:
+            return pd.DataFrame(columns=self.columns)
+        missing = [col for col in self.columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Akan hesaplama bu kolonları üretmiyor: {', '.join(missing)}")
+        int_cols = ([f'{ind}_PriceAbove' for ind in INDICATORS] + [f'{ind}_Slope' for ind in INDICATORS]
+                    + ['Current_Trend'])
+        df[int_cols] = df[int_cols].astype(int)
+        return df[self.columns]
+
+    def append_frame(self, stock_df):
+        """Son işlenen bardan sonraki barları uygula
+
+        Durumla uyuşmayan veri gelirse (saklanan son keep_rows bar içinde bir
+        bar eklenmiş / silinmiş / revize edilmiş, bugünün barı değişmiş vb.)
+        False döner; çağıran durumu baştan kurmalıdır.
+        """
+        stock_df = stock_df.sort_values('DATE')
+        dates = pd.to_datetime(stock_df['DATE'])
+        if self.bars:
+            last_date = self.bars[-1][0]
+            overlap = stock_df[dates <= last_date].tail(len(self.bars))
+            if len(overlap) != len(self.bars):
+                return False
+            stored_dates = np.array([bar[0] for bar in self.bars], dtype='datetime64[ns]')
+            stored = np.array([bar[1:] for bar in self.bars], dtype=float)
+            incoming = overlap[['CLOSING_TL', 'LOW_TL', 'HIGH_TL', 'VOLUME_TL']].to_numpy(dtype=float)
+            if not (np.array_equal(pd.to_datetime(overlap['DATE']).to_numpy(dtype='datetime64[ns]'), stored_dates)
+                    and np.array_equal(incoming, stored, equal_nan=True)):
+                return False
+            stock_df = stock_df[dates > last_date]
+
+        for date, close, low, high, volume in zip(stock_df['DATE'], stock_df['CLOSING_TL'],
+                                                  stock_df['LOW_TL'], stock_df['HIGH_TL'],
+                                                  stock_df['VOLUME_TL']):
+            self.update(date, close, low, high, volume)
+        return True
+
+    def matches(self, config, keep_rows):
+        return (getattr(self, 'version', 1) == STATE_VERSION
+                and self.config == _state_config(config) and self.keep_rows == keep_rows)
+
+    @classmethod
+    def from_frame(cls, code, stock_df, config, keep_rows=280):
+        """Tüm geçmişi baştan işleyerek durum kur"""
+        state = cls(code, config, keep_rows)
+        state.append_frame(stock_df)
+        return state
+
+
+# ============================================
+# DURUM SAKLAMA
+# ============================================
+
+def _state_path(state_dir, code):
+    return os.path.join(state_dir, f'{code}.pkl')
+
+
+def load_state(state_dir, code):
+    """Hissenin kayıtlı durumunu oku (yoksa / bozuksa None)"""
+    path = _state_path(state_dir, code)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def save_state(state_dir, state):
+    """Durumu atomik olarak yaz"""
+    os.makedirs(state_dir, exist_ok=True)
+    path = _state_path(state_dir, state.code)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def update_stock(code, stock_df, config, keep_rows=280, state_dir=STATE_DIR):
+    """Hissenin durumunu yükle, yeni barları uygula ve kaydet
+
+    Returns:
+        (features_df, rebuilt): son keep_rows satır ve durumun baştan
+        kurulup kurulmadığı
+    """
+    state = load_state(state_dir, code)
+    rebuilt = False
+    if state is None or not state.matches(config, keep_rows) or not state.append_frame(stock_df):
+        state = StreamingFeatures.from_frame(code, stock_df, config, keep_rows)
+        rebuilt = True
+    save_state(state_dir, state)
+    return state.frame(), rebuilt
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from data_store import read_feature_set, write_feature_set
+
+
+def make_feature_set(path):
+    frames = [pd.DataFrame({'CODE': code, 'DATE': pd.bdate_range('2021-01-01', periods=5)[::-1],
+                            'FINH': np.arange(5.0) + i, 'KAMA': np.arange(5.0)})
+              for i, code in enumerate(['B', 'A'])]
+    write_feature_set(pd.concat(frames, ignore_index=True), path)
+
+
+def test_projection_without_date(tmp_path):
+    path = str(tmp_path / 'features')
+    make_feature_set(path)
+    df = read_feature_set(path, columns=['FINH'])
+    assert list(df.columns) == ['FINH']
+    # Sıralama yine CODE, DATE'e göre: A hissesinin en eski barı başta
+    assert df['FINH'].tolist() == [5.0, 4.0, 3.0, 2.0, 1.0, 4.0, 3.0, 2.0, 1.0, 0.0]
@@ -0,0 +1,41 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_cache import FeatureCache
+
+
+def make_output(n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'CODE': 'TEST', 'FINH': rng.normal(size=n_rows)})
+
+
+def test_configurations_coexist(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    prices = pd.DataFrame({'CLOSING_TL': np.arange(10.0)})
+    train_key = cache.make_key('TEST', prices, {'is_inference': False})
+    infer_key = cache.make_key('TEST', prices, {'is_inference': True})
+    assert train_key != infer_key
+
+    cache.put('TEST', train_key, make_output(seed=1))
+    cache.put('TEST', infer_key, make_output(seed=2))
+    pd.testing.assert_frame_equal(cache.get('TEST', train_key), make_output(seed=1))
+    pd.testing.assert_frame_equal(cache.get('TEST', infer_key), make_output(seed=2))
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    keys = [f'k{i}' for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put('TEST', key, make_output(seed=i))
+        stamp = time.time() - 100 + i
+        os.utime(cache._path('TEST', key), (stamp, stamp))
+    cache.get('TEST', keys[0])  # En eski kayıt kullanıldı: Artık en yeni
+
+    cache.max_bytes = cache.size() - 1
+    assert cache.evict() == 1
+    assert cache.get('TEST', keys[1]) is None
+    assert cache.get('TEST', keys[0]) is not None
+    assert cache.get('TEST', keys[2]) is not None
@@ -0,0 +1,15 @@
+from feature_profiler import PANEL_CODE, FeatureProfiler
+
+
+def test_panel_records_do_not_count_as_stock():
+    profiler = FeatureProfiler(trace_memory=False)
+    profiler.merge([
+        {'code': code, 'stage': 'indicator', 'indicator': 'FINH', 'column': 'FINH',
+         'wall_s': 0.1, 'cpu_s': 0.1, 'peak_bytes': 0}
+        for code in ['A', 'B']
+    ])
+    profiler.merge([{'code': PANEL_CODE, 'stage': 'indicator', 'indicator': 'panel', 'column': 'panel',
+                     'wall_s': 1.0, 'cpu_s': 1.0, 'peak_bytes': 0}])
+    summary = profiler.summary()
+    assert summary.loc['FINH', 'wall_ms_per_stock'] == 100.0
+    assert summary.loc['panel', 'wall_ms_per_stock'] == 500.0
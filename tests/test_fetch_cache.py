@@ -0,0 +1,57 @@
+import datetime
+import os
+
+import pandas as pd
+
+from fetch_cache import DATE_FORMAT, FetchCache, cached_fetch
+
+
+class StubServer:
+    """Her iş günü için bir bar döndüren sahte İş Yatırım; istekleri kaydeder"""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, symbols, start_date, end_date, **kwargs):
+        self.requests.append((symbols[0], start_date, end_date))
+        start = datetime.datetime.strptime(start_date, DATE_FORMAT)
+        end = datetime.datetime.strptime(end_date, DATE_FORMAT)
+        dates = pd.bdate_range(start, end)
+        return pd.DataFrame({'HGDG_HS_KODU': symbols[0], 'HGDG_TARIH': dates.strftime(DATE_FORMAT),
+                             'HGDG_KAPANIS': range(len(dates))})
+
+
+def fetch_range(server, cache, today, years=3):
+    start = today - datetime.timedelta(days=365 * years)
+    fetch = cached_fetch(server, cache, today=today)
+    return fetch(symbols=['TEST'], start_date=start.strftime(DATE_FORMAT),
+                 end_date=today.strftime(DATE_FORMAT))
+
+
+def test_closed_years_are_reused_across_days(tmp_path):
+    server = StubServer()
+    cache = FetchCache(str(tmp_path))
+    today = datetime.date(2024, 6, 12)
+    df = fetch_range(server, cache, today)
+    dates = pd.to_datetime(df['HGDG_TARIH'], dayfirst=True)
+    assert dates.min().date() >= today - datetime.timedelta(days=365 * 3)
+    assert dates.max().date() == today
+    assert dates.is_unique
+
+    for offset in range(1, 4):
+        server.requests.clear()
+        fetch_range(server, cache, today + datetime.timedelta(days=offset))
+        # Sadece içinde bulunulan yıl sunucuya sorulur
+        assert [(start[-4:], end[-4:]) for _, start, end in server.requests] == [('2024', '2024')]
+
+    immutable = [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith('.imm.pkl')]
+    assert len(immutable) == 3  # 2021, 2022, 2023: Her gün yeni kayıt eklenmez
+
+
+def test_cached_result_matches_direct_fetch(tmp_path):
+    server = StubServer()
+    today = datetime.date(2024, 6, 12)
+    cached = fetch_range(server, FetchCache(str(tmp_path)), today)
+    start = today - datetime.timedelta(days=365 * 3)
+    direct = server(symbols=['TEST'], start_date=start.strftime(DATE_FORMAT), end_date=today.strftime(DATE_FORMAT))
+    assert cached['HGDG_TARIH'].tolist() == direct['HGDG_TARIH'].tolist()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_ml_features import _wma_values, calculate_wma
+
+
+def reference_wma(series, period):
+    """Önceki implementasyon: rolling().apply ile pencere başına Python fonksiyonu"""
+    weights = np.arange(1, period + 1)
+
+    def wma_calc(x):
+        if len(x) < period:
+            return np.nan
+        return np.sum(weights * x) / weights.sum()
+
+    return series.rolling(window=period).apply(wma_calc, raw=True)
+
+
+def random_series(n, seed, nan_runs=3):
+    """Rastgele yürüyüş fiyat serisi; içinde rastgele uzunlukta NaN blokları"""
+    rng = np.random.default_rng(seed)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    for _ in range(nan_runs):
+        start = rng.integers(0, n)
+        values[start:start + rng.integers(1, 20)] = np.nan
+    return pd.Series(values)
+
+
+@pytest.mark.parametrize('period', [1, 2, 5, 13, 89, 144])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_wma_matches_rolling_apply(period, seed):
+    series = random_series(600, seed)
+    np.testing.assert_allclose(calculate_wma(series, period).to_numpy(),
+                               reference_wma(series, period).to_numpy(), rtol=1e-10, atol=1e-10)
+
+
+@pytest.mark.parametrize('n', [0, 1, 5, 12])
+def test_wma_short_series(n):
+    series = random_series(n, seed=3, nan_runs=0) if n else pd.Series([], dtype=float)
+    np.testing.assert_allclose(calculate_wma(series, 13).to_numpy(),
+                               reference_wma(series, 13).to_numpy())
+
+
+def test_wma_leading_and_trailing_nan():
+    series = random_series(300, seed=4, nan_runs=0)
+    series.iloc[:40] = np.nan
+    series.iloc[-7:] = np.nan
+    np.testing.assert_allclose(calculate_wma(series, 21).to_numpy(),
+                               reference_wma(series, 21).to_numpy(), rtol=1e-10, atol=1e-10)
+
+
+def test_wma_flat_run_is_exact():
+    """Sabit fiyatta aynı pencereler aynı değeri vermeli (binary _Slope kolonları titremesin)"""
+    series = pd.Series(np.r_[np.linspace(10, 20, 50), np.full(100, 17.3)])
+    result = calculate_wma(series, 21).to_numpy()
+    assert np.all(np.diff(result[80:]) == 0)
+
+
+def test_wma_2d_matches_columns():
+    """Panel motoru 0. eksen boyunca (tarih x hisse) çalışır: Kolon kolon sonuçla aynı"""
+    matrix = np.column_stack([random_series(400, seed).to_numpy() for seed in range(5)])
+    result = _wma_values(matrix, 34)
+    for j in range(matrix.shape[1]):
+        np.testing.assert_allclose(result[:, j], reference_wma(pd.Series(matrix[:, j]), 34).to_numpy(),
+                                   rtol=1e-10, atol=1e-10)
+
+
+def test_wma_preserves_index():
+    series = random_series(50, seed=5, nan_runs=0)
+    series.index = pd.date_range('2024-01-01', periods=50)
+    assert calculate_wma(series, 5).index.equals(series.index)
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from isyat_veri import COLUMN_MAP, fetch_all, fetch_symbol
+
+
+class FlakyServer:
+    """Her hisse için ilk failures[hisse] istekte hata veren, sonra bar döndüren sahte İş Yatırım"""
+
+    def __init__(self, failures, delays=None, empty=()):
+        self.failures = dict(failures)
+        self.delays = delays or {}
+        self.empty = set(empty)
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, symbols, start_date, end_date, save_to_excel=False):
+        symbol = symbols[0]
+        with self._lock:
+            self.calls[symbol] = self.calls.get(symbol, 0) + 1
+            attempt = self.calls[symbol]
+        time.sleep(self.delays.get(symbol, 0))
+        if attempt <= self.failures.get(symbol, 0):
+            raise ConnectionError(f"{symbol} zaman aşımı")
+        if symbol in self.empty:
+            return None
+        row = {column: 1.0 for column in COLUMN_MAP}
+        row.update({'HGDG_HS_KODU': symbol, 'HGDG_TARIH': start_date, 'EXTRA': 0})
+        return pd.DataFrame([row])
+
+
+def test_fetch_symbol_retries_with_backoff():
+    server = FlakyServer({'THYAO': 2})
+    sleeps = []
+    df, attempts = fetch_symbol('THYAO', '01-01-2024', '05-01-2024', fetch_fn=server,
+                                max_retries=3, backoff_base=1.0, sleep_fn=sleeps.append)
+    assert attempts == 3
+    assert server.calls['THYAO'] == 3
+    assert list(df.columns) == list(COLUMN_MAP.values())
+    # Üstel bekleme: 1, 2 (+ en fazla %10 sapma)
+    assert len(sleeps) == 2
+    assert 1.0 <= sleeps[0] <= 1.1 and 2.0 <= sleeps[1] <= 2.2
+
+
+def test_fetch_symbol_gives_up_after_max_retries():
+    server = FlakyServer({'THYAO': 5})
+    with pytest.raises(ConnectionError):
+        fetch_symbol('THYAO', '01-01-2024', '05-01-2024', fetch_fn=server, max_retries=2,
+                     sleep_fn=lambda seconds: None)
+    assert server.calls['THYAO'] == 3
+
+
+@pytest.mark.parametrize('concurrent', [True, False])
+def test_fetch_all_keeps_symbol_order_and_reports_failures(concurrent):
+    symbols = ['AKBNK', 'BAD', 'GARAN', 'EMPTY', 'THYAO']
+    # İlk hisse en geç biter: Sonuç sırası tamamlanma sırasına değil sembol listesine bağlı olmalı
+    server = FlakyServer({'AKBNK': 1, 'GARAN': 2, 'BAD': 10}, delays={'AKBNK': 0.05}, empty=['EMPTY'])
+    dataframes, summary = fetch_all(symbols, '01-01-2024', '05-01-2024', fetch_fn=server,
+                                    concurrent=concurrent, max_workers=4, requests_per_second=0,
+                                    max_retries=3, sleep_fn=lambda seconds: None)
+
+    assert [df['CODE'].iloc[0] for df in dataframes] == ['AKBNK', 'GARAN', 'THYAO']
+    assert server.calls == {'AKBNK': 2, 'BAD': 4, 'GARAN': 3, 'EMPTY': 1, 'THYAO': 1}
+    assert summary['AKBNK'] == {'status': 'ok', 'rows': 1, 'attempts': 2}
+    assert summary['GARAN']['attempts'] == 3
+    assert summary['EMPTY']['status'] == 'boş'
+    assert summary['BAD']['status'] == 'hata'
+    assert 'zaman aşımı' in summary['BAD']['error']
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_ml_features import (CONFIG, LABEL_COLUMNS, calculate_all_filters, calculate_label, detect_hhll_trend,
+                                  get_target_columns)
+
+
+# --------------------------------------------
+# Referans: Vektörleştirme öncesi döngü implementasyonları
+# --------------------------------------------
+
+def reference_hhll_trend(df, left_bars, right_bars):
+    high = df['HIGH_TL'].values
+    low = df['LOW_TL'].values
+    close = df['CLOSING_TL'].values
+
+    n = len(df)
+    trend = np.zeros(n)
+    pivot_highs = []
+    pivot_lows = []
+
+    for i in range(left_bars, n - right_bars):
+        is_pivot_high = True
+        for j in range(i - left_bars, i):
+            if high[j] >= high[i]:
+                is_pivot_high = False
+                break
+        for j in range(i + 1, i + right_bars + 1):
+            if high[j] > high[i]:
+                is_pivot_high = False
+                break
+        if is_pivot_high:
+            pivot_highs.append((i, high[i]))
+
+        is_pivot_low = True
+        for j in range(i - left_bars, i):
+            if low[j] <= low[i]:
+                is_pivot_low = False
+                break
+        for j in range(i + 1, i + right_bars + 1):
+            if low[j] < low[i]:
+                is_pivot_low = False
+                break
+        if is_pivot_low:
+            pivot_lows.append((i, low[i]))
+
+    resistance = np.full(n, np.nan)
+    support = np.full(n, np.nan)
+    for i, val in pivot_highs:
+        resistance[i:] = val
+    for i, val in pivot_lows:
+        support[i:] = val
+    resistance = pd.Series(resistance).ffill().values
+    support = pd.Series(support).ffill().values
+
+    for i in range(n):
+        if not np.isnan(resistance[i]) and close[i] > resistance[i]:
+            trend[i] = 1
+        elif not np.isnan(support[i]) and close[i] < support[i]:
+            trend[i] = 0
+        elif i > 0:
+            trend[i] = trend[i - 1]
+    return pd.Series(trend, index=df.index)
+
+
+def reference_label(df):
+    label = pd.Series(0, index=df.index, dtype=int)
+    current_label = 0
+    for i in range(len(df)):
+        buy = all(df[col].iloc[i] == 1 for col in LABEL_COLUMNS)
+        sell = all(df[col].iloc[i] == 0 for col in LABEL_COLUMNS)
+        if buy:
+            current_label = 1
+        elif sell:
+            current_label = 0
+        label.iloc[i] = current_label
+    return label
+
+
+# --------------------------------------------
+# Sentetik seriler
+# --------------------------------------------
+
+def make_prices(kind, n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    if kind == 'up':
+        close = 50 * np.exp(np.linspace(0, 1.2, n) + np.cumsum(rng.normal(0, 0.01, n)))
+    elif kind == 'down':
+        close = 80 * np.exp(np.linspace(0, -1.0, n) + np.cumsum(rng.normal(0, 0.01, n)))
+    elif kind == 'flat':
+        close = np.r_[np.linspace(20, 25, n // 3), np.full(n - n // 3, 25.0)]
+    elif kind == 'cycle':
+        close = 30 + 5 * np.sin(np.arange(n) / 15) + np.cumsum(rng.normal(0, 0.2, n))
+    else:
+        close = 40 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    df = pd.DataFrame({
+        'CODE': 'TEST',
+        'DATE': pd.bdate_range('2020-01-01', periods=n),
+        'CLOSING_TL': close,
+        'HIGH_TL': close + spread,
+        'LOW_TL': close - spread,
+        'VOLUME_TL': rng.uniform(1e5, 1e6, n),
+    })
+    if kind == 'flat':
+        # Sabit bölümde high / low da sabit: Eşitlikli pivot karşılaştırmaları
+        df.loc[n // 3:, ['HIGH_TL', 'LOW_TL']] = 25.0
+    if kind == 'nan':
+        for col in ('CLOSING_TL', 'HIGH_TL', 'LOW_TL'):
+            rows = rng.choice(n, 25, replace=False)
+            df.loc[rows, col] = np.nan
+        df.loc[200:210, ['CLOSING_TL', 'HIGH_TL', 'LOW_TL']] = np.nan
+    return df
+
+
+KINDS = ['up', 'down', 'flat', 'cycle', 'walk', 'nan']
+
+
+@pytest.mark.parametrize('kind', KINDS)
+@pytest.mark.parametrize('bars', [(3, 3), (1, 1), (5, 2), (2, 0)])
+def test_hhll_trend_matches_loop(kind, bars):
+    df = make_prices(kind)
+    np.testing.assert_array_equal(detect_hhll_trend(df, *bars).to_numpy(),
+                                  reference_hhll_trend(df, *bars).to_numpy())
+
+
+@pytest.mark.parametrize('n', [0, 1, 4, 7])
+def test_hhll_trend_short_series(n):
+    df = make_prices('walk', n=max(n, 1)).iloc[:n]
+    np.testing.assert_array_equal(detect_hhll_trend(df, 3, 3).to_numpy(),
+                                  reference_hhll_trend(df, 3, 3).to_numpy())
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_label_matches_loop_on_indicator_columns(kind):
+    """Gerçek gösterge kolonlarından (trend / düz / NaN içeren fiyat) üretilen label"""
+    config = dict(CONFIG, warmup_bars=0)
+    df = calculate_all_filters(make_prices(kind), config, is_inference=True, verbose=False,
+                               columns=['CODE', 'DATE'] + LABEL_COLUMNS)
+    expected = reference_label(df)
+    result = calculate_label(df)
+    assert result.equals(expected)
+
+
+@pytest.mark.parametrize('agreement', [0.0, 0.3, 0.7, 0.95])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_label_matches_loop_on_random_states(agreement, seed):
+    """Rastgele binary kolonlar: agreement oranında satırda tüm kolonlar aynı değerde"""
+    rng = np.random.default_rng(seed)
+    n = 800
+    df = pd.DataFrame({col: rng.integers(0, 2, n) for col in LABEL_COLUMNS})
+    agree = rng.random(n) < agreement
+    common = rng.integers(0, 2, n)
+    for col in LABEL_COLUMNS:
+        df.loc[agree, col] = common[agree]
+    # Warm-up'taki gibi NaN satırlar (ne ALIM ne SATIM)
+    df = df.astype(float)
+    df.iloc[:10, 0] = np.nan
+    assert calculate_label(df).equals(reference_label(df))
+
+
+def test_label_empty_frame():
+    df = pd.DataFrame({col: pd.Series(dtype=float) for col in LABEL_COLUMNS})
+    assert calculate_label(df).equals(reference_label(df))
+
+
+@pytest.mark.parametrize('horizons', [[], [0], [3, -1], [2.5], 3])
+def test_invalid_target_horizons_raise(horizons):
+    with pytest.raises(ValueError, match='target_horizons'):
+        get_target_columns(dict(CONFIG, target_horizons=horizons))
+
+
+def test_training_output_drops_shortest_horizon_tail():
+    config = dict(CONFIG, warmup_bars=50, target_horizons=[5, 2])
+    prices = make_prices('trend')
+    df = calculate_all_filters(prices, config, verbose=False)
+    assert len(df) == len(prices) - 50 - 2
+    assert df['TARGET_2D'].notna().all()
+    assert df['TARGET_5D'].iloc[-3:].isna().all()
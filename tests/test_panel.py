@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_ml_features as gmf
+from panel_indicators import build_panel, compute_panel_indicators, panel_to_frame
+
+
+def make_universe(n_stocks=4, n_bars=500, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2019-01-01', periods=n_bars)
+    frames = []
+    for i in range(n_stocks):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        spread = np.abs(rng.normal(0, 0.01, n_bars)) * close
+        frames.append(pd.DataFrame({
+            'CODE': f'S{i}', 'DATE': dates, 'CLOSING_TL': close,
+            'LOW_TL': close - spread, 'HIGH_TL': close + spread,
+            'VOLUME_TL': rng.uniform(1e5, 1e6, n_bars),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def with_gaps(df):
+    """Tek bar boşluklar, işlem durdurma, geç halka arz ve NaN kapanışlar"""
+    df = df.copy()
+    rows = {code: np.flatnonzero(df['CODE'].to_numpy() == code) for code in df['CODE'].unique()}
+    drop = np.zeros(len(df), bool)
+    drop[rows['S0'][[60, 61, 200, 333]]] = True
+    drop[rows['S1'][300:320]] = True
+    drop[rows['S2'][:150]] = True
+    df.loc[rows['S3'][[100, 250]], 'CLOSING_TL'] = np.nan
+    return df[~drop].reset_index(drop=True)
+
+
+def stock_frames(df):
+    return [(code, stock_df.reset_index(drop=True)) for code, stock_df in df.groupby('CODE', sort=True)]
+
+
+def compare_engines(frames):
+    stock, stock_errors = gmf.compute_features(frames, gmf.CONFIG)
+    panel, panel_errors = gmf.compute_features(frames, dict(gmf.CONFIG, indicator_engine='panel'))
+    assert stock_errors.keys() == panel_errors.keys()
+    assert [code for code, _ in stock] == [code for code, _ in panel]
+    for (code, a), (_, b) in zip(stock, panel):
+        assert list(a.columns) == list(b.columns)
+        for col in a.columns.drop(['CODE', 'DATE']):
+            np.testing.assert_allclose(b[col].to_numpy(float), a[col].to_numpy(float),
+                                       rtol=1e-9, atol=1e-9, err_msg=f'{code} {col}')
+
+
+def test_panel_matches_stock_engine_with_gaps_and_nan_close():
+    compare_engines(stock_frames(with_gaps(make_universe())))
+
+
+def test_panel_indicators_match_calculate_functions():
+    df = with_gaps(make_universe())
+    config = gmf.CONFIG
+    panel = build_panel(df)
+    frame = panel_to_frame(panel, compute_panel_indicators(panel, config))
+    assert len(frame) == len(df)
+    reference = {
+        'FINH': lambda d: gmf.calculate_finh(d, config['finh_period']),
+        'KAMA': lambda d: gmf.calculate_kama(d, config['kama_period']),
+        'BlueLine': lambda d: gmf.calculate_blueline(d, config['blueline_period']),
+        'OVT': lambda d: gmf.calculate_ovt(d, config['ovt_period']),
+        'LRB': lambda d: gmf.calculate_lrb(d, config['lrb_period']),
+        'ZLMA': lambda d: gmf.calculate_zlma(d, config['zlma_period'], config['zlma_smooth']),
+    }
+    for code, stock_df in stock_frames(df):
+        rows = frame[frame['CODE'] == code]
+        for name, fn in reference.items():
+            np.testing.assert_allclose(rows[name].to_numpy(float), np.asarray(fn(stock_df), float),
+                                       rtol=1e-9, atol=1e-9, err_msg=f'{code} {name}')
+
+
+def test_duplicate_dates_fall_back_to_stock_engine():
+    df = make_universe()
+    duplicate = df[df['CODE'] == 'S1'].iloc[[250]]
+    df = pd.concat([df, duplicate], ignore_index=True).sort_values(['CODE', 'DATE'], kind='mergesort')
+    with pytest.raises(ValueError, match='S1'):
+        build_panel(df)
+    compare_engines(stock_frames(df))
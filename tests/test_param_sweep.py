@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from generate_ml_features import CONFIG
+from param_sweep import SCORERS, StockIntermediates, label_balance, label_stability
+
+
+class FixedLabel:
+    """Sabit label döndüren sahte hisse (skor fonksiyonları için)"""
+
+    def __init__(self, label):
+        self._label = np.asarray(label, dtype=float)
+
+    def label(self, config):
+        return self._label
+
+
+def make_stocks(n_stocks=3, n_bars=600, seed=0):
+    rng = np.random.default_rng(seed)
+    stocks = {}
+    for i in range(n_stocks):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        spread = np.abs(rng.normal(0, 0.01, n_bars)) * close
+        stocks[f'S{i}'] = StockIntermediates(close, close + spread, close - spread,
+                                             rng.uniform(1e5, 1e6, n_bars))
+    return stocks
+
+
+def test_balance_bounds():
+    assert label_balance(np.ones(20)) == 0.0
+    assert label_balance(np.r_[np.zeros(10), np.ones(10)]) == 1.0
+
+
+def test_constant_label_scores_zero():
+    config = dict(CONFIG, warmup_bars=0)
+    constant = SCORERS['stability']({'A': FixedLabel(np.ones(100))}, config, {})
+    assert label_stability(np.ones(100)) == 1.0
+    assert constant['score'] == 0.0
+    assert constant['pos_ratio'] == 1.0
+
+    regime = np.r_[np.zeros(50), np.ones(50)]
+    switching = SCORERS['stability']({'A': FixedLabel(regime)}, config, {})
+    assert switching['score'] > constant['score']
+
+
+def test_f1_horizon_follows_config():
+    pytest.importorskip('sklearn')
+    stocks = make_stocks()
+    config = dict(CONFIG, warmup_bars=100, target_horizons=[5])
+    assert SCORERS['f1'](stocks, config, {}) == SCORERS['f1'](stocks, config, {'horizon': 5})
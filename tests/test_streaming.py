@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_ml_features import CONFIG, INPUT_COLUMNS, build_feature_registry, calculate_all_filters
+from streaming_indicators import StreamingFeatures, update_stock
+
+
+def make_stock(n_bars=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    spread = np.abs(rng.normal(0, 0.01, n_bars)) * close
+    return pd.DataFrame({
+        'CODE': 'TEST',
+        'DATE': pd.bdate_range('2020-01-01', periods=n_bars),
+        'CLOSING_TL': close,
+        'LOW_TL': close - spread,
+        'HIGH_TL': close + spread,
+        'VOLUME_TL': rng.uniform(1e5, 1e6, n_bars),
+    })
+
+
+def test_append_frame_accepts_new_bars():
+    df = make_stock()
+    state = StreamingFeatures.from_frame('TEST', df.iloc[:-5], CONFIG, keep_rows=50)
+    assert state.append_frame(df)
+    assert state.n_bars == len(df)
+
+
+@pytest.mark.parametrize('position', [-6, -20, -50])
+def test_append_frame_rejects_revised_window(position):
+    df = make_stock()
+    state = StreamingFeatures.from_frame('TEST', df.iloc[:-5], CONFIG, keep_rows=50)
+    revised = df.copy()
+    revised.loc[len(df) + position, 'CLOSING_TL'] *= 1.01
+    assert not state.append_frame(revised)
+
+
+def test_append_frame_rejects_missing_bar():
+    df = make_stock()
+    state = StreamingFeatures.from_frame('TEST', df.iloc[:-5], CONFIG, keep_rows=50)
+    assert not state.append_frame(df.drop(index=len(df) - 30))
+
+
+def test_update_stock_rebuilds_on_revision(tmp_path):
+    df = make_stock()
+    _, rebuilt = update_stock('TEST', df.iloc[:-5], CONFIG, keep_rows=50, state_dir=tmp_path)
+    assert rebuilt
+    revised = df.copy()
+    revised.loc[len(df) - 20, 'VOLUME_TL'] *= 2
+    features, rebuilt = update_stock('TEST', revised, CONFIG, keep_rows=50, state_dir=tmp_path)
+    assert rebuilt
+    _, rebuilt = update_stock('TEST', revised, CONFIG, keep_rows=50, state_dir=tmp_path)
+    assert not rebuilt
+    assert len(features) == 50
+
+
+@pytest.mark.parametrize('columns', [['OVT_Slope', 'FINH_Slope', 'VOLUME_TL'], 'all'])
+def test_streaming_matches_batch_for_requested_columns(columns):
+    if columns == 'all':
+        columns = list(INPUT_COLUMNS) + list(build_feature_registry(CONFIG))
+    config = dict(CONFIG, feature_columns=columns)
+    df = make_stock(n_bars=500)
+    state = StreamingFeatures.from_frame('TEST', df.iloc[:-20], config, keep_rows=50)
+    assert state.append_frame(df)
+    streamed = state.frame()
+    batch = calculate_all_filters(df, config, is_inference=True, verbose=False).tail(50).reset_index(drop=True)
+    assert list(streamed.columns) == list(batch.columns)
+    for col in batch.columns.drop(['CODE', 'DATE']):
+        np.testing.assert_allclose(streamed[col].to_numpy(float), batch[col].to_numpy(float),
+                                   rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_unknown_column_raises():
+    with pytest.raises(ValueError):
+        StreamingFeatures('TEST', dict(CONFIG, feature_columns=['YOK_Slope']))
+
+
+def test_streaming_flat_window_keeps_zero_slope():
+    # İşlem durması: Uzun süre aynı fiyat, WMA eğimi toplu hesaplamadaki gibi tam 0 kalmalı
+    df = make_stock(n_bars=600)
+    halt = slice(420, 560)
+    for col in ('CLOSING_TL', 'LOW_TL', 'HIGH_TL'):
+        df.loc[halt, col] = df.loc[419, 'CLOSING_TL']
+    df.loc[halt, 'VOLUME_TL'] = 1e5
+    columns = list(INPUT_COLUMNS) + list(build_feature_registry(CONFIG))
+    config = dict(CONFIG, feature_columns=columns)
+    state = StreamingFeatures.from_frame('TEST', df.iloc[:300], config, keep_rows=200)
+    assert state.append_frame(df)
+    streamed = state.frame()
+    batch = calculate_all_filters(df, config, is_inference=True, verbose=False).tail(200).reset_index(drop=True)
+    for col in [col for col in batch.columns if col.endswith(('_Slope', '_PriceAbove'))]:
+        np.testing.assert_array_equal(streamed[col].to_numpy(), batch[col].to_numpy(), err_msg=col)
+    for col in batch.columns.drop(['CODE', 'DATE']):
+        np.testing.assert_allclose(streamed[col].to_numpy(float), batch[col].to_numpy(float),
+                                   rtol=1e-9, atol=1e-9, err_msg=col)
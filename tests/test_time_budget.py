@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+from time_budget import HARD_TIMEOUT, BudgetTimeout, TimeBudget, run_with_timeout
+
+
+def test_run_with_timeout_returns_result():
+    assert run_with_timeout(lambda: (np.arange(5), 'ok'), timeout=30)[1] == 'ok'
+
+
+def test_run_with_timeout_reraises_error():
+    def fail():
+        raise ValueError("bozuk")
+
+    with pytest.raises(ValueError, match="bozuk"):
+        run_with_timeout(fail, timeout=30)
+
+
+@pytest.mark.skipif(not HARD_TIMEOUT, reason="fork yok: süre sınırı uygulanamaz")
+def test_run_with_timeout_stops_slow_work():
+    started = time.perf_counter()
+    with pytest.raises(BudgetTimeout):
+        run_with_timeout(lambda: time.sleep(30), timeout=0.5)
+    assert time.perf_counter() - started < 10
+
+
+def test_run_with_timeout_without_limit_runs_inline():
+    state = []
+    run_with_timeout(lambda: state.append(1), timeout=None)
+    assert state == [1]
+
+
+def test_budget_counts_stopped_as_skipped():
+    budget = TimeBudget(60, reserve_seconds=10)
+    budget.record('rf', 'eğitildi', seconds=1.0)
+    budget.record('lightgbm', 'durduruldu', seconds=5.0, reason='süre aşıldı')
+    budget.record('catboost', 'atlandı', reason='bütçe bitti')
+    assert budget.skipped() == ['lightgbm', 'catboost']
+    assert budget.remaining() <= 50
+
+
+@pytest.mark.skipif(not HARD_TIMEOUT, reason="fork yok: süre sınırı uygulanamaz")
+def test_pilot_and_fit_run_in_workers():
+    # Pilot ve tam eğitim ayrı işçilerde: Ana süreç OpenMP havuzu başlatmadan arka arkaya fork eder
+    pytest.importorskip('sklearn')
+    from sklearn.base import clone
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from time_budget import estimate_fit_seconds
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 8))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=3000) > 0).astype(int)
+    model = HistGradientBoostingClassifier(max_iter=20)
+    estimate = run_with_timeout(lambda: estimate_fit_seconds(model, X, y, pilot_rows=1000)[0], timeout=60)
+    assert estimate > 0
+    fitted = run_with_timeout(lambda: clone(model).fit(X, y), timeout=60)
+    assert fitted.score(X, y) > 0.7
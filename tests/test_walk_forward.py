@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import write_feature_set
+from training_data import load_training_matrix
+from walk_forward import _fold_slice, make_folds, run_walk_forward
+
+
+def make_feature_set(path, n_stocks=3, n_bars=400, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_stocks):
+        frames.append(pd.DataFrame({
+            'CODE': f'S{i}', 'DATE': pd.bdate_range('2020-01-01', periods=n_bars),
+            'F1': rng.normal(size=n_bars), 'F2': rng.normal(size=n_bars),
+            'TARGET_3D': rng.integers(0, 2, n_bars).astype(float),
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    df.loc[[5, 50], 'F1'] = [np.nan, np.inf]
+    write_feature_set(df, path, targets=['TARGET_3D'])
+
+
+def test_fold_slices_are_clean_views(tmp_path):
+    make_feature_set(str(tmp_path / 'features'))
+    data = load_training_matrix(str(tmp_path / 'features'), 'TARGET_3D', out_dir=str(tmp_path / 'matrix'))
+    X, y, codes = _fold_slice(data.out_dir, 0, len(data))
+    assert isinstance(X, np.memmap)
+    assert np.isfinite(X).all()
+    assert len(X) == len(y) == len(codes) == 1200
+
+
+def test_rebuilt_matrix_is_reopened(tmp_path):
+    make_feature_set(str(tmp_path / 'features'))
+    out_dir = str(tmp_path / 'matrix')
+    load_training_matrix(str(tmp_path / 'features'), 'TARGET_3D', out_dir=out_dir)
+    assert _fold_slice(out_dir, 0, 10)[0].shape == (10, 2)
+
+    # Aynı süreçte farklı kolonlarla yeniden kurulan matris eski memmap'ten okunmamalı
+    load_training_matrix(str(tmp_path / 'features'), 'TARGET_3D', out_dir=out_dir, exclude=['F2'])
+    assert _fold_slice(out_dir, 0, 10)[0].shape == (10, 1)
+
+
+def test_walk_forward_runs_on_matrix(tmp_path):
+    pytest.importorskip('sklearn')
+    make_feature_set(str(tmp_path / 'features'))
+    data = load_training_matrix(str(tmp_path / 'features'), 'TARGET_3D', out_dir=str(tmp_path / 'matrix'))
+    folds = make_folds(data.dates, test_days=50, min_train_days=200, horizon=3)
+    results = run_walk_forward(data, folds, models=['lr'])
+    assert len(results) == len(folds) == 4
+    assert results['stock_f1_median'].notna().all()
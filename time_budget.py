@@ -0,0 +1,147 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    # Opsiyonel: Pilot eğitimde modeli klonlamak için (pycaret ile birlikte gelir)
+    from sklearn.base import clone
+except ImportError:
+    clone = None
+
+# ============================================
+# ZAMAN BÜTÇESİ
+# ============================================
+# Gece çalışan eğitimin belirli bir sürede bitmesi için toplam bütçe aday modellere paylaştırılır:
+# - Her modelin payı = kalan süre / kalan model sayısı (hızlı modellerden artan süre sonrakilere kalır)
+# - Model eğitilmeden önce verinin küçük bir alt kümesinde pilot eğitim yapılır, tam eğitim
+#   süresi doğrusal olarak tahmin edilir; tahmini payını aşan (yavaş) modeller atlanır
+# - Bütçe bittiğinde kalan modeller atlanır; tüm kararlar rapora yazılır
+# - Tahmin yanılabilir: Eğitimler run_with_timeout ile ayrı süreçte çalışır, payı biten iş
+#   sonlandırılır. fork olmayan platformlarda (Windows) süre sınırı uygulanamaz; orada
+#   bütçe sadece başlamadan önce atlama yapar (en iyi çaba)
+
+# Süreç içinde sert süre sınırı uygulanabilir mi (işçi fork ile ana sürecin durumunu devralır)
+HARD_TIMEOUT = 'fork' in multiprocessing.get_all_start_methods()
+
+
+class BudgetTimeout(Exception):
+    """İş kendisine ayrılan sürede bitmedi, işçi süreç sonlandırıldı"""
+
+
+def run_with_timeout(fn, timeout):
+    """
+    fn()'i fork edilmiş işçi süreçte çalıştırır ve sonucunu (pickle ile) döndürür.
+    timeout saniyede bitmezse işçi sonlandırılır ve BudgetTimeout fırlatılır; fn'nin hatası
+    ana süreçte tekrar fırlatılır. İşçi ana sürecin belleğini (PyCaret setup vb.) devralır,
+    ancak fn'nin global durumda yaptığı değişiklikler ana sürece taşınmaz: Gereken her şey
+    sonuç olarak döndürülmelidir.
+    timeout None ise veya fork yoksa fn aynı süreçte, süre sınırı olmadan çalışır.
+    Ana süreç fork öncesi model eğitmemelidir: OpenMP (libgomp) / loky havuzu başlamış
+    bir süreçten fork edilen işçi kilitlenebilir. Pilot tahminler de bu yüzden işçide çalışır.
+    """
+    if timeout is None or not HARD_TIMEOUT:
+        return fn()
+    if timeout <= 0:
+        raise BudgetTimeout("Süre kalmadı")
+
+    ctx = multiprocessing.get_context('fork')
+    receiver, sender = ctx.Pipe(duplex=False)
+
+    def work():
+        try:
+            result = (True, fn())
+        except Exception as e:
+            result = (False, e)
+        try:
+            sender.send(result)
+        except Exception as e:
+            # Sonuç / hata pickle edilemedi
+            sender.send((False, RuntimeError(f"İşçi sonucu aktarılamadı: {e}")))
+
+    process = ctx.Process(target=work)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise BudgetTimeout(f"{timeout:,.0f} sn içinde bitmedi")
+        try:
+            ok, payload = receiver.recv()
+        except EOFError:
+            raise RuntimeError(f"İşçi süreç beklenmedik şekilde sonlandı (kod: {process.exitcode})")
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.terminate()
+        process.join()
+    if not ok:
+        raise payload
+    return payload
+
+
+def estimate_fit_seconds(estimator, X, y, folds=1, pilot_rows=20000, min_rows=500):
+    """
+    Pilot eğitimle tam eğitim süresini tahmin eder (satır sayısıyla doğrusal varsayım).
+    Returns: (tahmini saniye, pilot saniye)
+    """
+    if clone is None:
+        raise ImportError("Pilot süre tahmini için scikit-learn gerekli (pip install scikit-learn)")
+
+    n_rows = len(y)
+    rows = min(n_rows, max(min_rows, pilot_rows))
+    # Zaman sıralı veride son satırlar: Sınıf dağılımı güncel döneme benzer
+    X_pilot = X[-rows:] if isinstance(X, np.ndarray) else X.iloc[-rows:]
+    y_pilot = y[-rows:] if isinstance(y, np.ndarray) else y.iloc[-rows:]
+
+    started = time.perf_counter()
+    clone(estimator).fit(X_pilot, y_pilot)
+    pilot_s = time.perf_counter() - started
+    return pilot_s * (n_rows / rows) * folds, pilot_s
+
+
+class TimeBudget:
+    """
+    Toplam süre bütçesi ve model bazlı kararlar (eğitildi / önbellek / atlandı / durduruldu).
+    reserve_seconds: Sonraki aşamalar (tune, grafikler, finalize) için ayrılan süre
+    """
+
+    def __init__(self, total_seconds, reserve_seconds=0.0):
+        self.total_seconds = total_seconds
+        self.reserve_seconds = reserve_seconds
+        self.started = time.perf_counter()
+        self.records = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def remaining(self, include_reserve=False):
+        """Kalan süre (varsayılan olarak rezerv hariç)"""
+        reserve = 0.0 if include_reserve else self.reserve_seconds
+        return max(0.0, self.total_seconds - reserve - self.elapsed())
+
+    def share(self, models_left):
+        """Sıradaki modelin payı: Kalan süre kalan modellere eşit bölünür"""
+        return self.remaining() / max(1, models_left)
+
+    def exhausted(self):
+        return self.remaining() <= 0
+
+    def record(self, model, status, seconds=0.0, estimate=None, limit=None, reason=''):
+        self.records.append({'model': model, 'status': status, 'seconds': seconds,
+                             'estimate_s': estimate, 'limit_s': limit, 'reason': reason})
+
+    def skipped(self):
+        return [rec['model'] for rec in self.records if rec['status'] in ('atlandı', 'durduruldu')]
+
+    def report(self):
+        columns = ['model', 'status', 'seconds', 'estimate_s', 'limit_s', 'reason']
+        return pd.DataFrame(self.records, columns=columns)
+
+    def print_report(self):
+        print(f"\n⏱️ Zaman bütçesi: {self.elapsed():,.0f} / {self.total_seconds:,.0f} sn kullanıldı")
+        if self.records:
+            print(self.report().round(1).to_string(index=False))
+        skipped = self.skipped()
+        if skipped:
+            print(f"⏭️ Atlanan modeller ({len(skipped)}): {', '.join(map(str, skipped))}")
@@ -0,0 +1,146 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import feature_columns, read_feature_schema, read_feature_set
+
+# ============================================
+# MEMORY-MAPPED EĞİTİM MATRİSİ
+# ============================================
+# Feature seti bir kez diske bitişik float32 matris (X.npy), label vektörü (y.npy) ve
+# CODE / DATE yan indeksi (index.parquet) olarak yazılır. Satırlar tarihe göre sıralıdır;
+# böylece zaman sıralı train / test bölmeleri kopyasız dilimlerdir (X[:k], X[k:]).
+# NaN / inf değerler yazarken 0'a çevrilir: Dilimler doğrudan sklearn modellerine verilebilir.
+# Matris kurulurken de bellekte her seferinde tek hissenin verisi tutulur.
+
+TRAINING_DIR = 'egitim_matrisi'
+
+# Eğitimde kullanılmayan kolonlar (kimlik ve label'ın kendisi)
+NON_FEATURE_COLUMNS = ['CODE', 'DATE', 'Current_Trend']
+
+
+def _training_features(feature_path, target_col, exclude=None):
+    excluded = set(NON_FEATURE_COLUMNS) | set(exclude or [])
+    return [col for col in feature_columns(feature_path)
+            if col not in excluded and col != target_col and not col.startswith('TARGET_')]
+
+
+def _source_fingerprint(feature_path, target_col, features):
+    schema = read_feature_schema(feature_path)
+    return {'source': os.path.abspath(feature_path), 'created': schema.get('created'),
+            'rows': schema.get('rows'), 'target': target_col, 'features': features, 'finite': True}
+
+
+def build_training_matrix(feature_path, target_col, out_dir=TRAINING_DIR, exclude=None):
+    """
+    Feature setinden memory-mapped eğitim matrisini kurar.
+    exclude: Matrise alınmayacak ek kolonlar (sızıntı kolonları vb.)
+    Hedefi NaN olan satırlar atlanır, feature'lardaki NaN / inf 0 yazılır. Returns: TrainingData
+    """
+    features = _training_features(feature_path, target_col, exclude)
+
+    # 1. geçiş: Sadece CODE, DATE, hedef -> global tarih sırası ve satır konumları
+    index = read_feature_set(feature_path, columns=['CODE', 'DATE', target_col])
+    index = index[index[target_col].notna()]
+    index = index.sort_values(['DATE', 'CODE'], kind='mergesort').reset_index(drop=True)
+    index['CODE'] = index['CODE'].astype(str)
+
+    os.makedirs(out_dir, exist_ok=True)
+    X = np.lib.format.open_memmap(os.path.join(out_dir, 'X.npy'), mode='w+',
+                                  dtype=np.float32, shape=(len(index), len(features)))
+    y = np.lib.format.open_memmap(os.path.join(out_dir, 'y.npy'), mode='w+',
+                                  dtype=np.int8, shape=(len(index),))
+
+    # 2. geçiş: Hisse hisse oku, satırları global konumlarına yaz.
+    # Global sıra tarih sıralı olduğundan hissenin konumları da kendi tarih sırasındadır.
+    codes = index['CODE'].to_numpy()
+    for code in pd.unique(codes):
+        target_rows = np.flatnonzero(codes == code)
+        stock = read_feature_set(feature_path, columns=['DATE', target_col] + features,
+                                 symbols=[code])
+        stock = stock[stock[target_col].notna()].sort_values('DATE', kind='mergesort')
+        values = stock[features].to_numpy(dtype=np.float32)
+        X[target_rows] = np.nan_to_num(values, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        y[target_rows] = stock[target_col].to_numpy().astype(np.int8)
+    X.flush()
+    y.flush()
+    del X, y
+
+    index[['CODE', 'DATE']].to_parquet(os.path.join(out_dir, 'index.parquet'), index=False)
+
+    meta = _source_fingerprint(feature_path, target_col, features)
+    # Geçici dosyaya yazıp taşı: Her kurulumda yeni dosya, açık matrisi tutan okuyucular fark eder
+    meta_path = os.path.join(out_dir, 'meta.json')
+    with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(f"{meta_path}.tmp", meta_path)
+    return TrainingData(out_dir)
+
+
+def load_training_matrix(feature_path, target_col, out_dir=TRAINING_DIR, exclude=None):
+    """Matris güncelse diskten aç, feature seti / hedef / kolonlar değişmişse yeniden kur"""
+    meta_path = os.path.join(out_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        features = _training_features(feature_path, target_col, exclude)
+        if meta == _source_fingerprint(feature_path, target_col, features):
+            return TrainingData(out_dir)
+    return build_training_matrix(feature_path, target_col, out_dir, exclude)
+
+
+class TrainingData:
+    """
+    Memory-mapped eğitim verisi: X (satır x feature, float32), y (int8), index (CODE, DATE).
+    Satırlar tarih sıralıdır; bölmeler kopyasız görünümlerdir.
+    """
+
+    def __init__(self, out_dir=TRAINING_DIR, mmap_mode='r'):
+        self.out_dir = out_dir
+        self.X = np.load(os.path.join(out_dir, 'X.npy'), mmap_mode=mmap_mode)
+        self.y = np.load(os.path.join(out_dir, 'y.npy'), mmap_mode=mmap_mode)
+        self.index = pd.read_parquet(os.path.join(out_dir, 'index.parquet'))
+        with open(os.path.join(out_dir, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.features = self.meta['features']
+        self.target = self.meta['target']
+        self.dates = self.index['DATE'].to_numpy()
+
+    def __len__(self):
+        return len(self.y)
+
+    def date_position(self, date):
+        """date ve sonrasındaki ilk satırın konumu (aynı günün satırları bölünmez)"""
+        return int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date)), side='left'))
+
+    def split_at(self, date):
+        """date'ten önceki satırlar eğitim, sonrakiler test: ((X, y), (X, y)) görünümleri"""
+        k = self.date_position(date)
+        return (self.X[:k], self.y[:k]), (self.X[k:], self.y[k:])
+
+    def split_position(self, train_size=0.8, start=0):
+        """start'tan sonraki satırların ilk train_size oranının bittiği satır (gün sınırına yuvarlanmış)"""
+        k = start + int((len(self) - start) * train_size)
+        if start < k < len(self):
+            k = self.date_position(self.dates[k])
+        return k
+
+    def recent_start(self, max_rows=None):
+        """Son max_rows satırın başladığı konum (gün sınırına yuvarlanmış), None ise 0"""
+        if not max_rows or max_rows >= len(self):
+            return 0
+        return self.date_position(self.dates[len(self) - max_rows])
+
+    def time_split(self, train_size=0.8):
+        """İlk train_size oranı eğitim, kalanı test: ((X, y), (X, y)) görünümleri"""
+        k = self.split_position(train_size)
+        return (self.X[:k], self.y[:k]), (self.X[k:], self.y[k:])
+
+    def frame(self, rows=slice(None), with_target=True):
+        """Satır dilimini (kopyasız) DataFrame olarak döndürür (PyCaret vb. için)"""
+        df = pd.DataFrame(self.X[rows], columns=self.features, copy=False)
+        if with_target:
+            df[self.target] = self.y[rows]
+        return df
@@ -5,16 +5,33 @@ from plotly.subplots import make_subplots
 from pycaret.classification import load_model, predict_model
 import jinja2
 import os
+from data_store import feature_columns, read_feature_set
+from stock_groups import StockGroups
 
 # ==========================================
 # AYARLAR
 # ==========================================
-FEATURE_FILE = '280_gunluk_feature_seti_.xlsx'
+FEATURE_FILE = '280_gunluk_feature_seti_.parquet'
 MODEL_V2_PATH = 'v2_experiment/fintech_v2_model'
 MODEL_V3_PATH = 'v3_experiment/fintech_v3_model'
 OUTPUT_HTML = 'Sinyal_Analiz_Raporu.html'
 CONFIDENCE_THRESHOLD = 0.55
 
+# Grafik ve gerçekleşen sinyal için okunan kolonlar (model girdilerine ek olarak)
+CHART_COLUMNS = ['CODE', 'DATE', 'CLOSING_TL', 'LOW_TL', 'HIGH_TL']
+ACTUAL_SIGNAL_COLUMNS = ['GERCEKLESEN', 'Current_Trend']
+
+def report_columns(models):
+    """Raporun kullandığı kolonlar; bir modelin girdileri bilinmiyorsa None (tüm set okunur)"""
+    needed = CHART_COLUMNS + ACTUAL_SIGNAL_COLUMNS
+    for model in models:
+        model_columns = getattr(model, 'feature_names_in_', None)
+        if model_columns is None:
+            return None
+        needed += list(model_columns)
+    available = set(feature_columns(FEATURE_FILE))
+    return [col for col in dict.fromkeys(needed) if col in available]
+
 def apply_filter(signals, scores, threshold):
     sig_series = pd.Series(signals)
     score_series = pd.Series(scores)
@@ -64,9 +81,17 @@ def create_web_report():
     print("📊 PREMIUM SİNYAL RAPORU OLUŞTURULUYOR")
     print("="*70)
 
+    print("🧠 Modeller yükleniyor...")
+    try:
+        model_v2 = load_model(MODEL_V2_PATH)
+        model_v3 = load_model(MODEL_V3_PATH)
+    except Exception as e:
+        print(f"❌ Model yükleme hatası: {e}")
+        return
+
     print(f"📂 Veri okunuyor: {FEATURE_FILE}")
     try:
-        df = pd.read_excel(FEATURE_FILE)
+        df = read_feature_set(FEATURE_FILE, columns=report_columns([model_v2, model_v3]))
         if 'DATE' in df.columns:
             df['DATE'] = pd.to_datetime(df['DATE'])
             df = df.sort_values('DATE')
@@ -77,14 +102,6 @@ def create_web_report():
     df['OPEN'] = df.groupby('CODE')['CLOSING_TL'].shift(1)
     df['OPEN'] = df['OPEN'].fillna(df['LOW_TL'])
 
-    print("🧠 Modeller yükleniyor...")
-    try:
-        model_v2 = load_model(MODEL_V2_PATH)
-        model_v3 = load_model(MODEL_V3_PATH)
-    except Exception as e:
-        print(f"❌ Model yükleme hatası: {e}")
-        return
-
     print("🔮 Tahminler üretiliyor...")
     pred_v2 = predict_model(model_v2, data=df.copy(), verbose=False)
     pred_v3 = predict_model(model_v3, data=df.copy(), verbose=False)
@@ -96,14 +113,12 @@ def create_web_report():
 
     stocks_data = {}
     summary_data = [] # Tablo için özet veri
-    unique_stocks = sorted(df['CODE'].unique())
+    groups = StockGroups(df)
+    unique_stocks = groups.codes
 
     print(f"📈 İşlenen Hisse Sayısı: {len(unique_stocks)}")
     
-    for stock in unique_stocks:
-        stock_df = df[df['CODE'] == stock].copy()
-        stock_df = stock_df.sort_values('DATE')
-        
+    for stock, stock_df in groups:
         dates = stock_df['DATE'].dt.strftime('%d-%m-%Y').tolist()
         prices = stock_df['CLOSING_TL'].tolist()
         
@@ -0,0 +1,269 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from training_data import TRAINING_DIR, TrainingData, load_training_matrix
+
+try:
+    # Opsiyonel: Modeller ve metrikler (pycaret ile birlikte gelir)
+    from sklearn.base import clone
+    from sklearn.ensemble import (ExtraTreesClassifier, HistGradientBoostingClassifier,
+                                  RandomForestClassifier)
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+except ImportError:
+    clone = None
+
+# ============================================
+# WALK-FORWARD DOĞRULAMA
+# ============================================
+# Memory-mapped eğitim matrisi (training_data.py) üzerinde zaman sıralı foldlar:
+# - expanding: Eğitim penceresi baştan başlar ve her foldda büyür
+# - rolling: Eğitim penceresi sabit uzunlukta (train_days) kayar
+# - Purge: Eğitimin son 'horizon' günü atılır (label'ları test dönemine uzanır),
+#   embargo_days kadar ek boşluk bırakılabilir
+# Satırlar tarih sıralı olduğundan her fold iki satır aralığıdır. Foldlar process havuzunda
+# çalışır; her işçi matrisi kendisi açar. Matris NaN / inf içermediği için fold dilimleri
+# kopyasız memmap görünümleridir ve aynı folddaki tüm modeller aynı diziyi kullanır.
+# Metrikler toplamda ve hisse bazında (CODE gruplarının medyan F1'i) raporlanır.
+
+
+def _random_forest():
+    return RandomForestClassifier(n_estimators=200, min_samples_leaf=20, n_jobs=1, random_state=123)
+
+
+def _extra_trees():
+    return ExtraTreesClassifier(n_estimators=200, min_samples_leaf=20, n_jobs=1, random_state=123)
+
+
+def _logistic_regression():
+    return LogisticRegression(max_iter=1000)
+
+
+def _hist_gradient_boosting():
+    return HistGradientBoostingClassifier(max_iter=200, random_state=123)
+
+
+MODELS = {
+    'rf': _random_forest,
+    'et': _extra_trees,
+    'lr': _logistic_regression,
+    'hgb': _hist_gradient_boosting,
+}
+
+
+def horizon_of(target_col):
+    """TARGET_5D -> 5 (eski 'TARGET' kolonu 3 günlüktür)"""
+    match = re.match(r'TARGET_(\d+)D$', target_col)
+    return int(match.group(1)) if match else 3
+
+
+def make_folds(dates, mode='expanding', test_days=63, train_days=504, min_train_days=252,
+               horizon=3, embargo_days=0, max_folds=None):
+    """
+    Tarih sıralı satırlar için walk-forward foldları.
+    dates: Satırların tarihleri (artan), günler işlem günü olarak sayılır
+    Returns: [{'fold', 'train': (başlangıç, bitiş), 'test': (başlangıç, bitiş), tarihler...}]
+    """
+    if mode not in ('expanding', 'rolling'):
+        raise ValueError(f"Bilinmeyen walk-forward modu: {mode}")
+
+    days = np.unique(dates)
+    day_rows = np.searchsorted(dates, days, side='left')
+    day_rows = np.append(day_rows, len(dates))
+    gap = horizon + embargo_days
+
+    folds = []
+    test_start = min_train_days + gap
+    while test_start < len(days):
+        test_end = min(test_start + test_days, len(days))
+        train_end = test_start - gap
+        train_start = 0 if mode == 'expanding' else max(0, train_end - train_days)
+        folds.append({
+            'fold': len(folds),
+            'train': (int(day_rows[train_start]), int(day_rows[train_end])),
+            'test': (int(day_rows[test_start]), int(day_rows[test_end])),
+            'train_start': pd.Timestamp(days[train_start]).date(),
+            'train_end': pd.Timestamp(days[train_end - 1]).date(),
+            'test_start': pd.Timestamp(days[test_start]).date(),
+            'test_end': pd.Timestamp(days[test_end - 1]).date(),
+        })
+        test_start = test_end
+
+    if max_folds is not None:
+        folds = folds[-max_folds:]
+    return folds
+
+
+# ============================================
+# İŞÇİ (PROCESS HAVUZU)
+# ============================================
+
+@lru_cache(maxsize=2)
+def _open_cached(out_dir, stamp):
+    return TrainingData(out_dir)
+
+
+def _open_matrix(out_dir):
+    """Açık matrisi tekrar kullanır; matris aynı süreçte yeniden kurulduysa (meta.json değişti) yeniden açar"""
+    stat = os.stat(os.path.join(out_dir, 'meta.json'))
+    return _open_cached(out_dir, (stat.st_ino, stat.st_mtime_ns))
+
+
+def _fold_slice(out_dir, start, stop):
+    """Fold satır aralığı: Memmap görünümleri (kopyasız, matris kurulurken NaN / inf temizlendi)"""
+    data = _open_matrix(out_dir)
+    return data.X[start:stop], data.y[start:stop], data.index['CODE'].to_numpy()[start:stop]
+
+
+def _stock_f1(codes, y_true, y_pred):
+    """Hisse bazlı F1 (TP/FP/FN hisse başına toplanır)"""
+    frame = pd.DataFrame({'code': codes, 'tp': (y_true == 1) & (y_pred == 1),
+                          'fp': (y_true == 0) & (y_pred == 1), 'fn': (y_true == 1) & (y_pred == 0)})
+    counts = frame.groupby('code', sort=False)[['tp', 'fp', 'fn']].sum()
+    denom = 2 * counts['tp'] + counts['fp'] + counts['fn']
+    return (2 * counts['tp'] / denom.where(denom > 0)).dropna()
+
+
+def _evaluate_fold(task):
+    """Process havuzu işçisi: Bir folddaki tüm modelleri eğitir ve test eder"""
+    out_dir, fold, models = task
+    X_train, y_train, _ = _fold_slice(out_dir, *fold['train'])
+    X_test, y_test, test_codes = _fold_slice(out_dir, *fold['test'])
+
+    rows = []
+    for name, spec in models.items():
+        model = MODELS[spec]() if isinstance(spec, str) else clone(spec)
+        started = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - started
+        y_pred = model.predict(X_test)
+
+        auc = np.nan
+        if hasattr(model, 'predict_proba') and len(np.unique(y_test)) == 2:
+            auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+        stock_f1 = _stock_f1(test_codes, y_test, y_pred)
+
+        rows.append({
+            'model': name, 'fold': fold['fold'],
+            'train_start': fold['train_start'], 'train_end': fold['train_end'],
+            'test_start': fold['test_start'], 'test_end': fold['test_end'],
+            'train_rows': len(y_train), 'test_rows': len(y_test),
+            'f1': f1_score(y_test, y_pred, zero_division=0),
+            'precision': precision_score(y_test, y_pred, zero_division=0),
+            'recall': recall_score(y_test, y_pred, zero_division=0),
+            'accuracy': accuracy_score(y_test, y_pred),
+            'auc': auc,
+            'stock_f1_median': float(stock_f1.median()) if len(stock_f1) else np.nan,
+            'fit_s': fit_s,
+        })
+    return rows
+
+
+def run_walk_forward(data, folds, models=('rf', 'et', 'lr'), n_workers=1, on_progress=None):
+    """
+    Modelleri tüm foldlarda değerlendirir.
+    data: TrainingData (veya matris klasörü)
+    models: MODELS anahtarları veya {ad: anahtar / sklearn estimator} sözlüğü
+    n_workers: 1 ise sıralı, >1 ise process havuzu, None ise tüm çekirdekler
+    Returns: Fold x model başına metrikleri içeren DataFrame
+    """
+    if clone is None:
+        raise ImportError("Walk-forward doğrulama için scikit-learn gerekli (pip install scikit-learn)")
+
+    out_dir = data.out_dir if isinstance(data, TrainingData) else data
+    if not isinstance(models, dict):
+        models = {name: name for name in models}
+    n_workers = n_workers or os.cpu_count() or 1
+
+    # Büyük foldlar (uzun eğitim) önce başlasın: Havuzun sonunda tek uzun iş kalmasın
+    tasks = [(out_dir, fold, models)
+             for fold in sorted(folds, key=lambda fold: fold['train'][0] - fold['train'][1])]
+
+    rows = []
+    if n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as executor:
+            for fold_rows in executor.map(_evaluate_fold, tasks):
+                rows.extend(fold_rows)
+                if on_progress is not None:
+                    on_progress(len(rows) // len(models), len(tasks))
+    else:
+        for task in tasks:
+            rows.extend(_evaluate_fold(task))
+            if on_progress is not None:
+                on_progress(len(rows) // len(models), len(tasks))
+
+    return pd.DataFrame(rows).sort_values(['model', 'fold'], kind='mergesort').reset_index(drop=True)
+
+
+def summarize(results):
+    """Model bazında fold ortalamaları / sapmaları (F1 ortalamasına göre azalan)"""
+    grouped = results.groupby('model')
+    summary = pd.DataFrame({
+        'folds': grouped.size(),
+        'f1_mean': grouped['f1'].mean(),
+        'f1_std': grouped['f1'].std(),
+        'auc_mean': grouped['auc'].mean(),
+        'stock_f1_median': grouped['stock_f1_median'].mean(),
+        'fit_s': grouped['fit_s'].sum(),
+    })
+    return summary.sort_values('f1_mean', ascending=False)
+
+
+# ============================================
+# ANA FONKSİYON
+# ============================================
+
+WF_CONFIG = {
+    'input_file': 'ml_filtre_verileri.parquet',
+    'target_col': 'TARGET_3D',
+    'training_dir': TRAINING_DIR,
+    'mode': 'expanding',       # 'expanding' veya 'rolling'
+    'test_days': 63,           # Fold başına test penceresi (işlem günü, ~3 ay)
+    'train_days': 504,         # rolling modunda eğitim penceresi (~2 yıl)
+    'min_train_days': 252,     # İlk folddan önceki asgari eğitim geçmişi
+    'embargo_days': 0,         # Purge (hedef ufku) üzerine ek boşluk
+    'max_folds': None,         # Sadece son N fold
+    'models': ['rf', 'et', 'lr'],
+    'n_workers': None,
+    'output_file': 'walk_forward_sonuclari.csv',
+}
+
+
+def main():
+    print("=" * 60)
+    print("WALK-FORWARD DOĞRULAMA")
+    print("=" * 60)
+
+    from data_store import feature_columns
+    leak_cols = [c for c in feature_columns(WF_CONFIG['input_file']) if c.endswith('_PriceAbove')]
+    data = load_training_matrix(WF_CONFIG['input_file'], WF_CONFIG['target_col'],
+                                out_dir=WF_CONFIG['training_dir'], exclude=leak_cols)
+
+    folds = make_folds(data.dates, mode=WF_CONFIG['mode'], test_days=WF_CONFIG['test_days'],
+                       train_days=WF_CONFIG['train_days'], min_train_days=WF_CONFIG['min_train_days'],
+                       horizon=horizon_of(WF_CONFIG['target_col']),
+                       embargo_days=WF_CONFIG['embargo_days'], max_folds=WF_CONFIG['max_folds'])
+    print(f"📊 {data.X.shape[0]:,} satır, {data.X.shape[1]} feature, {len(folds)} fold "
+          f"({WF_CONFIG['mode']}), modeller: {', '.join(WF_CONFIG['models'])}")
+
+    def progress(done, total):
+        print(f"\r   Tamamlanan fold: [{done}/{total}]", end="")
+
+    results = run_walk_forward(data, folds, WF_CONFIG['models'], n_workers=WF_CONFIG['n_workers'],
+                               on_progress=progress)
+    results.to_csv(WF_CONFIG['output_file'], index=False)
+
+    print("\n\n🏆 MODEL ÖZETİ:")
+    print(summarize(results).to_string())
+    print(f"\n💾 Sonuçlar kaydedildi: {WF_CONFIG['output_file']}")
+    return results
+
+
+if __name__ == "__main__":
+    main()